@@ -0,0 +1,215 @@
+"""
+Publish/subscribe broadcaster for live page updates.
+
+Sync code (model signals, admin actions) calls ``publish()``. Async views
+``subscribe()`` and await events without holding a thread, so one worker
+can keep thousands of idle streams open.
+
+Without ``REDIS_URL`` events only reach subscribers in the same process.
+With it, ``publish()`` goes through Redis pub/sub and each process runs a
+single listener that fans messages out to its local subscribers, so every
+worker sees every event.
+
+Usage:
+    broadcast.publish('review.approved', {'id': 1, 'html': '...'})
+
+    async with broadcast.subscribe() as events:
+        async for event in events:
+            ...
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+
+from django.conf import settings
+
+
+logger = logging.getLogger('gbb.broadcast')
+
+
+class Event:
+    """A published message: an id, a type and a JSON-serialisable payload."""
+
+    __slots__ = ('id', 'type', 'data')
+
+    def __init__(self, id, type, data):
+        self.id = id
+        self.type = type
+        self.data = data
+
+    def to_json(self):
+        return json.dumps({'id': self.id, 'type': self.type, 'data': self.data})
+
+    @classmethod
+    def from_json(cls, raw):
+        message = json.loads(raw)
+        return cls(message['id'], message['type'], message['data'])
+
+
+class Subscription:
+    """
+    Async context manager and iterator over events for one subscriber.
+
+    A plain class rather than an ``asynccontextmanager`` so that a
+    streaming response abandoned mid-iteration can be finalised safely.
+    """
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.loop = None
+        self.queue = asyncio.Queue(maxsize=broadcaster.max_queued)
+        self.dropped = 0
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.broadcaster._add(self)
+        await self.broadcaster.on_subscribe()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broadcaster._remove(self)
+
+    def deliver(self, event):
+        """Queue an event; called on the subscriber's event loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client loses events rather than growing memory
+            self.dropped += 1
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    async def get(self, timeout=None):
+        """Return the next event, or ``None`` after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broadcaster:
+    """Fans events out to the subscribers in this process."""
+
+    def __init__(self, max_queued=100):
+        self.max_queued = max_queued
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def next_id(self):
+        return next(self._ids)
+
+    def publish(self, type, data):
+        """Publish an event; safe to call from any thread."""
+        event = Event(self.next_id(), type, data)
+        self.dispatch(event)
+        return event
+
+    def dispatch(self, event):
+        """Deliver an event to every local subscriber on its own loop."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self._remove(subscription)
+
+    def subscribe(self):
+        """Return a ``Subscription`` to use with ``async with``."""
+        return Subscription(self)
+
+    async def on_subscribe(self):
+        """Hook for backends that need to start listening lazily."""
+
+    def _add(self, subscription):
+        with self._lock:
+            self._subscribers.add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class RedisBroadcaster(Broadcaster):
+    """Broadcaster that relays events between processes via Redis pub/sub."""
+
+    def __init__(self, url, channel, max_queued=100):
+        super().__init__(max_queued=max_queued)
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._listener = None
+
+    def _sync_client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def next_id(self):
+        # Event ids stay unique and increasing across processes
+        return self._sync_client().incr(f'{self.channel}:id')
+
+    def publish(self, type, data):
+        event = Event(self.next_id(), type, data)
+        self._sync_client().publish(self.channel, event.to_json())
+        return event
+
+    async def on_subscribe(self):
+        # One Redis connection per process, started by the first subscriber
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self):
+        import redis.asyncio
+
+        while self._subscribers:
+            client = redis.asyncio.Redis.from_url(self.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    while self._subscribers:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=5.0
+                        )
+                        if message is not None:
+                            self.dispatch(Event.from_json(message['data']))
+            except Exception as e:
+                logger.warning(f'Redis listener error, reconnecting: {e}')
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+
+def _create_broadcaster():
+    max_queued = getattr(settings, 'LIVE_MAX_QUEUED_EVENTS', 100)
+    redis_url = getattr(settings, 'REDIS_URL', '')
+    if redis_url:
+        return RedisBroadcaster(
+            redis_url, getattr(settings, 'LIVE_CHANNEL', 'gbb:live'), max_queued
+        )
+    return Broadcaster(max_queued)
+
+
+broadcaster = _create_broadcaster()
+
+
+def publish(type, data):
+    """Publish an event to every subscriber in every process."""
+    return broadcaster.publish(type, data)
+
+
+def subscribe():
+    return broadcaster.subscribe()
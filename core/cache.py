@@ -0,0 +1,297 @@
+"""
+Two-level cache for computed page data.
+
+L1 is a small bounded LRU with TTL kept in each worker process. It sits in
+front of L2, the Django ``default`` cache (``locmem`` locally, Redis in
+production). Keys embed a version number per model, so a write to a model
+invalidates every key built from it without having to find those keys.
+Misses are recomputed by a single caller at a time: threads in one process
+share a striped lock, and processes coordinate through a short-lived lock
+key in L2.
+
+Usage:
+    from core.cache import cached_call
+
+    stats = cached_call(
+        'beer_stats', lambda: compute_stats(beer), beer.pk,
+        models=(Review,), ttl=600,
+    )
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .db_routers import use_primary
+
+
+logger = logging.getLogger('gbb.cache')
+
+MISSING = object()
+
+KEY_PREFIX = 'gbb'
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with per-entry TTL.
+
+    Uses ``time.monotonic`` so expiry is unaffected by wall clock changes.
+    """
+
+    def __init__(self, max_entries=1000, default_ttl=30.0):
+        """
+        Initialize LRU cache.
+
+        Args:
+            max_entries: Maximum number of entries before evicting
+            default_ttl: Default time to live in seconds
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """Return the cached value, or ``default`` if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value, evicting the least recently used entries."""
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for the cache layer."""
+
+    FIELDS = ('l1_hits', 'l2_hits', 'misses', 'lock_waits', 'version_bumps')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self):
+        """Return a copy of the counters plus the overall hit rate."""
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts['l1_hits'] + counts['l2_hits'] + counts['misses']
+        hits = counts['l1_hits'] + counts['l2_hits']
+        counts['hit_rate'] = hits / lookups if lookups else 0.0
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+
+l1 = LRUCache(
+    max_entries=getattr(settings, 'CACHE_L1_MAX_ENTRIES', 1000),
+    default_ttl=getattr(settings, 'CACHE_L1_TTL', 30),
+)
+stats = CacheStats()
+
+# Striped locks bound the memory used for per-key single-flight
+_LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+
+def _key_lock(key):
+    return _locks[hash(key) % _LOCK_STRIPES]
+
+
+def model_label(model):
+    """
+    Return the label used in version keys.
+
+    ``model`` is a model class (labelled ``app_label.modelname``) or a
+    string, for data versioned more finely than a whole model.
+    """
+    if isinstance(model, str):
+        return model
+    return model._meta.label_lower
+
+
+def _version_key(model):
+    return f'{KEY_PREFIX}:version:{model_label(model)}'
+
+
+def get_version(model):
+    """
+    Return the current cache version for a model.
+
+    Versions are held in L1 for ``CACHE_VERSION_TTL`` seconds, so other
+    workers see a bump within that window.
+    """
+    key = _version_key(model)
+    version = l1.get(key)
+    if version is MISSING:
+        version = cache.get(key)
+        if version is None:
+            # Evicted or never set: start past any version that may still
+            # key entries in L2
+            seed = int(time.time())
+            cache.add(key, seed, timeout=None)
+            version = cache.get(key, seed)
+        l1.set(key, version, ttl=getattr(settings, 'CACHE_VERSION_TTL', 5))
+    return version
+
+
+def bump_version(model):
+    """Invalidate every key built from ``model``."""
+    key = _version_key(model)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        # Key missing or evicted: start past any version still in L1
+        version = int(time.time())
+        cache.set(key, version, timeout=None)
+    l1.set(key, version, ttl=getattr(settings, 'CACHE_VERSION_TTL', 5))
+    stats.incr('version_bumps')
+    return version
+
+
+def bump_version_on_commit(model):
+    """
+    Invalidate every key built from ``model`` once the transaction commits.
+
+    Bumped before commit, a concurrent reader could cache the old rows
+    under the new version, and a rollback would invalidate for nothing.
+    """
+    transaction.on_commit(lambda: bump_version(model))
+
+
+def make_key(name, *parts, models=()):
+    """
+    Build a cache key from a name, key parts and dependent model versions.
+
+    Example:
+        make_key('beer_stats', 42, models=(Review,))
+        # 'gbb:beer_stats:42:reviews.review=7'
+    """
+    segments = [KEY_PREFIX, name]
+    segments.extend(str(part) for part in parts)
+    segments.extend(
+        f'{model_label(model)}={get_version(model)}' for model in models
+    )
+    return ':'.join(segments)
+
+
+def get_or_set(key, compute, ttl=None, l1_ttl=None, force=False):
+    """
+    Return the cached value for ``key``, computing it once on a miss.
+
+    Args:
+        key: Cache key, usually from ``make_key``
+        compute: Zero-argument callable producing the value
+        ttl: L2 time to live in seconds
+        l1_ttl: L1 time to live in seconds (capped at ``ttl``)
+        force: Recompute and store even if the key is cached
+
+    Returns:
+        Cached or freshly computed value
+    """
+    ttl = getattr(settings, 'CACHE_DEFAULT_TTL', 300) if ttl is None else ttl
+    l1_ttl = min(l1_ttl or l1.default_ttl, ttl)
+
+    if not force:
+        value = l1.get(key)
+        if value is not MISSING:
+            stats.incr('l1_hits')
+            return value
+
+        value = cache.get(key, MISSING)
+        if value is not MISSING:
+            stats.incr('l2_hits')
+            l1.set(key, value, l1_ttl)
+            return value
+
+    with _key_lock(key):
+        # Another thread may have filled the key while we waited
+        value = MISSING if force else l1.get(key)
+        if value is not MISSING:
+            stats.incr('l1_hits')
+            return value
+
+        value = _compute_with_lock(key, compute, ttl)
+        l1.set(key, value, l1_ttl)
+        return value
+
+
+def _compute_with_lock(key, compute, ttl):
+    """Recompute a value, letting only one process do so at a time."""
+    lock_key = f'{key}:lock'
+    lock_timeout = getattr(settings, 'CACHE_LOCK_TIMEOUT', 10)
+
+    acquired = cache.add(lock_key, 1, timeout=lock_timeout)
+    if not acquired:
+        # Another process is computing: wait briefly for its result
+        stats.incr('lock_waits')
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = cache.get(key, MISSING)
+            if value is not MISSING:
+                stats.incr('l2_hits')
+                return value
+        logger.warning(f'Timed out waiting for cache lock on {key}')
+
+    stats.incr('misses')
+    try:
+        # Replica lag could otherwise be cached under a freshly bumped version
+        with use_primary():
+            value = compute()
+        cache.set(key, value, timeout=ttl)
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+    return value
+
+
+def cached_call(name, compute, *parts, models=(), ttl=None, l1_ttl=None,
+                force=False):
+    """Shortcut for ``get_or_set(make_key(name, *parts, models=models), ...)``."""
+    return get_or_set(
+        make_key(name, *parts, models=models), compute,
+        ttl=ttl, l1_ttl=l1_ttl, force=force,
+    )
+
+
+def clear():
+    """Clear L1 and L2 and reset counters (used by tests and deploys)."""
+    l1.clear()
+    cache.clear()
+    stats.reset()
@@ -0,0 +1,161 @@
+"""
+Database routing for an optional read replica.
+
+Reads go to the ``replica`` alias only inside ``use_replica()``, which the
+``replica_reads`` view decorator enters for safe (GET/HEAD) requests that
+are not pinned to the primary. Everything else, including all writes,
+admin, and any request made shortly after the same session wrote
+something, stays on ``default``.
+
+Usage:
+    @replica_reads
+    def beer_list(request):
+        ...
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('gbb.db')
+
+REPLICA_ALIAS = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+@contextmanager
+def use_replica():
+    """Send reads made inside the block to the replica, if healthy."""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Keep reads made inside the block on the primary."""
+    token = _read_from_replica.set(False)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class _LagMonitor:
+    """Measures replica lag, re-checking at most every few seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = float('-inf')
+        self._lag = 0.0
+
+    def lag(self):
+        interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5)
+        with self._lock:
+            if time.monotonic() - self._checked_at >= interval:
+                self._lag = self._measure()
+                self._checked_at = time.monotonic()
+            return self._lag
+
+    def reset(self):
+        with self._lock:
+            self._checked_at = float('-inf')
+            self._lag = 0.0
+
+    @staticmethod
+    def _measure():
+        """
+        Return replica lag in seconds.
+
+        Only PostgreSQL replicas report lag; other backends are assumed to
+        be in sync. An unreachable replica reports infinite lag.
+        """
+        connection = connections[REPLICA_ALIAS]
+        if connection.vendor != 'postgresql':
+            return 0.0
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+                    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                )
+                row = cursor.fetchone()
+            return float(row[0] or 0.0)
+        except Exception as e:
+            logger.warning(f'Could not measure replica lag: {e}')
+            return float('inf')
+
+
+lag_monitor = _LagMonitor()
+
+
+def replica_lag():
+    """Return the current replica lag in seconds (0 without a replica)."""
+    if not replica_configured():
+        return 0.0
+    return lag_monitor.lag()
+
+
+def pin_seconds():
+    """How long a session stays on the primary after it writes."""
+    lag = replica_lag()
+    if lag == float('inf'):
+        lag = 0.0
+    return max(getattr(settings, 'REPLICA_PIN_SECONDS', 5), lag)
+
+
+class ReplicaRouter:
+    """
+    Route reads to the replica inside ``use_replica()``, writes to default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or not replica_configured():
+            return 'default'
+        if model._meta.label_lower in getattr(settings, 'REPLICA_PRIMARY_MODELS', ()):
+            return 'default'
+        if replica_lag() > getattr(settings, 'REPLICA_MAX_LAG', 10):
+            return 'default'
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication
+        return db == 'default'
+
+
+def replica_reads(view_func):
+    """
+    Decorator sending a view's reads to the replica.
+
+    Only applies to safe requests that ``ReplicaPinningMiddleware`` has not
+    pinned to the primary.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS or getattr(request, 'pin_primary', False):
+            return view_func(request, *args, **kwargs)
+        with use_replica():
+            return view_func(request, *args, **kwargs)
+    return wrapper
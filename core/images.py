@@ -0,0 +1,423 @@
+"""
+Responsive image derivatives.
+
+Each source image is hashed and resized to the configured widths in every
+modern format Pillow can write (AVIF when available, WebP). Derivatives
+are stored as ``derivatives/<hash[:2]>/<hash>/<width>.<ext>`` in the
+default storage, so identical images (re-scrapes, duplicate uploads) share
+one set of files and are never encoded twice.
+
+The model keeps the hash, the intrinsic size, the widths that exist and a
+tiny inline placeholder (LQIP), so ``{% responsive_image %}`` can build
+``srcset``, reserve the image's box and paint a blurred preview without
+touching the disk.
+
+Processing runs as a queued job (see ``process_instance_image``); until
+it finishes, pages keep serving the original upload.
+
+Usage:
+    from core import images
+
+    if images.needs_derivatives(beer):
+        images.generate_for_instance(beer)
+"""
+
+import base64
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from . import cache, jobs
+
+
+logger = logging.getLogger('gbb.images')
+
+DERIVATIVES_DIR = 'derivatives'
+
+# Longest side of the inline placeholder, in pixels
+PLACEHOLDER_SIZE = 16
+
+# name: (Pillow format, MIME type, encoder options), in order of preference
+FORMATS = {
+    'avif': ('AVIF', 'image/avif', {'quality': 55, 'speed': 8}),
+    'webp': ('WEBP', 'image/webp', {'quality': 78, 'method': 4}),
+}
+
+
+def supported_formats():
+    """Configured derivative formats this Pillow build can encode."""
+    Image.init()
+    return [
+        name for name in getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', FORMATS)
+        if name in FORMATS and FORMATS[name][0] in Image.SAVE
+    ]
+
+
+def derivative_name(digest, width, fmt):
+    return f'{DERIVATIVES_DIR}/{digest[:2]}/{digest}/{width}.{fmt}'
+
+
+def derivative_url(digest, width, fmt):
+    return default_storage.url(derivative_name(digest, width, fmt))
+
+
+def file_hash(field_file):
+    """SHA-256 hex digest of a stored file's contents."""
+    digest = hashlib.sha256()
+    with field_file.open('rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def target_widths(source_width):
+    """
+    Widths to generate for a source image.
+
+    Configured widths smaller than the source, plus the source width itself
+    (capped at the largest configured width) so nothing is upscaled.
+    """
+    configured = sorted(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', [320, 640, 960]))
+    widths = {w for w in configured if w < source_width}
+    widths.add(min(source_width, configured[-1]))
+    return sorted(widths)
+
+
+def _prepare(img):
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ('RGB', 'RGBA'):
+        return img
+    has_alpha = img.mode in ('LA', 'PA') or 'transparency' in img.info
+    return img.convert('RGBA' if has_alpha else 'RGB')
+
+
+def placeholder_data_uri(img):
+    """
+    Tiny preview of an image as a ``data:`` URI (a few hundred bytes).
+
+    Transparent areas are flattened onto white, matching the padded
+    product shots, so the preview never shows through as black.
+    """
+    preview = img.copy()
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+    if preview.mode == 'RGBA':
+        flattened = Image.new('RGB', preview.size, (255, 255, 255))
+        flattened.paste(preview, mask=preview.getchannel('A'))
+        preview = flattened
+
+    output = BytesIO()
+    if 'webp' in supported_formats():
+        preview.save(output, format='WEBP', quality=40)
+        mime = 'image/webp'
+    else:
+        preview.save(output, format='JPEG', quality=40)
+        mime = 'image/jpeg'
+    return f'data:{mime};base64,{base64.b64encode(output.getvalue()).decode()}'
+
+
+# Bump a transform's version when its output changes so that
+# ``process_images`` redoes files processed by the old version
+TRANSFORM_VERSIONS = {
+    'strip-exif': 1,
+    'resize': 1,
+    'pad': 1,
+    'reencode': 1,
+}
+
+
+def transform_signature(transforms, max_size, pad_percent, quality):
+    """Identify a transform pipeline and its settings, for the batch manifest."""
+    parts = [f'{name}:{TRANSFORM_VERSIONS[name]}' for name in TRANSFORM_VERSIONS if name in transforms]
+    if 'resize' in transforms:
+        parts.append(f'max={max_size}')
+    if 'pad' in transforms:
+        parts.append(f'pad={pad_percent}')
+    parts.append(f'q={quality}')
+    return ','.join(parts)
+
+
+def transform_image(path, transforms, max_size=1200, pad_percent=12, quality=85):
+    """
+    Apply batch transforms to one image file.
+
+    Touches neither the database nor storage, so it can run in a worker
+    process. Downscaled JPEGs are decoded in draft mode, which lets libjpeg
+    scale by up to 8x while decoding instead of inflating every pixel.
+
+    Args:
+        path: Image file on disk
+        transforms: Names from ``TRANSFORM_VERSIONS``
+        max_size: Longest side after ``resize``
+        pad_percent: White border added on each side by ``pad``
+        quality: JPEG/WebP quality when encoding
+
+    Returns:
+        Encoded bytes, or None if the file is best left as it is
+    """
+    with Image.open(path) as img:
+        image_format = img.format or 'JPEG'
+        target = None
+        if 'resize' in transforms and max(img.size) > max_size:
+            scale = max_size / max(img.size)
+            target = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+            if image_format == 'JPEG':
+                img.draft(img.mode, target)
+        img.load()
+        info = dict(img.info)
+
+    changed = False
+    if 'strip-exif' in transforms and ('exif' in info or 'xmp' in info):
+        img = ImageOps.exif_transpose(img)
+        changed = True
+    if target is not None:
+        img = img.resize(target, Image.Resampling.LANCZOS)
+        changed = True
+    if 'pad' in transforms and pad_percent:
+        if img.mode not in ('RGB', 'L'):
+            img = _prepare(img)
+            if img.mode == 'RGBA':
+                flattened = Image.new('RGB', img.size, (255, 255, 255))
+                flattened.paste(img, mask=img.getchannel('A'))
+                img = flattened
+        pad_w = int(img.width * pad_percent / 100)
+        pad_h = int(img.height * pad_percent / 100)
+        padded = Image.new(img.mode, (img.width + 2 * pad_w, img.height + 2 * pad_h), 'white')
+        padded.paste(img, (pad_w, pad_h))
+        img = padded
+        changed = True
+    if not changed and 'reencode' not in transforms:
+        return None
+
+    options = {'icc_profile': info['icc_profile']} if info.get('icc_profile') else {}
+    if image_format == 'JPEG':
+        if img.mode not in ('RGB', 'L', 'CMYK'):
+            img = img.convert('RGB')
+        options.update(quality=quality, optimize=True, progressive=True)
+    elif image_format == 'WEBP':
+        options.update(quality=quality, method=4)
+    elif image_format == 'PNG':
+        options.update(optimize=True)
+    output = BytesIO()
+    img.save(output, format=image_format, **options)
+    data = output.getvalue()
+
+    # Re-encoding alone that doesn't save bytes would only cost quality
+    if not changed and len(data) >= os.path.getsize(path):
+        return None
+    return data
+
+
+def build_derivatives(field_file, force=False):
+    """
+    Write any missing derivatives for a stored image.
+
+    Returns:
+        Dict with ``hash``, ``width``, ``height``, ``placeholder`` and
+        ``formats`` (format name -> list of widths)
+    """
+    digest = file_hash(field_file)
+    with field_file.open('rb') as f:
+        img = Image.open(f)
+        img.load()
+    img = _prepare(img)
+    width, height = img.size
+    widths = target_widths(width)
+
+    formats = {}
+    for fmt in supported_formats():
+        pil_format, _, options = FORMATS[fmt]
+        for w in widths:
+            name = derivative_name(digest, w, fmt)
+            if default_storage.exists(name):
+                if not force:
+                    continue
+                default_storage.delete(name)
+            size = (w, max(1, round(height * w / width)))
+            resized = img if size == img.size else img.resize(
+                size, Image.Resampling.LANCZOS, reducing_gap=3.0
+            )
+            output = BytesIO()
+            resized.save(output, format=pil_format, **options)
+            default_storage.save(name, ContentFile(output.getvalue()))
+        formats[fmt] = widths
+
+    return {
+        'hash': digest,
+        'width': width,
+        'height': height,
+        'placeholder': placeholder_data_uri(img),
+        'formats': formats,
+    }
+
+
+def image_changed(instance, field='image'):
+    """
+    True if the stored file differs from the one loaded from the database.
+
+    Relies on ``StoredFileTrackingMixin`` recording the stored name; new
+    instances count as changed.
+    """
+    current = getattr(instance, field).name or ''
+    return current != getattr(instance, f'_stored_{field}', '')
+
+
+def remember_stored_image(instance, field='image'):
+    setattr(instance, f'_stored_{field}', getattr(instance, field).name or '')
+
+
+def shrink_image(instance, field, max_size):
+    """
+    Replace an image larger than ``max_size`` with a downscaled copy.
+
+    The copy is saved under a new name and swapped in only if the row still
+    points at the original, so a newer upload is never overwritten and the
+    original stays servable until the swap.
+
+    Returns:
+        True if the row now points at a smaller copy
+    """
+    field_file = getattr(instance, field)
+    with field_file.open('rb') as f:
+        img = Image.open(f)
+        if max(img.size) <= max_size:
+            return False
+        img.load()
+    image_format = img.format or 'JPEG'
+    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    options = {'quality': 90} if image_format == 'JPEG' else {}
+    img.save(output, format=image_format, **options)
+
+    storage = field_file.storage
+    old_name = field_file.name
+    new_name = storage.save(old_name, ContentFile(output.getvalue()))
+
+    model = type(instance)
+    updated = model.objects.filter(pk=instance.pk, **{field: old_name}).update(
+        **{field: new_name}
+    )
+    refcounted = getattr(storage, 'refcounted', False)
+    if not updated:
+        if refcounted:
+            storage.collect(new_name)
+        else:
+            storage.delete(new_name)
+        return False
+    if refcounted:
+        storage.retain(new_name)
+        storage.release(old_name)
+    elif not model.objects.filter(**{field: old_name}).exists():
+        storage.delete(old_name)
+    setattr(instance, field, new_name)
+    remember_stored_image(instance, field)
+    cache.bump_version(model)
+    return True
+
+
+@jobs.task(priority=10)
+def process_instance_image(label, pk, image_name, field='image', max_size=None):
+    """
+    Job task: shrink an uploaded image and build its derivatives.
+
+    Does nothing if the row has since been deleted or given another image.
+    ``max_size`` defaults to ``IMAGE_MAX_DIMENSION``.
+    """
+    model = apps.get_model(label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or (getattr(instance, field).name or '') != image_name:
+        return
+    if image_name:
+        if max_size is None:
+            max_size = getattr(settings, 'IMAGE_MAX_DIMENSION', 1200)
+        shrink_image(instance, field, max_size)
+    if hasattr(instance, 'image_variants'):
+        generate_for_instance(instance, field)
+
+
+def needs_derivatives(instance, field='image'):
+    """True if the image changed since derivatives were last generated."""
+    image = getattr(instance, field)
+    if not image:
+        return bool(instance.image_hash)
+    return (
+        instance.image_variants.get('source') != image.name
+        or not instance.image_placeholder
+    )
+
+
+def variants_current(instance, field='image'):
+    """
+    True if the stored derivatives were generated from the current image.
+
+    They go stale when the image is replaced, until the new one is processed.
+    """
+    image = getattr(instance, field)
+    return bool(image) and instance.image_variants.get('source') == image.name
+
+
+def generate_for_instance(instance, field='image', force=False):
+    """
+    Generate derivatives for a model instance and record them on its row.
+
+    Written with ``update()`` so no save signals fire again; cached pages
+    are invalidated by bumping the model's cache version instead. The row
+    is only updated if it still points at the same image, so a slow run
+    never records stale derivatives over a newer upload.
+
+    Returns:
+        True if the row was updated
+    """
+    image = getattr(instance, field)
+    source_name = image.name or ''
+    if image:
+        try:
+            info = build_derivatives(image, force=force)
+        except (OSError, Image.DecompressionBombError) as e:
+            logger.warning(f'Could not build derivatives for {image.name}: {e}')
+            return False
+        values = {
+            'image_hash': info['hash'],
+            'image_width': info['width'],
+            'image_height': info['height'],
+            'image_variants': {'source': image.name, 'formats': info['formats']},
+            'image_placeholder': info['placeholder'],
+        }
+    else:
+        values = {
+            'image_hash': '',
+            'image_width': None,
+            'image_height': None,
+            'image_variants': {},
+            'image_placeholder': '',
+        }
+
+    model = type(instance)
+    if not model.objects.filter(pk=instance.pk, **{field: source_name}).update(**values):
+        return False
+    for name, value in values.items():
+        setattr(instance, name, value)
+    cache.bump_version(model)
+    return True
+
+
+def srcset(instance, fmt):
+    """
+    ``srcset`` value for one format.
+
+    '' if none was generated, or if they were generated from an image
+    that has since been replaced.
+    """
+    if not variants_current(instance):
+        return ''
+    widths = instance.image_variants.get('formats', {}).get(fmt, [])
+    return ', '.join(
+        f'{derivative_url(instance.image_hash, w, fmt)} {w}w' for w in widths
+    )
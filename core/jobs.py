@@ -0,0 +1,477 @@
+"""
+A small job queue stored in the database.
+
+Slow work (image processing, scrapes, data loads) is written to the
+``Job`` table and run by ``python manage.py run_worker`` instead of inside
+the request. Enqueueing inside a transaction is atomic with the rows it
+refers to: a rollback discards the job, and workers only see it once it
+is committed.
+
+Workers claim jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+database supports it (PostgreSQL), so concurrent workers never block on
+or double-claim a row. SQLite has no row locks; there a worker claims a
+job with a conditional ``UPDATE ... WHERE status = 'queued'``, which
+SQLite's database-wide write lock serialises, and moves on to the next
+candidate if another worker won.
+
+Failed jobs are retried with exponential backoff until ``max_attempts``.
+A running job holds a lease of ``JOB_LEASE_SECONDS``, renewed by a
+heartbeat thread (and by ``report_progress``) for as long as the job
+runs, however long that is. Jobs whose lease has run out were left
+``running`` by a worker that died, and are requeued. Higher ``priority``
+runs first. A ``unique_key``
+allows only one queued or running job per key, so repeated triggers share
+one job.
+
+While a job runs, ``report_progress()`` records how far it has got and
+log records emitted on its thread (INFO and up) are stored as
+``JobLogEntry`` rows, which status endpoints stream to clients.
+
+Only functions decorated with ``@jobs.task`` can be enqueued. Arguments
+and return values must be JSON serialisable, so pass labels, ids and
+names rather than model instances.
+
+Usage:
+    from core import jobs
+
+    @jobs.task(priority=10)
+    def process_image(label, pk):
+        ...
+
+    jobs.enqueue(process_image, label, pk)
+
+    # inside a task
+    jobs.report_progress(3, 10, 'Harveys & Son')
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import (
+    IntegrityError, OperationalError, close_old_connections, connection, connections,
+    transaction,
+)
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job, JobLogEntry
+
+
+logger = logging.getLogger('gbb.jobs')
+
+# Dotted path -> function, filled in by @task
+_tasks = {}
+
+# Candidates a SQLite worker tries per claim before polling again
+CLAIM_BATCH = 10
+
+# Id of the job running in the current thread, if any
+_current_job = ContextVar('current_job', default=None)
+
+
+def task(func=None, *, priority=0, max_attempts=None):
+    """
+    Register a function as a job task.
+
+    ``priority`` and ``max_attempts`` are defaults for ``enqueue``.
+    """
+    def register(func):
+        func.job_name = f'{func.__module__}.{func.__qualname__}'
+        func.job_priority = priority
+        func.job_max_attempts = max_attempts
+        _tasks[func.job_name] = func
+        return func
+
+    if func is not None:
+        return register(func)
+    return register
+
+
+def resolve(name):
+    """Look up a registered task by dotted path, importing its module if needed."""
+    if name not in _tasks:
+        try:
+            import_string(name)
+        except ImportError:
+            pass
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f'{name} is not a registered job task') from None
+
+
+def enqueue(func, *args, priority=None, max_attempts=None, delay=None, unique_key='',
+            **kwargs):
+    """
+    Add a job running ``func(*args, **kwargs)`` to the queue.
+
+    Args:
+        func: A function decorated with ``@task``, or its dotted path
+        priority: Overrides the task's default; higher runs first
+        max_attempts: Overrides the task's default (``JOB_MAX_ATTEMPTS``)
+        delay: Seconds to wait before the job may run
+        unique_key: If a queued or running job already has this key,
+            return it instead of adding another
+
+    With ``JOBS_RUN_EAGERLY`` the job runs inline once the current
+    transaction commits, which keeps tests deterministic.
+
+    Returns:
+        The new ``Job``, or the existing one for ``unique_key``
+    """
+    func = resolve(func) if isinstance(func, str) else func
+    if _tasks.get(getattr(func, 'job_name', None)) is not func:
+        raise LookupError(f'{func!r} is not a registered job task')
+
+    if priority is None:
+        priority = func.job_priority
+    if max_attempts is None:
+        max_attempts = func.job_max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+    values = {
+        'task': func.job_name,
+        'args': list(args),
+        'kwargs': kwargs,
+        'priority': priority,
+        'max_attempts': max_attempts,
+        'run_at': timezone.now() + timedelta(seconds=delay or 0),
+        'unique_key': unique_key,
+    }
+    if not unique_key:
+        job = Job.objects.create(**values)
+    else:
+        # The partial unique constraint settles races between triggers;
+        # retry in case the existing job finished in the meantime
+        for _ in range(3):
+            existing = Job.objects.filter(unique_key=unique_key, status__in=Job.ACTIVE).first()
+            if existing is not None:
+                return existing
+            try:
+                with transaction.atomic():
+                    job = Job.objects.create(**values)
+                break
+            except IntegrityError:
+                continue
+        else:
+            raise IntegrityError(f'Could not enqueue job with unique key {unique_key!r}')
+
+    if getattr(settings, 'JOBS_RUN_EAGERLY', False):
+        transaction.on_commit(lambda: run_job(job.pk))
+    return job
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying a job that has failed ``attempts`` times."""
+    base = getattr(settings, 'JOB_RETRY_BACKOFF', 30)
+    ceiling = getattr(settings, 'JOB_RETRY_BACKOFF_MAX', 3600)
+    delay = min(base * 2 ** (attempts - 1), ceiling)
+    # Jitter so jobs that failed together don't all retry together
+    return delay * random.uniform(0.9, 1.1)
+
+
+def lease_seconds():
+    return getattr(settings, 'JOB_LEASE_SECONDS', 120)
+
+
+def _lease_expiry():
+    return timezone.now() + timedelta(seconds=lease_seconds())
+
+
+def _claim_values(worker_id):
+    return {
+        'status': Job.RUNNING,
+        'attempts': F('attempts') + 1,
+        'locked_by': worker_id,
+        'started_at': timezone.now(),
+        'lease_expires_at': _lease_expiry(),
+    }
+
+
+def claim(worker_id, job_id=None):
+    """
+    Claim the next runnable job for ``worker_id``.
+
+    Returns:
+        The claimed ``Job`` (now ``running``), or None if nothing is due
+    """
+    due = Job.objects.filter(status=Job.QUEUED, run_at__lte=timezone.now())
+    if job_id is not None:
+        due = due.filter(pk=job_id)
+    due = due.order_by('-priority', 'run_at', 'pk')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pk = due.select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+            if pk is None:
+                return None
+            Job.objects.filter(pk=pk).update(**_claim_values(worker_id))
+        return Job.objects.get(pk=pk)
+
+    for pk in list(due.values_list('pk', flat=True)[:CLAIM_BATCH]):
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            **_claim_values(worker_id)
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _retry_locked(func, attempts=5, delay=0.05):
+    """
+    Run a queue bookkeeping query, retrying while the database is locked.
+
+    SQLite reports lock contention between worker threads as an error
+    instead of waiting, which would otherwise kill the thread mid-job.
+    """
+    for attempt in range(attempts):
+        try:
+            return func()
+        except OperationalError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(delay * 2 ** attempt)
+
+
+def current_job_id():
+    """Id of the job running in this thread, or None outside a job."""
+    return _current_job.get()
+
+
+def report_progress(done, total=None, message=''):
+    """
+    Record progress for the job running in this thread, renewing its lease.
+
+    Does nothing outside a job, so commands can call it unconditionally.
+    """
+    job_id = _current_job.get()
+    if job_id is None:
+        return
+    Job.objects.filter(pk=job_id, status=Job.RUNNING).update(
+        progress={'done': done, 'total': total, 'message': message},
+        lease_expires_at=_lease_expiry(),
+    )
+
+
+class Heartbeat(threading.Thread):
+    """Renew a running job's lease until stopped."""
+
+    def __init__(self, job):
+        super().__init__(name=f'gbb-heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.mine = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by)
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            # Several renewals per lease, so one slow write doesn't lose it
+            while not self.stopped.wait(lease_seconds() / 4):
+                try:
+                    renewed = _retry_locked(lambda: self.mine.update(lease_expires_at=_lease_expiry()))
+                except Exception:
+                    logger.exception(f'Could not renew the lease on {self.job}')
+                    continue
+                if not renewed and not self.stopped.is_set():
+                    logger.warning(f'Lost the lease on {self.job}')
+                    return
+        finally:
+            # Only touches this thread's connection, if it opened one
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class JobLogHandler(logging.Handler):
+    """Store log records emitted by a running job as ``JobLogEntry`` rows."""
+
+    def __init__(self, level=logging.INFO):
+        super().__init__(level)
+        self._local = threading.local()
+
+    def emit(self, record):
+        job_id = _current_job.get()
+        # Saving can itself log; don't recurse
+        if job_id is None or getattr(self._local, 'busy', False):
+            return
+        self._local.busy = True
+        try:
+            JobLogEntry.objects.create(
+                job_id=job_id,
+                level=record.levelname,
+                logger=record.name[:100],
+                message=record.getMessage(),
+            )
+        except Exception:
+            self.handleError(record)
+        finally:
+            self._local.busy = False
+
+
+_log_handler = JobLogHandler()
+
+
+def _install_log_handler():
+    root = logging.getLogger()
+    if _log_handler not in root.handlers:
+        root.addHandler(_log_handler)
+
+
+def execute(job):
+    """
+    Run a claimed job and record the outcome.
+
+    A failure is rescheduled with backoff while attempts remain, otherwise
+    the job is marked failed. The job's lease is renewed until it
+    returns. Updates are conditional on the job still
+    belonging to this worker, so a job requeued as stale isn't clobbered.
+
+    Returns:
+        The job's final status for this attempt
+    """
+    mine = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by)
+    _install_log_handler()
+    token = _current_job.set(job.pk)
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        result = resolve(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            status = Job.QUEUED
+            delay = backoff(job.attempts)
+            logger.warning(f'Job {job} failed, retrying in {delay:.0f}s', exc_info=True)
+            _retry_locked(lambda: mine.update(
+                status=status, locked_by='', last_error=error,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            ))
+        else:
+            status = Job.FAILED
+            logger.error(f'Job {job} failed after {job.attempts} attempts', exc_info=True)
+            _retry_locked(lambda: mine.update(
+                status=status, last_error=error, finished_at=timezone.now()
+            ))
+    else:
+        status = Job.SUCCEEDED
+        _retry_locked(lambda: mine.update(
+            status=status, result=result, finished_at=timezone.now()
+        ))
+    finally:
+        heartbeat.stop()
+        _current_job.reset(token)
+    return status
+
+
+def run_job(job_id):
+    """Claim and run one specific job inline, if it is still queued."""
+    job = claim(f'{worker_name()}-inline', job_id=job_id)
+    if job is not None:
+        execute(job)
+
+
+def requeue_stale():
+    """
+    Requeue running jobs whose lease has expired: their worker died.
+
+    Jobs out of attempts are marked failed instead. A job whose worker is
+    alive keeps renewing its lease, so is never touched, however long it
+    runs.
+
+    Returns:
+        Number of jobs touched
+    """
+    stale = Job.objects.filter(status=Job.RUNNING, lease_expires_at__lt=timezone.now())
+    error = 'Worker stopped responding'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error=error, finished_at=timezone.now()
+    )
+    requeued = stale.update(
+        status=Job.QUEUED, locked_by='', last_error=error, run_at=timezone.now()
+    )
+    if failed or requeued:
+        logger.warning(f'Recovered stale jobs: {requeued} requeued, {failed} failed')
+    return failed + requeued
+
+
+def prune_finished():
+    """
+    Delete finished jobs (and their logs) older than ``JOB_RETENTION_DAYS``.
+
+    Returns:
+        Number of jobs deleted
+    """
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'JOB_RETENTION_DAYS', 14))
+    _, deleted = Job.objects.filter(
+        status__in=Job.FINISHED, finished_at__lt=cutoff
+    ).delete()
+    return deleted.get(Job._meta.label, 0)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class Worker:
+    """
+    Poll the queue and run jobs on a pool of threads.
+
+    Each thread claims and runs one job at a time with its own database
+    connection. ``burst`` workers exit once the queue is empty.
+    """
+
+    def __init__(self, threads=1, poll_interval=None, burst=False):
+        self.threads = max(1, threads)
+        self.poll_interval = (
+            poll_interval if poll_interval is not None
+            else getattr(settings, 'JOB_POLL_INTERVAL', 1.0)
+        )
+        self.burst = burst
+        self.stopping = threading.Event()
+        self.processed = 0
+        self._lock = threading.Lock()
+
+    def stop(self):
+        """Finish the jobs in hand, then exit."""
+        self.stopping.set()
+
+    def run(self):
+        requeue_stale()
+        prune_finished()
+        workers = [
+            threading.Thread(
+                target=self._loop, args=(f'{worker_name()}-{i}',),
+                name=f'gbb-worker-{i}',
+            )
+            for i in range(self.threads)
+        ]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+    def _loop(self, worker_id):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                job = _retry_locked(lambda: claim(worker_id))
+                if job is None:
+                    if self.burst:
+                        return
+                    requeue_stale()
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                logger.info(f'{worker_id} running {job}')
+                execute(job)
+                with self._lock:
+                    self.processed += 1
+        finally:
+            connections.close_all()
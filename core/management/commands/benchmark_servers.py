@@ -0,0 +1,180 @@
+"""
+Django management command to compare WSGI and ASGI throughput.
+
+Starts gunicorn with sync workers (WSGI) and with uvicorn workers (ASGI)
+at the same worker count, drives each with the same concurrent load and
+reports requests/sec and latency percentiles.
+
+Usage:
+    python manage.py benchmark_servers
+    python manage.py benchmark_servers --workers 4 --concurrency 64 --duration 20
+    python manage.py benchmark_servers --path / --path /reviews/beer/some-slug/
+"""
+
+import os
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+DEFAULT_PATHS = ['/', '/reviews/']
+
+SERVERS = {
+    'wsgi': [
+        'gunicorn', 'greatbritishbeer.wsgi:application',
+        '--worker-class', 'sync',
+    ],
+    'asgi': [
+        'gunicorn', 'greatbritishbeer.asgi:application',
+        '-c', 'greatbritishbeer/gunicorn_asgi.py',
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark requests/sec of the WSGI and ASGI deployments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Worker processes for both servers (default: 2)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=32,
+            help='Concurrent client connections (default: 32)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Seconds of load per server (default: 10)'
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help=f'URL path to request; repeatable (default: {" ".join(DEFAULT_PATHS)})'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8150,
+            help='Port to run the servers on, one at a time (default: 8150)'
+        )
+        parser.add_argument(
+            '--server',
+            choices=sorted(SERVERS),
+            action='append',
+            dest='servers',
+            help='Only benchmark this server; repeatable (default: both)'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS
+        results = {}
+        for name in options['servers'] or sorted(SERVERS, reverse=True):
+            self.stdout.write(f'Starting {name} with {options["workers"]} workers...')
+            process = self._start_server(name, options['port'], options['workers'])
+            try:
+                base_url = f'http://127.0.0.1:{options["port"]}'
+                self._wait_until_ready(base_url, process)
+                # Warm caches and connections before measuring
+                self._run_load(base_url, paths, options['concurrency'], 2.0)
+                results[name] = self._run_load(
+                    base_url, paths, options['concurrency'], options['duration']
+                )
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            self._report(name, results[name])
+
+        if {'wsgi', 'asgi'} <= results.keys() and results['wsgi']['rps']:
+            ratio = results['asgi']['rps'] / results['wsgi']['rps']
+            self.stdout.write(self.style.SUCCESS(f'ASGI/WSGI throughput: {ratio:.2f}x'))
+
+    def _start_server(self, name, port, workers):
+        command = SERVERS[name] + [
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers),
+            '--log-level', 'warning',
+            '--access-logfile', '/dev/null',
+        ]
+        try:
+            return subprocess.Popen(
+                command, cwd=settings.BASE_DIR, env=os.environ.copy(),
+                stdout=subprocess.DEVNULL,
+            )
+        except FileNotFoundError:
+            raise CommandError('gunicorn is not installed (pip install -r requirements.txt)')
+
+    def _wait_until_ready(self, base_url, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'Server exited with code {process.returncode}')
+            try:
+                requests.get(base_url + '/', timeout=2)
+                return
+            except requests.RequestException:
+                time.sleep(0.2)
+        raise CommandError(f'Server did not start within {timeout}s')
+
+    def _run_load(self, base_url, paths, concurrency, duration):
+        """Request ``paths`` round-robin from ``concurrency`` threads."""
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+
+        def client(offset):
+            nonlocal errors
+            session = requests.Session()
+            i = offset
+            while time.monotonic() < deadline:
+                url = base_url + paths[i % len(paths)]
+                i += 1
+                start = time.monotonic()
+                try:
+                    ok = session.get(url, timeout=30).status_code < 500
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.monotonic() - start
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors += 1
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(client, range(concurrency)))
+        elapsed = time.monotonic() - start
+
+        latencies.sort()
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': len(latencies) / elapsed if elapsed else 0.0,
+            'p50': statistics.median(latencies) if latencies else 0.0,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        }
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f'  {name}: {result["rps"]:.1f} req/s, '
+            f'p50 {result["p50"] * 1000:.1f} ms, p95 {result["p95"] * 1000:.1f} ms, '
+            f'{result["requests"]} ok, {result["errors"]} errors'
+        )
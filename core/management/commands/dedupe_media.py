@@ -0,0 +1,119 @@
+"""
+Django management command to move media into content-addressed storage.
+
+Hashes every file in the content-addressed media directories, copies each
+distinct file to its ``<dir>/<hash[:2]>/<hash><ext>`` name, points beer,
+brewery, category and avatar fields at it, recounts references and
+deletes the old copies. Duplicates (``abbot-ale-greene-king.jpg`` and
+``abbot-ale-greene-king_XmvvEBA.jpg``) collapse into one file.
+
+Usage:
+    python manage.py dedupe_media --dry-run
+    python manage.py dedupe_media
+    python manage.py dedupe_media --keep-originals
+"""
+
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import cache
+from core.models import StoredFile, StoredFileTrackingMixin
+from core.storage import content_hash, count_references, repoint
+
+
+def walk(storage, path):
+    """Yield the names of all files under ``path``."""
+    if not storage.exists(path):
+        return
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield f'{path}/{name}'
+    for directory in directories:
+        yield from walk(storage, f'{path}/{directory}')
+
+
+class Command(BaseCommand):
+    help = 'Collapse duplicate media files into content-addressed storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without touching files or rows'
+        )
+        parser.add_argument(
+            '--keep-originals',
+            action='store_true',
+            help='Leave the old files in place after rewriting references'
+        )
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        if not getattr(storage, 'refcounted', False):
+            raise CommandError(
+                'DEFAULT_FILE_STORAGE must be core.storage.ContentAddressedStorage'
+            )
+        dry_run = options['dry_run']
+
+        groups = defaultdict(list)
+        total_bytes = 0
+        for directory in settings.MEDIA_CONTENT_ADDRESSED_DIRS:
+            for name in walk(storage, directory):
+                with storage.open(name, 'rb') as f:
+                    digest, size = content_hash(f)
+                groups[digest].append(name)
+                total_bytes += size
+
+        files = sum(len(names) for names in groups.values())
+        self.stdout.write(f'Found {files} files ({total_bytes / 1e6:.1f} MB), {len(groups)} distinct')
+
+        moved = rewritten = removed = 0
+        freed = 0
+        for digest, names in sorted(groups.items()):
+            target = storage.address(names[0], digest)
+            stale = [name for name in names if name != target]
+            if not stale:
+                continue
+            if dry_run:
+                self.stdout.write(f'  {", ".join(stale)} -> {target}')
+                moved += len(stale)
+                continue
+
+            with transaction.atomic():
+                if target not in names:
+                    target, _ = storage.adopt(names[0])
+                for name in stale:
+                    rewritten += len(repoint(name, target))
+                StoredFile.objects.filter(name__in=stale).delete()
+                StoredFile.objects.update_or_create(
+                    name=target,
+                    defaults={
+                        'sha256': digest,
+                        'size': storage.size(target),
+                        'refcount': count_references(target),
+                    },
+                )
+            moved += len(stale)
+
+            if not options['keep_originals']:
+                for name in stale:
+                    freed += storage.size(name)
+                    storage.delete(name)
+                    removed += 1
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'[DRY RUN] {moved} files would be moved'))
+            return
+
+        for model in apps.get_models():
+            if issubclass(model, StoredFileTrackingMixin):
+                cache.bump_version(model)
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} files, rewrote {rewritten} references, '
+            f'removed {removed} old files ({freed / 1e6:.1f} MB freed)'
+        ))
@@ -0,0 +1,97 @@
+"""
+Django management command to backfill responsive image derivatives.
+
+Generates AVIF/WebP derivatives for beer, brewery and category images
+that don't have them (or a placeholder) yet, or whose image changed since.
+
+Usage:
+    python manage.py generate_image_derivatives
+    python manage.py generate_image_derivatives --model beer --workers 8
+    python manage.py generate_image_derivatives --force
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import images
+from reviews.models import Beer, Brewery, Category
+
+
+MODELS = {
+    'beer': Beer,
+    'brewery': Brewery,
+    'category': Category,
+}
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive image derivatives for beers, breweries and categories'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            choices=sorted(MODELS),
+            action='append',
+            dest='models',
+            help='Only process this model; repeatable (default: all)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of parallel worker threads (default: 4)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-encode derivatives even if they are up to date'
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+        start = time.monotonic()
+
+        instances = []
+        for name in options['models'] or MODELS:
+            queryset = MODELS[name].objects.exclude(image='').exclude(image__isnull=True)
+            instances.extend(
+                instance for instance in queryset.iterator()
+                if force or images.needs_derivatives(instance)
+            )
+
+        formats = ', '.join(images.supported_formats()) or 'none'
+        self.stdout.write(
+            f'Processing {len(instances)} images ({formats}) with {options["workers"]} workers...'
+        )
+
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(self._process, instance, force): instance
+                for instance in instances
+            }
+            for future in as_completed(futures):
+                instance = futures[future]
+                if future.result():
+                    done += 1
+                else:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'  [!] {instance.image.name}'))
+
+        elapsed = time.monotonic() - start
+        summary = f'Generated derivatives for {done} images in {elapsed:.1f}s'
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{summary} ({failed} failed)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+
+    @staticmethod
+    def _process(instance, force):
+        try:
+            return images.generate_for_instance(instance, force=force)
+        finally:
+            # Each worker thread has its own connection; don't leak it
+            connections.close_all()
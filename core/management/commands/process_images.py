@@ -0,0 +1,254 @@
+"""
+Django management command to batch-process beer, brewery and category images.
+
+Runs image transforms (strip EXIF, resize, pad, re-encode) across a pool
+of worker processes. A manifest records which transform versions produced
+each file, so later runs only touch new or changed files and padding is
+never applied twice. Processed files replace the originals through the
+storage; derivatives are regenerated by queued jobs.
+
+Usage:
+    python manage.py process_images
+    python manage.py process_images --transform pad --pad 12 --model beer
+    python manage.py process_images --workers 8 --dry-run
+    python manage.py process_images --force
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import cache, images, jobs
+from core.storage import count_references, repoint
+from reviews.models import Beer, Brewery, Category
+
+
+MODELS = {
+    'beer': Beer,
+    'brewery': Brewery,
+    'category': Category,
+}
+
+DEFAULT_TRANSFORMS = ['strip-exif', 'resize', 'reencode']
+
+
+def load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(path, manifest):
+    """Write the manifest atomically, so an interrupted run can't corrupt it."""
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, suffix='.tmp') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f.name, path)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Transform beer, brewery and category images in parallel, skipping ones already done'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            choices=sorted(MODELS),
+            action='append',
+            dest='models',
+            help='Only process this model; repeatable (default: all)'
+        )
+        parser.add_argument(
+            '--transform',
+            choices=list(images.TRANSFORM_VERSIONS),
+            action='append',
+            dest='transforms',
+            help=f'Transform to apply; repeatable (default: {", ".join(DEFAULT_TRANSFORMS)})'
+        )
+        parser.add_argument(
+            '--pad',
+            type=int,
+            default=12,
+            help='Padding percentage for the pad transform (default: 12)'
+        )
+        parser.add_argument(
+            '--max-size',
+            type=int,
+            default=None,
+            help='Longest side for the resize transform (default: IMAGE_MAX_DIMENSION)'
+        )
+        parser.add_argument(
+            '--quality',
+            type=int,
+            default=85,
+            help='JPEG/WebP encoding quality (default: 85)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes (default: CPU count)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Process every file, ignoring the manifest'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the files that would be processed'
+        )
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        transforms = options['transforms'] or DEFAULT_TRANSFORMS
+        settings_args = {
+            'max_size': options['max_size'] or settings.IMAGE_MAX_DIMENSION,
+            'pad_percent': options['pad'],
+            'quality': options['quality'],
+        }
+        signature = images.transform_signature(transforms, **settings_args)
+        manifest_path = settings.IMAGE_MANIFEST_PATH
+        manifest = load_manifest(manifest_path)
+
+        rows = {}
+        for name in options['models'] or MODELS:
+            model = MODELS[name]
+            queryset = model.objects.exclude(image='').exclude(image__isnull=True)
+            for pk, image in queryset.values_list('pk', 'image'):
+                rows.setdefault(image, []).append((model, pk))
+
+        todo = []
+        skipped = missing = 0
+        for name in sorted(rows):
+            try:
+                path = storage.path(name)
+                stat = os.stat(path)
+            except (NotImplementedError, FileNotFoundError):
+                missing += 1
+                continue
+            if not options['force'] and self._is_done(manifest.get(name), signature, path, stat):
+                skipped += 1
+                continue
+            todo.append((name, path, stat.st_size))
+
+        self.stdout.write(
+            f'{len(todo)} of {len(rows)} images need [{signature}] '
+            f'({skipped} up to date, {missing} missing)'
+        )
+        if options['dry_run']:
+            for name, _, _ in todo:
+                self.stdout.write(f'  {name}')
+            return
+        if not todo:
+            return
+
+        processed = unchanged = failed = 0
+        bytes_in = bytes_out = 0
+        touched = set()
+        start = time.monotonic()
+        # Workers only read files and return bytes; all database and
+        # storage writes happen here
+        try:
+            with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+                futures = {
+                    pool.submit(images.transform_image, path, transforms, **settings_args): (name, size)
+                    for name, path, size in todo
+                }
+                for future in as_completed(futures):
+                    name, size = futures[future]
+                    bytes_in += size
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        failed += 1
+                        self.stdout.write(self.style.ERROR(f'  [!] {name}: {e}'))
+                        continue
+
+                    if data is None:
+                        unchanged += 1
+                        bytes_out += size
+                        self._record(manifest, name, signature, storage)
+                        continue
+
+                    new_name = self._replace(storage, name, data, rows[name])
+                    touched.update(model for model, _ in rows[name])
+                    manifest.pop(name, None)
+                    self._record(manifest, new_name, signature, storage)
+                    processed += 1
+                    bytes_out += len(data)
+        finally:
+            save_manifest(manifest_path, manifest)
+            for model in touched:
+                cache.bump_version(model)
+
+        elapsed = time.monotonic() - start
+        done = processed + unchanged
+        summary = (
+            f'Processed {processed} images, {unchanged} already optimal, {failed} failed '
+            f'in {elapsed:.1f}s ({done / elapsed:.1f} images/s, {bytes_in / 1e6 / elapsed:.1f} MB/s); '
+            f'{bytes_in / 1e6:.1f} MB -> {bytes_out / 1e6:.1f} MB'
+        )
+        if failed:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+
+    @staticmethod
+    def _is_done(entry, signature, path, stat):
+        """True if the manifest says this exact file went through this pipeline."""
+        if not entry or entry['pipeline'] != signature:
+            return False
+        if (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            return True
+        # Touched but maybe not changed (copied, restored from backup)
+        if entry['sha256'] == file_sha256(path):
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            return True
+        return False
+
+    @staticmethod
+    def _record(manifest, name, signature, storage):
+        path = storage.path(name)
+        stat = os.stat(path)
+        manifest[name] = {
+            'pipeline': signature,
+            'sha256': file_sha256(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    @staticmethod
+    def _replace(storage, name, data, rows):
+        """Store processed bytes, point rows at them and drop the original."""
+        new_name = storage.save(name, ContentFile(data))
+        with transaction.atomic():
+            repoint(name, new_name, follow_source=False)
+            if getattr(storage, 'refcounted', False):
+                storage.recount(new_name)
+                storage.recount(name)
+            elif not count_references(name):
+                transaction.on_commit(lambda: storage.delete(name))
+            # Derivatives and the placeholder were built from the old bytes
+            for model, pk in rows:
+                jobs.enqueue(images.process_instance_image, model._meta.label_lower, pk, new_name)
+        return new_name
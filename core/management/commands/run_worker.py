@@ -0,0 +1,97 @@
+"""
+Django management command to run background job workers.
+
+Each process runs ``--threads`` worker threads that claim jobs from the
+database queue (see core/jobs.py). SIGTERM/SIGINT stop claiming new jobs
+and let running ones finish.
+
+Usage:
+    python manage.py run_worker
+    python manage.py run_worker --processes 2 --threads 4
+    python manage.py run_worker --burst    # drain the queue and exit
+"""
+
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+def _serve(threads, poll_interval, burst):
+    """Run one worker process until it is told to stop."""
+    worker = jobs.Worker(threads=threads, poll_interval=poll_interval, burst=burst)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *args: worker.stop())
+    worker.run()
+    return worker.processed
+
+
+class Command(BaseCommand):
+    help = 'Run workers that process queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Number of worker processes (default: 1)'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=2,
+            help='Worker threads per process (default: 2)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help='Seconds between polls of an empty queue (default: JOB_POLL_INTERVAL)'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty'
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        threads = max(1, options['threads'])
+        serve_args = (threads, options['poll_interval'], options['burst'])
+        self.stdout.write(
+            f'Starting {processes} worker process(es) with {threads} thread(s) each...'
+        )
+
+        if processes == 1:
+            processed = _serve(*serve_args)
+            self.stdout.write(self.style.SUCCESS(f'Worker stopped after {processed} jobs'))
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(target=_serve, args=serve_args, name=f'gbb-worker-{i}')
+            for i in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, forward)
+        for child in children:
+            child.join()
+
+        failed = sum(1 for child in children if child.exitcode)
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} worker process(es) exited with errors'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Workers stopped'))
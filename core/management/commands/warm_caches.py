@@ -0,0 +1,176 @@
+"""
+Django management command to precompute hot cache keys.
+
+Run after a deploy or a scrape so the first visitors do not pay for
+cold caches. Only the home page blocks, the first pages of the biggest
+categories and breweries, the most reviewed beers' stats and the sitemaps
+are warmed. Listing entries expire after ``CACHE_DEFAULT_TTL``, so warming
+every brewery would mostly fill the cache with pages nobody asks for in
+time.
+
+With a per-process cache (``locmem``, no ``REDIS_URL``) nothing warmed
+here would be seen by the web processes, so the command does nothing.
+
+Usage:
+    python manage.py warm_caches
+    python manage.py warm_caches --top-beers 100 --top-listings 50 --workers 8 --force
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count, Q
+
+from core import cache
+from core.views import HOME_BLOCKS, get_home_block
+from reviews.models import Beer, Brewery, Category
+from reviews.sitemaps import build_sitemaps
+from reviews.views import (
+    get_beer_stats,
+    get_brewery_first_page,
+    get_category_first_page,
+)
+
+
+# Cache backends that keep entries inside the process that set them
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+class Command(BaseCommand):
+    help = 'Precompute home blocks, listing pages, beer stats and sitemaps'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-beers',
+            type=int,
+            default=50,
+            help='Number of most-reviewed beers to warm stats for (default: 50)'
+        )
+        parser.add_argument(
+            '--top-listings',
+            type=int,
+            default=20,
+            help='Number of categories and of breweries with the most beers '
+                 'to warm first pages for (default: 20)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of parallel worker threads (default: 4)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute keys even if they are already cached'
+        )
+        parser.add_argument(
+            '--skip-sitemaps',
+            action='store_true',
+            help='Do not rebuild sitemap shards'
+        )
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES['default']['BACKEND']
+        if backend in LOCAL_CACHE_BACKENDS:
+            self.stdout.write(self.style.WARNING(
+                f'Skipping: {backend} is not shared between processes, '
+                f'so warmed entries would not reach the web processes'
+            ))
+            return
+
+        force = options['force']
+        start = time.monotonic()
+
+        tasks = self._collect_tasks(options['top_beers'], options['top_listings'], force)
+        if not options['skip_sitemaps']:
+            tasks.append(('sitemaps', build_sitemaps))
+
+        self.stdout.write(
+            f'Warming {len(tasks)} cache entries with {options["workers"]} workers...'
+        )
+
+        timings = []
+        failures = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(self._run_task, func): name
+                for name, func in tasks
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    timings.append((name, future.result()))
+                except Exception as e:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f'  [!] {name}: {e}'))
+
+        # Slowest first, so the expensive keys stand out
+        for name, duration in sorted(timings, key=lambda t: t[1], reverse=True)[:15]:
+            self.stdout.write(f'  {duration * 1000:8.1f} ms  {name}')
+
+        total = time.monotonic() - start
+        summary = f'Warmed {len(timings)} entries in {total:.2f}s'
+        if failures:
+            self.stdout.write(self.style.WARNING(f'{summary} ({failures} failed)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+
+        counts = cache.stats.snapshot()
+        self.stdout.write(
+            f'Cache: {counts["misses"]} computed, '
+            f'{counts["l1_hits"] + counts["l2_hits"]} already warm'
+        )
+
+    def _collect_tasks(self, top_beers, top_listings, force):
+        """Build ``(name, callable)`` pairs for every key to warm."""
+        tasks = [
+            (f'home:{name}', lambda name=name: get_home_block(name, force=force))
+            for name in HOME_BLOCKS
+        ]
+
+        top_category_ids = Category.objects.annotate(
+            beer_count=Count('beers')
+        ).order_by('-beer_count', 'pk').values_list('pk', flat=True)[:top_listings]
+        for category_id in top_category_ids:
+            tasks.append((
+                f'category_page:{category_id}',
+                lambda pk=category_id: get_category_first_page(pk, force=force)
+            ))
+
+        top_brewery_ids = Brewery.objects.annotate(
+            beer_count=Count('beers')
+        ).order_by('-beer_count', 'pk').values_list('pk', flat=True)[:top_listings]
+        for brewery_id in top_brewery_ids:
+            tasks.append((
+                f'brewery_page:{brewery_id}',
+                lambda pk=brewery_id: get_brewery_first_page(pk, force=force)
+            ))
+
+        top_beer_ids = Beer.objects.annotate(
+            approved_reviews=Count('reviews', filter=Q(reviews__is_approved=True))
+        ).order_by('-approved_reviews').values_list('pk', flat=True)[:top_beers]
+        for beer_id in top_beer_ids:
+            tasks.append((
+                f'beer_stats:{beer_id}',
+                lambda pk=beer_id: get_beer_stats(pk, force=force)
+            ))
+
+        return tasks
+
+    @staticmethod
+    def _run_task(func):
+        """Run one warming task and return its duration in seconds."""
+        start = time.monotonic()
+        try:
+            func()
+        finally:
+            # Each worker thread has its own connection; don't leak it
+            connections.close_all()
+        return time.monotonic() - start
@@ -0,0 +1,64 @@
+"""
+Custom middleware for the Great British Beer project.
+"""
+
+import math
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .db_routers import SAFE_METHODS, pin_seconds
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pin a client to the primary database for a while after it writes.
+
+    Any unsafe request (POST, PUT, DELETE...) sets a short-lived cookie
+    holding a deadline that covers the current replica lag, so the redirect
+    that usually follows, and the session user after login, read their own
+    writes. A cookie rather than the session, so anonymous POSTs don't
+    create session rows.
+    """
+
+    COOKIE_NAME = 'gbb_pin_primary'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.check_pin(request)
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            self.pin(response)
+        return response
+
+    async def __acall__(self, request):
+        self.check_pin(request)
+        response = await self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            # Measuring replica lag may query the database
+            await sync_to_async(self.pin)(response)
+        return response
+
+    def check_pin(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(self.COOKIE_NAME, 0))
+        except ValueError:
+            pinned_until = 0
+        request.pin_primary = pinned_until > time.time()
+
+    def pin(self, response):
+        seconds = pin_seconds()
+        response.set_cookie(
+            self.COOKIE_NAME, f'{time.time() + seconds:.3f}',
+            max_age=math.ceil(seconds), httponly=True, samesite='Lax',
+            secure=settings.SESSION_COOKIE_SECURE,
+        )
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('level', models.CharField(max_length=10)),
+                ('logger', models.CharField(max_length=100)),
+                ('message', models.TextField()),
+            ],
+            options={
+                'verbose_name_plural': 'job log entries',
+                'ordering': ['pk'],
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='unique_key',
+            field=models.CharField(blank=True, help_text='At most one queued or running job may have a given key', max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running']), models.Q(('unique_key', ''), _negated=True)), fields=('unique_key',), name='core_job_unique_active'),
+        ),
+        migrations.AddField(
+            model_name='joblogentry',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_entries', to='core.job'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:30
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def lease_running_jobs(apps, schema_editor):
+    # Jobs already running keep the old one-hour timeout
+    Job = apps.get_model('core', 'Job')
+    Job.objects.filter(status='running').update(
+        lease_expires_at=models.F('started_at') + timedelta(hours=1)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_stored_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Renewed while the job runs; a running job past it is orphaned', null=True),
+        ),
+        migrations.RunPython(lease_running_jobs, migrations.RunPython.noop),
+    ]
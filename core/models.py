@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 
@@ -13,3 +14,195 @@ class NewsletterSubscription(models.Model):
     
     def __str__(self):
         return self.email
+
+
+class StoredFileTrackingMixin(models.Model):
+    """
+    Remember the stored names of file fields as loaded from the database.
+
+    Lets save handlers tell whether a file actually changed without an
+    extra query (see ``core.images.image_changed``), and keeps reference
+    counts in a refcounted storage (see ``core/storage.py``) up to date.
+    """
+    tracked_file_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        for field in cls.tracked_file_fields:
+            if field in field_names:
+                setattr(instance, f'_stored_{field}', values[field_names.index(field)] or '')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        for field in self.tracked_file_fields:
+            if fields is None or field in fields:
+                setattr(self, f'_stored_{field}', getattr(self, field).name or '')
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        fields = [
+            field for field in self.tracked_file_fields
+            if update_fields is None or field in update_fields
+        ]
+        stored = {field: getattr(self, f'_stored_{field}', '') for field in fields}
+        super().save(*args, **kwargs)
+
+        for field, old_name in stored.items():
+            field_file = getattr(self, field)
+            new_name = field_file.name or ''
+            if new_name == old_name:
+                continue
+            if getattr(field_file.storage, 'refcounted', False):
+                # Retain first so swapping between names sharing a file
+                # never drops it to zero
+                field_file.storage.retain(new_name)
+                field_file.storage.release(old_name)
+            setattr(self, f'_stored_{field}', new_name)
+
+
+class ResponsiveImageMixin(StoredFileTrackingMixin):
+    """
+    Derivative metadata for a model's ``image`` field.
+
+    Filled in by ``core.images.generate_for_instance``; read by the
+    ``responsive_image`` template tag.
+    """
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    image_placeholder = models.TextField(
+        blank=True, editable=False,
+        help_text='Tiny blurred preview as a data: URI, shown while the image loads'
+    )
+
+    tracked_file_fields = ('image',)
+
+    class Meta:
+        abstract = True
+
+
+class Job(models.Model):
+    """
+    A unit of background work stored in the database.
+
+    Enqueued with ``core.jobs.enqueue`` and claimed by ``run_worker``
+    processes; see ``core/jobs.py``.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    ACTIVE = (QUEUED, RUNNING)
+    FINISHED = (SUCCEEDED, FAILED)
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text='Higher runs first')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    lease_expires_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text='Renewed while the job runs; a running job past it is orphaned'
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    unique_key = models.CharField(
+        max_length=100, blank=True,
+        help_text='At most one queued or running job may have a given key'
+    )
+    progress = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'], name='core_job_claim_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['unique_key'],
+                condition=Q(status__in=['queued', 'running']) & ~Q(unique_key=''),
+                name='core_job_unique_active',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk} ({self.status})'
+
+    def status_dict(self):
+        """JSON-serialisable summary for status endpoints."""
+        error = self.last_error.strip().splitlines()
+        return {
+            'id': self.pk,
+            'task': self.task,
+            'status': self.status,
+            'attempts': self.attempts,
+            'progress': self.progress,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'error': error[-1] if error else '',
+        }
+
+
+class JobLogEntry(models.Model):
+    """A log record emitted while a job ran, for its status stream."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='log_entries')
+    created_at = models.DateTimeField(default=timezone.now)
+    level = models.CharField(max_length=10)
+    logger = models.CharField(max_length=100)
+    message = models.TextField()
+
+    class Meta:
+        ordering = ['pk']
+        verbose_name_plural = 'job log entries'
+
+    def __str__(self):
+        return f'[{self.level}] {self.message[:50]}'
+
+    def as_dict(self):
+        return {
+            'id': self.pk,
+            'time': self.created_at.isoformat(),
+            'level': self.level,
+            'logger': self.logger,
+            'message': self.message,
+        }
+
+
+class StoredFile(models.Model):
+    """
+    A media file kept by ``core.storage.ContentAddressedStorage``.
+
+    ``refcount`` is the number of model fields pointing at the file; it is
+    deleted once that drops to zero.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f'{self.name} ({self.refcount} refs)'
@@ -0,0 +1,46 @@
+"""
+Signal handlers for the core app.
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from . import cache
+from .models import StoredFileTrackingMixin
+
+
+def bump_cache_version(sender, update_fields=None, **kwargs):
+    """Invalidate cached data built from the saved or deleted model."""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        # Logging in does not change anything we cache
+        return
+    cache.bump_version_on_commit(sender)
+
+
+for label in settings.CACHE_VERSIONED_MODELS:
+    model = apps.get_model(label)
+    post_save.connect(
+        bump_cache_version, sender=model,
+        dispatch_uid=f'cache_version_save_{label}'
+    )
+    post_delete.connect(
+        bump_cache_version, sender=model,
+        dispatch_uid=f'cache_version_delete_{label}'
+    )
+
+
+def release_stored_files(sender, instance, **kwargs):
+    """Drop a deleted row's references to its files."""
+    for field in sender.tracked_file_fields:
+        field_file = getattr(instance, field)
+        if getattr(field_file.storage, 'refcounted', False):
+            field_file.storage.release(field_file.name or '')
+
+
+for model in apps.get_models():
+    if issubclass(model, StoredFileTrackingMixin):
+        post_delete.connect(
+            release_stored_files, sender=model,
+            dispatch_uid=f'stored_files_delete_{model._meta.label_lower}'
+        )
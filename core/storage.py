@@ -0,0 +1,187 @@
+"""
+Content-addressed media storage.
+
+Files saved under ``MEDIA_CONTENT_ADDRESSED_DIRS`` (beer, brewery and
+category images, avatars) are named after their SHA-256:
+``beers/ab/ab12...ef.jpg``. Saving bytes that are already stored returns
+the existing name instead of writing a copy, so re-scrapes and duplicate
+uploads cost no disk space, and a URL's content never changes, so CDN
+caches never need purging. Other paths (derivatives, thumbnails) are
+stored as named.
+
+Each file has a ``StoredFile`` row counting the model fields that point at
+it. ``StoredFileTrackingMixin.save()`` retains the new file and releases
+the old one when a tracked field changes, deleting a row releases its
+files, and a file is removed once its count reaches zero. Files saved
+before this storage existed are adopted the first time they are retained;
+``python manage.py dedupe_media`` moves them all into the addressed layout
+and collapses duplicates.
+
+Usage:
+    # settings.py
+    DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+"""
+
+import hashlib
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import StoredFile, StoredFileTrackingMixin
+
+
+def content_hash(content):
+    """SHA-256 hex digest and size of a ``File``'s contents."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def count_references(name):
+    """Number of tracked model fields currently pointing at ``name``."""
+    total = 0
+    for model in apps.get_models():
+        if issubclass(model, StoredFileTrackingMixin):
+            for field in model.tracked_file_fields:
+                total += model._base_manager.filter(**{field: name}).count()
+    return total
+
+
+def repoint(old_name, new_name, follow_source=True):
+    """
+    Point every tracked model field using ``old_name`` at ``new_name``.
+
+    Written with ``update()``, so callers bump cache versions and fix
+    reference counts themselves. With ``follow_source`` the derivative
+    metadata follows too, which is right when the bytes are identical;
+    otherwise the old source name makes ``images.needs_derivatives`` true.
+
+    Returns:
+        List of (model, pk) for the rows changed
+    """
+    changed = []
+    for model in apps.get_models():
+        if not issubclass(model, StoredFileTrackingMixin):
+            continue
+        for field in model.tracked_file_fields:
+            rows = model._base_manager.filter(**{field: old_name})
+            for pk in rows.values_list('pk', flat=True):
+                values = {field: new_name}
+                if follow_source and hasattr(model, 'image_variants'):
+                    variants = model._base_manager.filter(pk=pk).values_list(
+                        'image_variants', flat=True
+                    ).get()
+                    if variants.get('source') == old_name:
+                        values['image_variants'] = {**variants, 'source': new_name}
+                model._base_manager.filter(pk=pk).update(**values)
+                changed.append((model, pk))
+    return changed
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that names files by content and counts references."""
+
+    refcounted = True
+
+    def is_addressed(self, name):
+        """True if ``name`` lives in a content-addressed directory."""
+        top = name.replace('\\', '/').split('/', 1)[0]
+        return top in getattr(settings, 'MEDIA_CONTENT_ADDRESSED_DIRS', ())
+
+    @staticmethod
+    def address(name, digest):
+        """Content-addressed name for bytes with ``digest`` saved as ``name``."""
+        top = name.replace('\\', '/').split('/', 1)[0]
+        ext = os.path.splitext(name)[1].lower()
+        return f'{top}/{digest[:2]}/{digest}{ext}'
+
+    def _save(self, name, content):
+        if not self.is_addressed(name):
+            return super()._save(name, content)
+
+        digest, size = content_hash(content)
+        for existing in StoredFile.objects.filter(sha256=digest).values_list('name', flat=True):
+            if self.exists(existing):
+                return existing
+        return self._store(self.address(name, digest), content, digest, size)
+
+    def _store(self, target, content, digest, size):
+        if not self.exists(target):
+            # A concurrent writer of the same bytes makes Django pick a
+            # suffixed name; both copies are identical, so that's harmless
+            target = super()._save(target, content)
+        StoredFile.objects.get_or_create(
+            name=target, defaults={'sha256': digest, 'size': size}
+        )
+        return target
+
+    def adopt(self, name):
+        """
+        Move a file saved under any name into the addressed layout.
+
+        Returns:
+            Tuple of (new name, digest); the original file is left in place
+        """
+        with self.open(name, 'rb') as f:
+            digest, size = content_hash(f)
+            target = self.address(name, digest)
+            if target != name:
+                target = self._store(target, f, digest, size)
+        return target, digest
+
+    def retain(self, name):
+        """Count one more reference to ``name``."""
+        if not name or not self.is_addressed(name):
+            return
+        if StoredFile.objects.filter(name=name).update(refcount=F('refcount') + 1):
+            return
+        if not self.exists(name):
+            return
+        # First sight of a file saved before references were counted:
+        # count every field already pointing at it, this one included
+        with self.open(name, 'rb') as f:
+            digest, size = content_hash(f)
+        try:
+            with transaction.atomic():
+                StoredFile.objects.create(
+                    name=name, sha256=digest, size=size, refcount=count_references(name)
+                )
+        except IntegrityError:
+            StoredFile.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+    def release(self, name):
+        """Drop one reference to ``name``, deleting the file once unused."""
+        if not name or not self.is_addressed(name):
+            return
+        StoredFile.objects.filter(name=name, refcount__gt=0).update(
+            refcount=F('refcount') - 1
+        )
+        transaction.on_commit(lambda: self.collect(name))
+
+    def recount(self, name):
+        """Reset ``name``'s reference count from the rows pointing at it."""
+        refcount = count_references(name)
+        StoredFile.objects.filter(name=name).update(refcount=refcount)
+        if not refcount:
+            transaction.on_commit(lambda: self.collect(name))
+
+    def collect(self, name):
+        """
+        Delete ``name`` if it is tracked and nothing refers to it.
+
+        Files without a ``StoredFile`` row are never touched.
+
+        Returns:
+            True if the file was deleted
+        """
+        deleted, _ = StoredFile.objects.filter(name=name, refcount=0).delete()
+        if deleted:
+            self.delete(name)
+        return bool(deleted)
@@ -0,0 +1,28 @@
+"""
+Job tasks for the core app.
+
+Usage:
+    from core import jobs, tasks
+
+    jobs.enqueue(tasks.run_command, 'populate_db')
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+
+from . import jobs
+
+
+@jobs.task(priority=-10, max_attempts=1)
+def run_command(name, *args, **options):
+    """
+    Run a management command and return its output.
+
+    Output goes to the command's own streams rather than ``sys.stdout``,
+    so concurrent jobs in one worker don't capture each other's output.
+    Not retried by default: commands like scrapes aren't idempotent.
+    """
+    stdout, stderr = StringIO(), StringIO()
+    call_command(name, *args, stdout=stdout, stderr=stderr, **options)
+    return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
@@ -0,0 +1,86 @@
+"""
+Template tags for responsive images.
+
+Usage:
+    {% load images %}
+    {% responsive_image beer sizes="(min-width: 1200px) 33vw, 50vw" class="card-img-top" alt=beer.name %}
+    {% responsive_image beer sizes="33vw" eager=True %}  {# above the fold #}
+    <img src="{{ user.avatar|thumbnail:'100x100' }}" width="50" height="50">
+"""
+
+from django import template
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+
+from core import images, thumbnails
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(obj, sizes='100vw', eager=False, **attrs):
+    """
+    Render ``obj.image`` as a ``<picture>`` with AVIF/WebP ``srcset``s.
+
+    The original stays as the ``<img>`` fallback, with intrinsic ``width``
+    and ``height`` so the browser reserves space before it loads, and the
+    stored placeholder as its background so the space shows a blurred
+    preview meanwhile. Images load lazily unless ``eager`` is true, which
+    is meant for the few that are visible without scrolling. Extra
+    keyword arguments become attributes of the ``<img>``.
+
+    Until a replaced image has been processed, the stored derivatives,
+    size and placeholder still describe the old one, so only the plain
+    ``<img>`` is rendered.
+    """
+    image = getattr(obj, 'image', None)
+    if not image:
+        return ''
+
+    if eager:
+        attrs.setdefault('fetchpriority', 'high')
+    else:
+        attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    current = images.variants_current(obj)
+    placeholder = getattr(obj, 'image_placeholder', '') if current else ''
+    if placeholder:
+        # Caller styles come last so they still win
+        attrs['style'] = (
+            f'background:url({placeholder}) center/cover no-repeat;{attrs.get("style", "")}'
+        )
+    if current and obj.image_width and obj.image_height:
+        attrs.setdefault('width', obj.image_width)
+        attrs.setdefault('height', obj.image_height)
+    img = format_html(
+        '<img src="{}"{}>',
+        image.url,
+        format_html_join('', ' {}="{}"', attrs.items()),
+    )
+
+    if not current:
+        return img
+    sources = format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', (
+        (images.FORMATS[fmt][1], srcset, sizes)
+        for fmt in images.FORMATS
+        if (srcset := images.srcset(obj, fmt))
+    ))
+    if not sources:
+        return img
+    return format_html('<picture class="responsive-image">{}{}</picture>', sources, img)
+
+
+@register.filter
+def thumbnail(image, size):
+    """
+    URL of a ``WxH`` thumbnail of an image field (see core/thumbnails.py).
+
+    ``size`` must be one of ``THUMBNAIL_SIZES``.
+    """
+    if not image:
+        return ''
+    width, height = (int(n) for n in size.split('x'))
+    if not thumbnails.is_allowed(width, height):
+        raise ValueError(f'{size} is not in THUMBNAIL_SIZES')
+    return reverse('core:thumbnail', args=[width, height, image.name])
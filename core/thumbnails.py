@@ -0,0 +1,194 @@
+"""
+On-the-fly thumbnails with a persistent disk cache.
+
+``/media/thumb/<w>x<h>/<path>`` crops and scales a media image to one of
+the ``THUMBNAIL_SIZES`` presets the first time it is asked for, writes the
+result under ``THUMBNAIL_CACHE_DIR`` and serves every later request
+straight from that file. Cache files are sharded by the hash of size and
+source path (``ab/cd/abcd....webp``) so no directory grows huge, and
+written to a temporary file then renamed, so concurrent requests never
+see a partial thumbnail.
+
+Hits touch the file's mtime, which makes the cache an LRU: once it grows
+past ``THUMBNAIL_CACHE_MAX_BYTES`` a queued ``evict`` job deletes the
+least recently used thumbnails.
+
+Usage:
+    {% load images %}
+    <img src="{{ user.avatar|thumbnail:'100x100' }}" width="50" height="50">
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from . import jobs
+
+
+logger = logging.getLogger('gbb.thumbnails')
+
+_schedule_lock = threading.Lock()
+_last_scheduled = 0.0
+
+
+def output_format():
+    """(Pillow format, extension, MIME type) thumbnails are encoded as."""
+    Image.init()
+    if 'WEBP' in Image.SAVE:
+        return 'WEBP', 'webp', 'image/webp'
+    return 'JPEG', 'jpg', 'image/jpeg'
+
+
+def is_allowed(width, height):
+    return f'{width}x{height}' in settings.THUMBNAIL_SIZES
+
+
+def is_source_allowed(name):
+    """Only images in the content-addressed media directories are thumbnailed."""
+    parts = name.replace('\\', '/').split('/')
+    return (
+        len(parts) > 1
+        and parts[0] in settings.MEDIA_CONTENT_ADDRESSED_DIRS
+        and '..' not in parts
+    )
+
+
+def is_immutable(name):
+    """True for content-addressed names, whose bytes never change."""
+    return re.fullmatch(r'[^/]+/[0-9a-f]{2}/[0-9a-f]{64}\.\w+', name) is not None
+
+
+def cache_path(name, width, height):
+    key = hashlib.sha256(f'{width}x{height}/{name}'.encode()).hexdigest()
+    _, ext, _ = output_format()
+    return Path(settings.THUMBNAIL_CACHE_DIR) / key[:2] / key[2:4] / f'{key}.{ext}'
+
+
+def render(source, width, height):
+    """Crop and scale an open image file to exactly ``width`` x ``height``."""
+    img = Image.open(source)
+    if img.format == 'JPEG':
+        # Let libjpeg downscale while decoding; fit() does the exact crop
+        img.draft(img.mode, (width, height))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    img = ImageOps.fit(img, (width, height), Image.Resampling.LANCZOS)
+
+    pil_format, _, _ = output_format()
+    if pil_format == 'JPEG' and img.mode == 'RGBA':
+        img = img.convert('RGB')
+    output = BytesIO()
+    img.save(output, format=pil_format, quality=80)
+    return output.getvalue()
+
+
+def write_atomic(path, data):
+    """Write ``data`` to ``path`` via a rename, so readers never see half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def get_thumbnail(name, width, height):
+    """
+    Path of the cached thumbnail, generating it on first use.
+
+    Raises:
+        ValueError: Size not in ``THUMBNAIL_SIZES`` or source not allowed
+        FileNotFoundError: Source image does not exist
+    """
+    if not is_allowed(width, height) or not is_source_allowed(name):
+        raise ValueError(f'No {width}x{height} thumbnail for {name}')
+
+    path = cache_path(name, width, height)
+    try:
+        # Bump mtime: eviction drops the least recently used first
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    if not default_storage.exists(name):
+        raise FileNotFoundError(name)
+    with default_storage.open(name, 'rb') as source:
+        data = render(source, width, height)
+    write_atomic(path, data)
+    schedule_eviction()
+    return path
+
+
+def cache_size():
+    """Total bytes in the thumbnail cache."""
+    root = Path(settings.THUMBNAIL_CACHE_DIR)
+    return sum(f.stat().st_size for f in root.rglob('*') if f.is_file()) if root.exists() else 0
+
+
+@jobs.task(priority=-5, max_attempts=1)
+def evict(max_bytes=None):
+    """
+    Delete least recently used thumbnails until the cache is under its cap.
+
+    Trims to 90% of the cap so it isn't hit again on the next write.
+
+    Returns:
+        Dict with ``removed`` files and ``freed`` bytes
+    """
+    if max_bytes is None:
+        max_bytes = settings.THUMBNAIL_CACHE_MAX_BYTES
+    root = Path(settings.THUMBNAIL_CACHE_DIR)
+    if not root.exists():
+        return {'removed': 0, 'freed': 0}
+
+    entries = []
+    total = 0
+    for path in root.rglob('*'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.is_file():
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    removed = freed = 0
+    target = max_bytes * 0.9 if total > max_bytes else total
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total - freed <= target:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        removed += 1
+        freed += size
+    if removed:
+        logger.info(f'Evicted {removed} thumbnails ({freed} bytes)')
+    return {'removed': removed, 'freed': freed}
+
+
+def schedule_eviction():
+    """Queue an eviction pass, at most once per ``THUMBNAIL_EVICT_INTERVAL``."""
+    global _last_scheduled
+    with _schedule_lock:
+        now = time.monotonic()
+        if _last_scheduled and now - _last_scheduled < settings.THUMBNAIL_EVICT_INTERVAL:
+            return
+        _last_scheduled = now
+    jobs.enqueue(evict, unique_key='thumbnail-eviction')
@@ -7,6 +7,9 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
+    path('live/stream/', views.live_stream, name='live_stream'),
+    path('media/thumb/<int:width>x<int:height>/<path:name>', views.thumbnail, name='thumbnail'),
     path('admin/populate-db/', views.populate_database, name='populate_database'),
     path('admin/scrape-beers/', views.scrape_beers_daily, name='scrape_beers_daily'),
+    path('admin/scrape-beers/<int:job_id>/', views.scrape_status, name='scrape_status'),
 ]
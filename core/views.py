@@ -2,75 +2,175 @@ from django.shortcuts import render
 from django.db.models import Avg, Count
 from django.utils import timezone
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import HttpResponse
-from django.core.management import call_command
-from reviews.models import Beer, Review
-import os
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from reviews.models import Beer, Brewery, Category, Review, ReviewLike
+from users.models import User
+from . import broadcast, jobs, tasks, thumbnails
+from .cache import cached_call
+from .db_routers import replica_reads
+from .models import Job, JobLogEntry
+import asyncio
+import json
 import random
 from django.conf import settings
 
 
-def home(request):
-    """Home page view with featured content"""
-    # Get sponsored beers (or random beers if no sponsored ones exist)
-    sponsored_beers = Beer.objects.filter(is_sponsored=True).annotate(
+# Deduplicates scrape triggers and scopes the scrape status endpoint
+SCRAPE_JOB_KEY = 'daily_beer_scrape'
+
+
+def _sponsored_beers():
+    """Sponsored beers (or random beers if no sponsored ones exist)"""
+    beers = Beer.objects.select_related('brewery', 'category')
+    sponsored_beers = list(beers.filter(is_sponsored=True).annotate(
         avg_rating=Avg('reviews__rating'),
         review_count=Count('reviews')
-    )[:3]
+    )[:3])
 
     # If no sponsored beers, use random beers as placeholders
-    if not sponsored_beers.exists():
-        sponsored_beers = Beer.objects.annotate(
+    if not sponsored_beers:
+        sponsored_beers = list(beers.annotate(
             avg_rating=Avg('reviews__rating'),
             review_count=Count('reviews')
-        ).order_by('?')[:3]
+        ).order_by('?')[:3])
+    return sponsored_beers
+
 
-    # Get top 6 beers by average star rating
-    featured_beers = Beer.objects.annotate(
+def _featured_beers():
+    """Top 6 beers by average star rating"""
+    return list(Beer.objects.select_related('brewery', 'category').annotate(
         avg_rating=Avg('reviews__rating'),
         review_count=Count('reviews')
-    ).order_by('-avg_rating', '-review_count')[:6]
+    ).order_by('-avg_rating', '-review_count')[:6])
 
-    # Get latest reviews
-    latest_reviews = Review.objects.filter(
+
+def _latest_reviews():
+    """Latest approved reviews"""
+    return list(Review.objects.filter(
         is_approved=True
-    ).select_related('beer', 'user').order_by('-created_at')[:6]
+    ).select_related('beer__brewery', 'user').annotate(
+        like_count=Count('likes')
+    ).order_by('-created_at')[:6])
+
 
-    # Get beer of the month (highest rated beer this month)
+def _beer_of_month():
+    """Highest rated beer this month"""
     this_month = timezone.now().replace(
         day=1, hour=0, minute=0, second=0, microsecond=0
     )
-    beer_of_month = Beer.objects.annotate(
+    return Beer.objects.annotate(
         avg_rating=Avg('reviews__rating')
     ).filter(
         reviews__created_at__gte=this_month,
         reviews__is_approved=True
     ).order_by('-avg_rating').first()
 
-    # Get a random beer image from the beers folder
-    hero_beer_image = None
-    beers_folder = os.path.join(settings.MEDIA_ROOT, 'beers')
-    if os.path.exists(beers_folder):
-        beer_images = [f for f in os.listdir(beers_folder)
-                       if f.endswith(('.jpg', '.jpeg', '.png', '.webp')) and
-                       os.path.isfile(os.path.join(beers_folder, f))]
-        if beer_images:
-            random_image = random.choice(beer_images)
-            # Verify the file exists before setting
-            image_path = os.path.join(beers_folder, random_image)
-            if os.path.exists(image_path):
-                hero_beer_image = f'beers/{random_image}'
 
+def _hero_images():
+    """Beer images available for the hero section"""
+    return sorted(set(
+        Beer.objects.exclude(image='').exclude(image__isnull=True)
+        .values_list('image', flat=True)
+    ))
+
+
+# Home page blocks: name -> (builder, models the block is built from)
+HOME_BLOCKS = {
+    'sponsored_beers': (_sponsored_beers, (Beer, Review, Brewery, Category)),
+    'featured_beers': (_featured_beers, (Beer, Review, Brewery, Category)),
+    'latest_reviews': (_latest_reviews, (Review, ReviewLike, Beer, Brewery, User)),
+    'beer_of_month': (_beer_of_month, (Beer, Review)),
+    'hero_images': (_hero_images, (Beer,)),
+}
+
+
+def get_home_block(name, force=False):
+    """Return a cached home page block"""
+    builder, models = HOME_BLOCKS[name]
+    return cached_call(f'home:{name}', builder, models=models, force=force)
+
+
+@replica_reads
+def home(request):
+    """Home page view with featured content"""
     context = {
-        'sponsored_beers': sponsored_beers,
-        'featured_beers': featured_beers,
-        'latest_reviews': latest_reviews,
-        'beer_of_month': beer_of_month,
-        'hero_beer_image': hero_beer_image,
+        name: get_home_block(name)
+        for name in ('sponsored_beers', 'featured_beers',
+                     'latest_reviews', 'beer_of_month')
     }
+
+    # Pick a random hero image from the cached set of beer images
+    hero_images = get_home_block('hero_images')
+    context['hero_beer_image'] = random.choice(hero_images) if hero_images else None
+    # Live updates are opt-in: they need a separately deployed ASGI service
+    context['live_stream_url'] = settings.LIVE_STREAM_URL
+
     return render(request, 'core/home.html', context)
 
 
+def _sse_message(event):
+    return f'id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n'
+
+
+async def live_stream(request):
+    """Server-sent events stream of newly approved reviews and like counts"""
+    if not isinstance(request, ASGIRequest):
+        # A sync worker would be held for the whole stream; 204 tells
+        # EventSource not to reconnect
+        return HttpResponse(status=204)
+
+    heartbeat = settings.LIVE_HEARTBEAT_SECONDS
+    max_seconds = settings.LIVE_STREAM_MAX_SECONDS
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        # Streams end periodically and the browser reconnects, so
+        # connections dropped without notice are cleaned up
+        deadline = loop.time() + max_seconds
+        async with broadcast.subscribe() as subscription:
+            yield f'retry: {settings.LIVE_RETRY_MS}\n\n'
+            while (remaining := deadline - loop.time()) > 0:
+                event = await subscription.get(timeout=min(heartbeat, remaining))
+                if event is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield _sse_message(event)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    if settings.LIVE_STREAM_URL.startswith(('http://', 'https://')):
+        # Served from another origin than the pages that listen to it
+        response['Access-Control-Allow-Origin'] = f'{settings.SITE_PROTOCOL}://{settings.SITE_DOMAIN}'
+    return response
+
+
+def thumbnail(request, width, height, name):
+    """Resized copy of a media image, generated once then served from disk"""
+    for _ in range(2):
+        try:
+            path = thumbnails.get_thumbnail(name, width, height)
+            # Eviction may remove the file between the two calls; retry once
+            thumbnail_file = open(path, 'rb')
+            break
+        except FileNotFoundError:
+            continue
+        except (ValueError, OSError):
+            raise Http404('No such thumbnail')
+    else:
+        raise Http404('No such thumbnail')
+
+    _, _, content_type = thumbnails.output_format()
+    response = FileResponse(thumbnail_file, content_type=content_type)
+    if thumbnails.is_immutable(name):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=86400'
+    return response
+
+
 def about(request):
     """About page view"""
     return render(request, 'core/about.html')
@@ -82,61 +182,105 @@ def contact(request):
 
 
 def populate_database(request):
-    """Populate database with dummy data - requires secret parameter"""
+    """Queue a job populating the database with dummy data - requires secret parameter"""
     # Simple protection with a secret parameter
     secret = request.GET.get('secret', '')
     if secret != 'populate2026':
         return HttpResponse('Unauthorized', status=401)
 
-    try:
-        call_command('populate_db')
-        return HttpResponse('''
-            <h1>Database populated successfully!</h1>
-            <p>The Railway database has been populated with:</p>
-            <ul>
-                <li>8 test users (password: password123)</li>
-                <li>10 beer categories</li>
-                <li>15 British breweries</li>
-                <li>25 beers</li>
-                <li>35 reviews with ratings and likes</li>
-            </ul>
-            <p><a href="/">Go to homepage</a></p>
-        ''')
-    except Exception as e:
-        return HttpResponse(f'<h1>Error populating database</h1><pre>{str(e)}</pre>', status=500)
+    job = jobs.enqueue(tasks.run_command, 'populate_db')
+    return HttpResponse(f'''
+        <h1>Database population queued</h1>
+        <p>Job #{job.pk} will add test users, categories, breweries, beers and reviews
+        once a worker (<code>python manage.py run_worker</code>) picks it up.</p>
+        <p><a href="/">Go to homepage</a></p>
+    ''', status=202)
 
 
 def scrape_beers_daily(request):
-    """Scrape beers from brewery websites - requires secret parameter"""
+    """
+    Queue the daily beer scrape - requires secret parameter
+
+    Returns the job id at once; repeated triggers while a scrape is queued
+    or running get the same job.
+    """
     # Simple protection with a secret parameter
     secret = request.GET.get('secret', '')
     if secret != 'scrape2026':
         return HttpResponse('Unauthorized', status=401)
 
+    job = jobs.enqueue(tasks.run_command, 'daily_beer_scrape', unique_key=SCRAPE_JOB_KEY)
+    status_url = reverse('core:scrape_status', args=[job.pk])
+    return JsonResponse(
+        {**job.status_dict(), 'status_url': f'{status_url}?secret={secret}'},
+        status=202,
+    )
+
+
+def _job_event(event, data, event_id=None):
+    prefix = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{prefix}event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def scrape_status(request, job_id):
+    """
+    Status of a scrape job - requires secret parameter
+
+    Clients accepting ``text/event-stream`` (under ASGI) get a stream of
+    ``log`` and ``progress`` events ending with ``done``; anyone else gets
+    a JSON snapshot. ``after`` or ``Last-Event-ID`` skips log entries
+    already seen.
+    """
+    if request.GET.get('secret', '') != 'scrape2026':
+        return HttpResponse('Unauthorized', status=401)
+    job = await Job.objects.filter(pk=job_id, unique_key=SCRAPE_JOB_KEY).afirst()
+    if job is None:
+        raise Http404('No such scrape job')
     try:
-        # Run the daily scraping command
-        from io import StringIO
-        import sys
-
-        # Capture output
-        old_stdout = sys.stdout
-        sys.stdout = StringIO()
-
-        call_command('daily_beer_scrape')
-
-        output = sys.stdout.getvalue()
-        sys.stdout = old_stdout
-
-        beer_count = Beer.objects.count()
-
-        return HttpResponse(f'''
-            <h1>Daily Beer Scraping Complete!</h1>
-            <p>Total beers in database: {beer_count}</p>
-            <h3>Scraping Log:</h3>
-            <pre style="background: #f5f5f5; padding: 20px; border-radius: 8px; max-height: 600px; overflow-y: scroll;">
-{output}
-            </pre>
-            <p><a href="/">Go to homepage</a></p>
-        ''')
-    except Exception as e:
-        return HttpResponse(f'<h1>Error scraping beers</h1><pre>{str(e)}</pre>', status=500)
+        after = int(request.GET.get('after') or request.headers.get('Last-Event-ID') or 0)
+    except ValueError:
+        after = 0
+
+    wants_stream = 'text/event-stream' in request.headers.get('Accept', '')
+    if not wants_stream or not isinstance(request, ASGIRequest):
+        log = [entry.as_dict() async for entry in job.log_entries.filter(pk__gt=after)]
+        return JsonResponse({**job.status_dict(), 'log': log})
+
+    poll = settings.JOB_STATUS_POLL_SECONDS
+    heartbeat = settings.LIVE_HEARTBEAT_SECONDS
+    max_seconds = settings.LIVE_STREAM_MAX_SECONDS
+
+    async def events():
+        nonlocal after
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds
+        last_sent = loop.time()
+        progress = None
+        yield f'retry: {settings.LIVE_RETRY_MS}\n\n'
+        while loop.time() < deadline:
+            # Read the job before its log so nothing logged before it
+            # finished is missed
+            job = await Job.objects.aget(pk=job_id)
+            messages = []
+            async for entry in JobLogEntry.objects.filter(job_id=job_id, pk__gt=after):
+                after = entry.pk
+                messages.append(_job_event('log', entry.as_dict(), entry.pk))
+            if job.progress != progress:
+                progress = job.progress
+                messages.append(_job_event('progress', job.status_dict()))
+            if job.status in Job.FINISHED:
+                messages.append(_job_event('done', job.status_dict()))
+            if messages:
+                last_sent = loop.time()
+                yield ''.join(messages)
+            elif loop.time() - last_sent >= heartbeat:
+                last_sent = loop.time()
+                yield ': keep-alive\n\n'
+            if job.status in Job.FINISHED:
+                return
+            await asyncio.sleep(poll)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
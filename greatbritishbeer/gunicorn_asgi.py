@@ -0,0 +1,32 @@
+"""
+Gunicorn launch profile for the ASGI application with uvicorn workers.
+
+Gunicorn manages the processes (restarts, graceful reloads, signals) and
+each worker runs an event loop via the ``uvicorn-worker`` package, so a
+long-lived stream no longer ties up a whole worker.
+
+Usage:
+    gunicorn -c greatbritishbeer/gunicorn_asgi.py greatbritishbeer.asgi:application
+"""
+
+import multiprocessing
+import os
+
+
+bind = f'0.0.0.0:{os.environ.get("PORT", "8000")}'
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+# Streaming responses keep connections open, so don't let the arbiter
+# kill a worker just because one request is long-lived
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to contain slow memory growth
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
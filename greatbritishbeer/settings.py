@@ -88,6 +88,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -131,6 +132,74 @@ else:
         }
     }
 
+# Read replica
+# Public read-only views read from DATABASE_REPLICA_URL when it is set; see
+# core.db_routers. Sessions that just wrote stay on the primary for
+# REPLICA_PIN_SECONDS, or the measured replica lag if that is longer.
+
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL', '').strip()
+
+if DATABASE_REPLICA_URL and dj_database_url:
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL)
+    # Tests cannot replicate, so the test replica is the test primary
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter'] if DATABASE_REPLICA_URL else []
+
+REPLICA_PIN_SECONDS = 5
+REPLICA_MAX_LAG = 10
+REPLICA_LAG_CHECK_INTERVAL = 5
+REPLICA_PRIMARY_MODELS = ['sessions.session', 'admin.logentry']
+
+# Cache
+# Redis when REDIS_URL is set (production), otherwise per-process locmem.
+# core.cache puts a small in-process LRU (L1) in front of this cache (L2).
+
+REDIS_URL = os.environ.get('REDIS_URL', '').strip()
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'greatbritishbeer',
+        }
+    }
+
+CACHE_DEFAULT_TTL = 300  # L2 lifetime of computed blocks, in seconds
+CACHE_L1_TTL = 30  # L1 lifetime, bounds staleness across workers
+CACHE_L1_MAX_ENTRIES = 1000
+CACHE_VERSION_TTL = 5  # How long a worker trusts its copy of a model version
+CACHE_LOCK_TIMEOUT = 10  # Recompute lock lifetime, in seconds
+
+# Saving or deleting any of these bumps its cache version
+CACHE_VERSIONED_MODELS = [
+    'reviews.Beer',
+    'reviews.Brewery',
+    'reviews.Category',
+    'reviews.Review',
+    'reviews.ReviewLike',
+    'users.User',
+]
+
+# Live updates (server-sent events from a separate ASGI service, while the
+# site itself stays on WSGI). Off unless LIVE_STREAM_URL is set: '/live/stream/'
+# where /live/ is routed to that service, else the stream's absolute URL.
+# core.broadcast relays events through Redis pub/sub when REDIS_URL is set.
+
+LIVE_CHANNEL = 'gbb:live'
+LIVE_HEARTBEAT_SECONDS = 15
+LIVE_STREAM_MAX_SECONDS = 300
+LIVE_RETRY_MS = 3000
+LIVE_MAX_QUEUED_EVENTS = 100
+LIVE_STREAM_URL = config('LIVE_STREAM_URL', default='')
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -183,6 +252,11 @@ WHITENOISE_MANIFEST_STRICT = False
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads in these directories are named by content hash, deduplicated and
+# reference counted (see core/storage.py)
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+MEDIA_CONTENT_ADDRESSED_DIRS = ['beers', 'breweries', 'categories', 'avatars']
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -228,6 +302,51 @@ CKEDITOR_CONFIGS = {
 # Pagination
 PAGINATE_BY = 12
 
+# Sitemaps (cached shards, see reviews/sitemaps.py)
+SITE_DOMAIN = config('SITE_DOMAIN', default='greatbritish.beer')
+SITE_PROTOCOL = config('SITE_PROTOCOL', default='https')
+SITEMAP_CACHE_TTL = 24 * 60 * 60
+
+# Uploaded images larger than these are downscaled in the background
+IMAGE_MAX_DIMENSION = 1200
+AVATAR_MAX_DIMENSION = 300
+
+# Transform versions applied by process_images, per file
+IMAGE_MANIFEST_PATH = BASE_DIR / 'image_manifest.json'
+
+# HTTP cache for scraper requests (see reviews/scrapers/utils/http_cache.py);
+# None keeps it in memory
+HTTP_CACHE_PATH = BASE_DIR / 'http_cache.sqlite'
+
+# robots.txt files fetched by the scrapers, shared across runs
+ROBOTS_CACHE_DIR = BASE_DIR / 'robots_cache'
+ROBOTS_CACHE_TTL = 24 * 60 * 60  # seconds
+ROBOTS_NEGATIVE_TTL = 60 * 60  # failed fetches are retried sooner
+
+# Raw API snapshots (see reviews/scrapers/utils/snapshot.py)
+SCRAPER_SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+SCRAPER_SNAPSHOT_KEEP = 5
+
+# On-the-fly thumbnails (see core/thumbnails.py)
+THUMBNAIL_SIZES = ['100x100', '160x160', '200x200', '300x300']
+THUMBNAIL_CACHE_DIR = BASE_DIR / 'thumbnails'
+THUMBNAIL_CACHE_MAX_BYTES = 256 * 1024 * 1024
+THUMBNAIL_EVICT_INTERVAL = 300  # seconds between eviction passes
+
+# Database job queue (see core/jobs.py); JOBS_RUN_EAGERLY runs jobs inline
+JOBS_RUN_EAGERLY = False
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_BACKOFF = 30  # seconds before the first retry, doubling each time
+JOB_RETRY_BACKOFF_MAX = 3600
+JOB_LEASE_SECONDS = 120  # running jobs whose worker hasn't renewed for this long are orphaned
+JOB_POLL_INTERVAL = 1.0
+JOB_RETENTION_DAYS = 14  # finished jobs and their logs are pruned after this
+JOB_STATUS_POLL_SECONDS = 1.0  # how often job status streams check for news
+
+# Responsive image derivatives (see core/images.py)
+IMAGE_DERIVATIVE_WIDTHS = [160, 320, 480, 640, 960, 1200]
+IMAGE_DERIVATIVE_FORMATS = ['avif', 'webp']
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880
@@ -17,26 +17,23 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
-from reviews.sitemaps import BeerSitemap, ReviewSitemap
+from reviews import views as reviews_views
 
 # Admin site customization
 admin.site.site_header = settings.ADMIN_SITE_HEADER
 admin.site.site_title = settings.ADMIN_SITE_TITLE
 admin.site.index_title = settings.ADMIN_INDEX_TITLE
 
-sitemaps = {
-    'beers': BeerSitemap,
-    'reviews': ReviewSitemap,
-}
-
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # Before admin, whose catch-all would otherwise swallow core's admin/ trigger URLs
     path('', include('core.urls')),
+    path('admin/', admin.site.urls),
     path('reviews/', include('reviews.urls')),
     path('accounts/', include('users.urls')),
     path('ckeditor/', include('ckeditor_uploader.urls')),
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    path('sitemap.xml', reviews_views.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>-<int:page>.xml', reviews_views.sitemap_section,
+         name='sitemap_section'),
 ]
 
 # Serve media files in development
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from django.db import transaction
 from django.db.models import Avg, Count
-from .models import Category, Brewery, Beer, Review, ReviewLike, ReviewComment
+from .models import Category, Brewery, Beer, Review, ReviewLike, ReviewComment, ScrapedPage
+from . import live, sitemaps
+from core import cache
 
 
 @admin.register(Category)
@@ -105,12 +108,14 @@ class BeerAdmin(admin.ModelAdmin):
     def make_featured(self, request, queryset):
         """Mark selected beers as featured"""
         updated = queryset.update(is_featured=True)
+        cache.bump_version_on_commit(Beer)
         self.message_user(request, f'{updated} beers marked as featured.')
     make_featured.short_description = 'Mark as featured'
     
     def remove_featured(self, request, queryset):
         """Remove featured status from selected beers"""
         updated = queryset.update(is_featured=False)
+        cache.bump_version_on_commit(Beer)
         self.message_user(request, f'{updated} beers removed from featured.')
     remove_featured.short_description = 'Remove from featured'
 
@@ -195,19 +200,27 @@ class ReviewAdmin(admin.ModelAdmin):
     
     def approve_reviews(self, request, queryset):
         """Approve selected reviews"""
+        newly_approved = list(queryset.filter(is_approved=False).values_list('pk', flat=True))
         updated = queryset.update(is_approved=True)
+        cache.bump_version_on_commit(Review)
+        sitemaps.invalidate(Review, newly_approved)
+        transaction.on_commit(lambda: live.publish_approved_reviews(newly_approved))
         self.message_user(request, f'{updated} reviews approved.')
     approve_reviews.short_description = 'Approve selected reviews'
     
     def unapprove_reviews(self, request, queryset):
         """Unapprove selected reviews"""
+        unapproved = list(queryset.filter(is_approved=True).values_list('pk', flat=True))
         updated = queryset.update(is_approved=False)
+        cache.bump_version_on_commit(Review)
+        sitemaps.invalidate(Review, unapproved)
         self.message_user(request, f'{updated} reviews unapproved.')
     unapprove_reviews.short_description = 'Unapprove selected reviews'
     
     def make_featured(self, request, queryset):
         """Mark selected reviews as featured"""
         updated = queryset.update(is_featured=True)
+        cache.bump_version_on_commit(Review)
         self.message_user(request, f'{updated} reviews marked as featured.')
     make_featured.short_description = 'Mark as featured'
 
@@ -247,3 +260,16 @@ class ReviewCommentAdmin(admin.ModelAdmin):
         updated = queryset.update(is_approved=False)
         self.message_user(request, f'{updated} comments unapproved.')
     unapprove_comments.short_description = 'Unapprove selected comments'
+
+
+@admin.register(ScrapedPage)
+class ScrapedPageAdmin(admin.ModelAdmin):
+    """Admin for scrape state; delete a page to force it to be re-parsed"""
+    list_display = ['url', 'record_count', 'changed_at', 'fetched_at']
+    search_fields = ['url']
+    readonly_fields = ['url', 'content_hash', 'records', 'changed_at', 'fetched_at']
+
+    def record_count(self, obj):
+        """Number of beers listed on the page"""
+        return len(obj.records)
+    record_count.short_description = 'Beers'
@@ -0,0 +1,427 @@
+"""
+Bulk ingestion of scraped beers and breweries.
+
+``BeerIngestor`` loads the existing ``(brewery, normalised name)`` keys,
+slugs and categories once, then creates and updates beers with
+``bulk_create``/``bulk_update`` in batches, one transaction per brewery.
+Importing thousands of beers costs a handful of queries instead of
+several per beer.
+
+``import_breweries`` does the same for brewery records, with slugs
+allocated in memory and conflicts on slug skipped or updated by the
+database. ``clear_catalogue`` empties beers, breweries, categories and
+everything hanging off them with one DELETE per table.
+
+Bulk writes skip ``post_save``/``post_delete``, so these do what the
+signals would have: once the transaction commits, bump cache versions,
+expire the sitemap shards holding the written rows and recount stored
+image references.
+
+Usage:
+    from reviews.ingest import BeerIngestor
+
+    ingestor = BeerIngestor(default_abv=5.0)
+    result = ingestor.ingest(brewery, beers, update=True)
+    print(result.created, result.updated, result.skipped, result.failed)
+
+    result = import_breweries(records, update=True)
+"""
+
+import logging
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from slugify import slugify
+from taggit.models import TaggedItem
+
+from core import cache
+
+from . import sitemaps
+from .models import Beer, Brewery, Category, Review, ReviewComment, ReviewLike, ScrapedPage
+from .scrapers.utils.normalizers import normalize_style
+
+
+logger = logging.getLogger('gbb.ingest')
+
+
+DEFAULT_BATCH_SIZE = 500
+
+# Fields copied onto existing beers when ingesting with update=True
+UPDATE_FIELDS = ('abv', 'description')
+
+# Fields overwritten on existing breweries by import_breweries(update=True)
+BREWERY_UPDATE_FIELDS = ('description', 'location', 'website')
+
+
+class IngestResult(NamedTuple):
+    """What one ``ingest``/``import_breweries`` call did, by name."""
+    created: List[str]
+    updated: List[str]
+    skipped: List[str]
+    failed: List[Tuple[str, str]]
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            'created': len(self.created),
+            'updated': len(self.updated),
+            'skipped': len(self.skipped),
+            'failed': len(self.failed),
+        }
+
+
+def beer_key(name: str) -> str:
+    """Name as compared for duplicates: whitespace collapsed, lowercased."""
+    return ' '.join(str(name or '').split()).lower()
+
+
+def unique_slug(candidates: Iterable[str], taken: Set[str], max_length: int = 200) -> str:
+    """
+    First free slug among ``candidates``, else the first one numbered.
+
+    The chosen slug is added to ``taken``, so a batch can be allocated in
+    memory without a query per row.
+    """
+    slugs = [slugify(candidate)[:max_length] for candidate in candidates]
+    slugs = [slug for slug in slugs if slug] or ['item']
+    for slug in slugs:
+        if slug not in taken:
+            taken.add(slug)
+            return slug
+    n = 2
+    while True:
+        suffix = f'-{n}'
+        slug = slugs[0][:max_length - len(suffix)] + suffix
+        if slug not in taken:
+            taken.add(slug)
+            return slug
+        n += 1
+
+
+def _decimal(value, max_value) -> Optional[Decimal]:
+    if value is None or value == '':
+        return None
+    try:
+        number = Decimal(str(value)).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        return None
+    return number if 0 <= number <= max_value else None
+
+
+def _ibu(value) -> Optional[int]:
+    try:
+        ibu = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return ibu if 0 <= ibu <= 120 else None
+
+
+class BeerIngestor:
+    """
+    Create and update scraped beers in bulk.
+
+    State is loaded on first use and kept up to date as beers are added,
+    so one ingestor can be used for every brewery in a run.
+    """
+
+    def __init__(self, default_abv: Optional[float] = None,
+                 description_limit: Optional[int] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Initialize ingestor.
+
+        Args:
+            default_abv: ABV for beers scraped without one; if None those
+                beers fail instead
+            description_limit: Truncate descriptions to this many characters
+            batch_size: Rows per INSERT/UPDATE statement
+        """
+        self.default_abv = default_abv
+        self.description_limit = description_limit
+        self.batch_size = batch_size
+        self._keys: Optional[Dict[Tuple[int, str], int]] = None
+        self._slugs: Set[str] = set()
+        self._categories: Dict[str, Category] = {}
+        self._breweries: Optional[Dict[str, Brewery]] = None
+
+    def _load(self):
+        if self._keys is not None:
+            return
+        self._keys = {}
+        for pk, brewery_id, name, slug in Beer.objects.order_by().values_list('pk', 'brewery_id', 'name', 'slug'):
+            self._keys.setdefault((brewery_id, beer_key(name)), pk)
+            self._slugs.add(slug)
+        self._categories = {category.name: category for category in Category.objects.all()}
+
+    def _resolve_categories(self, names: Set[str]):
+        """Create any missing categories with one insert."""
+        missing = names - set(self._categories)
+        if not missing:
+            return
+        taken = set(Category.objects.values_list('slug', flat=True))
+        with transaction.atomic():
+            Category.objects.bulk_create(
+                [
+                    Category(name=name, slug=unique_slug([name], taken, 100), description=f'{name} beers')
+                    for name in sorted(missing)
+                ],
+                ignore_conflicts=True,
+            )
+            for category in Category.objects.filter(name__in=missing):
+                self._categories[category.name] = category
+            cache.bump_version_on_commit(Category)
+            sitemaps.invalidate(Category, [self._categories[name].pk for name in missing])
+
+    def get_brewery(self, name: str, create: bool = True, **defaults) -> Optional[Brewery]:
+        """
+        Brewery called ``name``, from one query for all breweries.
+
+        Args:
+            name: Exact brewery name
+            create: Create the brewery (with ``defaults``) if missing
+        """
+        if self._breweries is None:
+            self._breweries = {}
+            for brewery in Brewery.objects.order_by('pk'):
+                self._breweries.setdefault(brewery.name, brewery)
+        brewery = self._breweries.get(name)
+        if brewery is None and create:
+            taken = set(Brewery.objects.values_list('slug', flat=True))
+            brewery = Brewery.objects.create(name=name, slug=unique_slug([name], taken), **defaults)
+            logger.info(f'Created brewery: {name}')
+            self._breweries[name] = brewery
+        return brewery
+
+    def exists(self, brewery: Brewery, name: str) -> bool:
+        """True if ``brewery`` already has a beer called ``name``."""
+        self._load()
+        return (brewery.pk, beer_key(name)) in self._keys
+
+    def _clean(self, data: Dict) -> Dict:
+        """Model field values from scraped data; ``abv`` is None if unusable."""
+        description = data.get('description') or ''
+        if self.description_limit:
+            description = description[:self.description_limit]
+        style = data.get('style') or ''
+        return {
+            'name': ' '.join(data['name'].split())[:200],
+            'abv': _decimal(data.get('abv'), Decimal('50')),
+            'ibu': _ibu(data.get('ibu')),
+            'description': description,
+            'style': style[:100],
+            'category': data.get('category') or normalize_style(style),
+        }
+
+    def ingest(self, brewery: Brewery, beers: List[Dict], update: bool = False,
+               dry_run: bool = False) -> IngestResult:
+        """
+        Add a brewery's scraped beers, optionally updating existing ones.
+
+        Beers are matched on brewery and name, ignoring case and spacing;
+        later duplicates in ``beers`` are skipped.
+
+        Args:
+            brewery: Brewery the beers belong to (must be saved unless dry_run)
+            beers: Scraped beer dictionaries
+            update: Copy changed ``UPDATE_FIELDS`` onto existing beers
+                instead of skipping them
+            dry_run: Work out the result without writing anything
+
+        Returns:
+            ``IngestResult`` with the names of created, updated, skipped
+            and failed beers
+        """
+        self._load()
+        created, updated, skipped, failed = [], [], [], []
+        new_rows, existing = [], {}
+        seen = set()
+        for data in beers:
+            name = (data.get('name') or '').strip()
+            key = beer_key(name)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            values = self._clean(data)
+            pk = self._keys.get((brewery.pk, key)) if brewery.pk else None
+            if pk is None:
+                if values['abv'] is None:
+                    if self.default_abv is None:
+                        failed.append((values['name'], f'invalid ABV {data.get("abv")!r}'))
+                        continue
+                    values['abv'] = Decimal(str(self.default_abv))
+                new_rows.append(values)
+            elif update:
+                existing[pk] = values
+            else:
+                skipped.append(values['name'])
+
+        to_update = []
+        if existing:
+            for beer in Beer.objects.filter(pk__in=existing).only('pk', 'name', *UPDATE_FIELDS):
+                values = existing[beer.pk]
+                changed = [
+                    field for field in UPDATE_FIELDS
+                    if values[field] not in (None, '') and getattr(beer, field) != values[field]
+                ]
+                for field in changed:
+                    setattr(beer, field, values[field])
+                if changed:
+                    # bulk_update doesn't apply auto_now
+                    beer.updated_at = timezone.now()
+                    to_update.append(beer)
+                    updated.append(beer.name)
+                else:
+                    skipped.append(beer.name)
+
+        if dry_run:
+            return IngestResult([values['name'] for values in new_rows], updated, skipped, failed)
+
+        self._resolve_categories({values['category'] for values in new_rows})
+        new_beers = [
+            Beer(
+                brewery=brewery,
+                slug=unique_slug([values['name'], f'{values["name"]} {brewery.name}'], self._slugs),
+                **{**values, 'category': self._categories[values['category']]},
+            )
+            for values in new_rows
+        ]
+        with transaction.atomic():
+            Beer.objects.bulk_create(new_beers, batch_size=self.batch_size)
+            if to_update:
+                Beer.objects.bulk_update(
+                    to_update, list(UPDATE_FIELDS) + ['updated_at'], batch_size=self.batch_size
+                )
+            if new_beers or to_update:
+                cache.bump_version_on_commit(Beer)
+                sitemaps.invalidate(Beer, [beer.pk for beer in new_beers + to_update])
+
+        for beer in new_beers:
+            self._keys[(brewery.pk, beer_key(beer.name))] = beer.pk
+            created.append(beer.name)
+        if created or updated:
+            logger.info(f'{brewery.name}: {len(created)} beers created, {len(updated)} updated')
+        return IngestResult(created, updated, skipped, failed)
+
+
+def import_breweries(records: List[Dict], update: bool = False, dry_run: bool = False,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> IngestResult:
+    """
+    Create breweries from scraped records in bulk.
+
+    Records are matched to existing breweries by name, as before, and
+    given a slug in memory: the existing brewery's, else a free one from
+    the name, then name and location, then a numbered suffix. Rows are
+    written with ``bulk_create`` keyed on slug, ignoring conflicts or,
+    with ``update``, overwriting ``BREWERY_UPDATE_FIELDS``.
+
+    Args:
+        records: Dictionaries with ``name``, ``location`` and optionally
+            ``description`` and ``website``
+        update: Refresh existing breweries instead of skipping them
+        dry_run: Work out the result without writing anything
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        ``IngestResult`` (``updated`` lists existing breweries refreshed)
+    """
+    existing = {}
+    taken = set()
+    for name, slug in Brewery.objects.order_by('pk').values_list('name', 'slug'):
+        existing.setdefault(name, slug)
+        taken.add(slug)
+
+    created, updated, skipped, failed = [], [], [], []
+    rows = []
+    seen = set()
+    for data in records:
+        name = ' '.join(str(data.get('name') or '').split())[:200]
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        location = ' '.join(str(data.get('location') or '').split())[:200]
+        if not location:
+            failed.append((name, 'missing location'))
+            continue
+        slug = existing.get(name)
+        if slug is None:
+            slug = unique_slug([name, f'{name} {location}'], taken)
+            created.append(name)
+        elif update:
+            updated.append(name)
+        else:
+            skipped.append(name)
+            continue
+        rows.append(Brewery(
+            name=name,
+            slug=slug,
+            location=location,
+            description=data.get('description') or '',
+            website=data.get('website') or '',
+        ))
+
+    if dry_run or not rows:
+        return IngestResult(created, updated, skipped, failed)
+
+    if update:
+        conflicts = {
+            'update_conflicts': True,
+            'unique_fields': ['slug'],
+            'update_fields': list(BREWERY_UPDATE_FIELDS),
+        }
+    else:
+        conflicts = {'ignore_conflicts': True}
+    with transaction.atomic():
+        Brewery.objects.bulk_create(rows, batch_size=batch_size, **conflicts)
+        cache.bump_version_on_commit(Brewery)
+        # Conflicting rows come back without a primary key
+        sitemaps.invalidate(Brewery, Brewery.objects.filter(
+            slug__in=[row.slug for row in rows]
+        ).values_list('pk', flat=True))
+    logger.info(f'Imported breweries: {len(created)} created, {len(updated)} updated')
+    return IngestResult(created, updated, skipped, failed)
+
+
+def clear_catalogue() -> Dict[str, int]:
+    """
+    Delete every beer, brewery and category, with their reviews and tags.
+
+    Uses one raw DELETE per table in dependency order instead of the ORM's
+    cascade collector, which loads every related row first. Afterwards
+    stored image references are recounted, so unused files are collected,
+    and scrape state is reset so the next scrape starts from scratch.
+
+    Returns:
+        Rows deleted per model label
+    """
+    images = set()
+    for model in (Beer, Brewery, Category):
+        images.update(model.objects.exclude(image='').exclude(image__isnull=True)
+                      .values_list('image', flat=True))
+    tagged = [ContentType.objects.get_for_model(model) for model in (Beer, Review)]
+
+    counts = {}
+    with transaction.atomic():
+        # Counted before the rows go
+        sitemaps.invalidate_all()
+        for queryset in (
+            ReviewLike.objects.all(),
+            ReviewComment.objects.all(),
+            TaggedItem.objects.filter(content_type__in=tagged),
+            Review.objects.all(),
+            Beer.objects.all(),
+            Brewery.objects.all(),
+            Category.objects.all(),
+            ScrapedPage.objects.all(),
+        ):
+            # Skips the cascade collector and delete signals
+            counts[queryset.model._meta.label] = queryset._raw_delete(queryset.db)
+        if getattr(default_storage, 'refcounted', False):
+            for name in images:
+                default_storage.recount(name)
+        for model in (Beer, Brewery, Category, Review):
+            cache.bump_version_on_commit(model)
+    return counts
+
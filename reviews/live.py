@@ -0,0 +1,56 @@
+"""
+Live events for the reviews app, pushed to browsers over server-sent events.
+
+Events:
+    review.approved  {'review_id', 'html'}  rendered home page review card
+    review.likes     {'review_id', 'like_count'}
+
+Both are published after the transaction commits, so subscribers never
+see a review or like count that was rolled back.
+"""
+
+import logging
+
+from django.db.models import Count
+from django.template.loader import render_to_string
+
+from core import broadcast
+
+from .models import Review
+
+
+logger = logging.getLogger('gbb.live')
+
+REVIEW_APPROVED = 'review.approved'
+REVIEW_LIKES = 'review.likes'
+
+
+def _publish(type, data):
+    try:
+        broadcast.publish(type, data)
+    except Exception as e:
+        # Live updates are best effort; never fail the write that caused them
+        logger.warning(f'Could not publish {type}: {e}')
+
+
+def publish_approved_reviews(review_ids):
+    """Publish rendered cards for newly approved reviews, oldest first."""
+    reviews = Review.objects.filter(
+        pk__in=review_ids, is_approved=True
+    ).select_related('beer__brewery', 'user').annotate(
+        like_count=Count('likes')
+    ).order_by('created_at')
+    for review in reviews:
+        _publish(REVIEW_APPROVED, {
+            'review_id': review.pk,
+            'html': render_to_string('core/partials/review_card.html', {'review': review}),
+        })
+
+
+def publish_like_count(review_id):
+    """Publish the current like count for a review."""
+    review = Review.objects.filter(pk=review_id, is_approved=True).annotate(
+        like_count=Count('likes')
+    ).values('like_count').first()
+    if review is not None:
+        _publish(REVIEW_LIKES, {'review_id': review_id, 'like_count': review['like_count']})
@@ -0,0 +1,114 @@
+"""
+Django management command to benchmark brewery scrapers offline.
+
+Parses each brewery's recorded beers page and reports pages/sec,
+beers/sec, parse time per page and peak memory per scraper. Record the
+pages first with ``--record``, which fetches them live once.
+
+Usage:
+    python manage.py benchmark_scrapers --record
+    python manage.py benchmark_scrapers
+    python manage.py benchmark_scrapers --brewery "Harveys & Son" --repeat 50
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.scrapers.benchmark import DEFAULT_REPEAT, benchmark_scraper, fixture_dir, offline
+from reviews.scrapers.brewery_scrapers.breweries import BREWERY_SPECS
+from reviews.scrapers.brewery_scrapers.spec import SpecScraper
+from reviews.scrapers.utils.http_fixtures import record
+
+
+DEFAULT_FIXTURES = settings.BASE_DIR / 'tests' / 'fixtures' / 'scrapers'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark brewery scrapers against recorded pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brewery',
+            type=str,
+            help='Benchmark only this brewery'
+        )
+
+        parser.add_argument(
+            '--fixtures',
+            default=str(DEFAULT_FIXTURES),
+            help='Directory of recorded pages (default: tests/fixtures/scrapers)'
+        )
+
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            help='Fetch the pages live and record them instead of benchmarking'
+        )
+
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=DEFAULT_REPEAT,
+            help=f'Times each page is parsed (default: {DEFAULT_REPEAT})'
+        )
+
+    def handle(self, *args, **options):
+        specs = [spec for spec in BREWERY_SPECS if options['brewery'] in (None, spec.name)]
+        if not specs:
+            self.stdout.write(self.style.ERROR(f'No brewery named: {options["brewery"]}'))
+            self.stdout.write(f'Available breweries: {", ".join(spec.name for spec in BREWERY_SPECS)}')
+            return
+
+        if options['record']:
+            self._record(specs, options['fixtures'])
+            return
+
+        rows = []
+        for spec in specs:
+            scraper = SpecScraper(spec)
+            directory = fixture_dir(options['fixtures'], scraper)
+            try:
+                if not directory.exists():
+                    self.stdout.write(self.style.WARNING(
+                        f'{spec.name}: no recorded pages in {directory}; run with --record'
+                    ))
+                    continue
+                offline(scraper, directory)
+                rows.append(benchmark_scraper(scraper, repeat=max(1, options['repeat'])))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'{spec.name}: {e}'))
+            finally:
+                scraper.close()
+
+        if not rows:
+            return
+
+        self.stdout.write(f'\n{"=" * 90}')
+        self.stdout.write(
+            f'{"Brewery":<24} {"Scraper":<14} {"Pages":>6} {"Beers":>6} '
+            f'{"Pages/s":>9} {"Beers/s":>10} {"ms/page":>9} {"Peak KiB":>9}'
+        )
+        self.stdout.write('=' * 90)
+        for row in rows:
+            self.stdout.write(
+                f'{row.name[:24]:<24} {row.scraper[:14]:<14} {row.pages:>6} {row.beers:>6} '
+                f'{row.pages_per_second:>9.1f} {row.beers_per_second:>10.1f} '
+                f'{row.ms_per_page:>9.2f} {row.peak_memory / 1024:>9.0f}'
+            )
+        self.stdout.write('=' * 90 + '\n')
+
+    def _record(self, specs, root):
+        for spec in specs:
+            scraper = SpecScraper(spec)
+            directory = fixture_dir(root, scraper)
+            try:
+                store = record(scraper.session, directory)
+                beers = scraper.fetch_beers()
+                self.stdout.write(
+                    f'{spec.name}: recorded {len(store.entries())} responses '
+                    f'({len(beers)} beers) to {directory}'
+                )
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'{spec.name}: {e}'))
+            finally:
+                scraper.close()
@@ -0,0 +1,36 @@
+"""
+Django management command to pre-render sitemap shards.
+
+Usage:
+    python manage.py build_sitemaps
+    python manage.py build_sitemaps --section beers reviews
+"""
+
+import time
+from django.core.management.base import BaseCommand
+
+from reviews.sitemaps import SITEMAPS, build_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the sitemap index and shards into the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--section',
+            nargs='+',
+            choices=list(SITEMAPS),
+            help='Only rebuild these sections (the index is always rebuilt)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        written = build_sitemaps(options['section'])
+
+        for filename, size in written:
+            self.stdout.write(f'  {filename} ({size:,} bytes)')
+
+        duration = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {len(written)} sitemaps in {duration:.2f}s'
+        ))
@@ -2,24 +2,35 @@
 Django management command to run daily beer scraping.
 Scrapes beers from brewery websites and updates the database.
 
+Runs are incremental: each beers page's content hash and a fingerprint
+per listed beer are kept in ``ScrapedPage``. Pages that haven't changed
+since the last run are neither parsed nor reconciled, and for the rest
+only new beers, changed ABV/description/image URL and beers no longer
+listed are acted on and reported.
+
 Usage:
     python manage.py daily_beer_scrape
     python manage.py daily_beer_scrape --dry-run
+    python manage.py daily_beer_scrape --skip-warm
+    python manage.py daily_beer_scrape --concurrency 4
+    python manage.py daily_beer_scrape --full
 """
 
 import logging
 from datetime import datetime
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from django.db import transaction
-from slugify import slugify
+from django.utils import timezone
 from pathlib import Path
 
-from reviews.models import Brewery, Beer, Category
-from reviews.scrapers.brewery_scrapers.darkstar import DarkStarScraper
-from reviews.scrapers.brewery_scrapers.harveys import HarveysScraper
-from reviews.scrapers.brewery_scrapers.brighton_bier import BrightonBierScraper
-from reviews.scrapers.brewery_scrapers.burning_sky import BurningSkyScraper
-from reviews.scrapers.utils.normalizers import STYLE_TO_CATEGORY, DEFAULT_CATEGORY
+from core import jobs
+from reviews.ingest import BeerIngestor
+from reviews.models import Brewery, Beer, ScrapedPage
+from reviews.scrapers.engine import DEFAULT_MAX_CONCURRENCY, ScrapeEngine
+from reviews.scrapers.brewery_scrapers.breweries import BREWERY_SPECS
+from reviews.scrapers.brewery_scrapers.spec import SpecScraper
+from reviews.scrapers.utils.fingerprints import diff_records, fingerprint_records, record_key
+from reviews.scrapers.utils.http_cache import format_cache_stats
 
 
 # Set up logging
@@ -35,6 +46,22 @@ class Command(BaseCommand):
             action='store_true',
             help='Run without saving to database'
         )
+        parser.add_argument(
+            '--skip-warm',
+            action='store_true',
+            help='Do not warm caches after scraping'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=DEFAULT_MAX_CONCURRENCY,
+            help=f'Most requests in flight across all sites (default: {DEFAULT_MAX_CONCURRENCY})'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Parse every page even if unchanged since the last run'
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
@@ -51,6 +78,14 @@ class Command(BaseCommand):
         logger.addHandler(file_handler)
         logger.setLevel(logging.INFO)
 
+        # Workers run this repeatedly in one process: don't pile up handlers
+        try:
+            self._run(dry_run, options)
+        finally:
+            logger.removeHandler(file_handler)
+            file_handler.close()
+
+    def _run(self, dry_run, options):
         self.stdout.write(self.style.SUCCESS('\n' + '='*70))
         self.stdout.write(self.style.SUCCESS('Daily Beer Scraping - ' + datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
         self.stdout.write(self.style.SUCCESS('='*70 + '\n'))
@@ -59,131 +94,184 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('[DRY RUN MODE]\n'))
 
         # Define breweries and their scrapers
-        breweries = [
-            ('Dark Star Brewing Co', DarkStarScraper),
-            ('Harveys & Son', HarveysScraper),
-            ('Brighton Bier', BrightonBierScraper),
-            ('Burning Sky Brewery', BurningSkyScraper),
-        ]
+        breweries = [(spec.name, spec) for spec in BREWERY_SPECS]
 
-        total_added = 0
+        totals = {'added': 0, 'changed': 0, 'removed': 0}
         total_errors = 0
+        unchanged = 0
+
+        self.ingestor = BeerIngestor(default_abv=5.0, description_limit=500)
+
+        # State from the last run; --full still diffs records, just
+        # without skipping unchanged pages
+        pages = {page.url: page for page in ScrapedPage.objects.all()}
+        fingerprints = {} if options['full'] else {
+            url: page.content_hash for url, page in pages.items()
+        }
 
-        for brewery_name, scraper_class in breweries:
+        # Fetch every site concurrently, then save one brewery at a time
+        jobs.report_progress(0, len(breweries), f'Fetching {len(breweries)} brewery websites')
+        scrapers = [SpecScraper(spec) for _, spec in breweries]
+        try:
+            engine = ScrapeEngine(options['concurrency'], fingerprints=fingerprints)
+            results = engine.scrape(scrapers)
+        finally:
+            for scraper in scrapers:
+                scraper.close()
+        slowest = max((result.elapsed for result in results), default=0)
+        self.stdout.write(f'Fetched {len(results)} websites in {slowest:.1f}s')
+
+        for done, ((brewery_name, _), result) in enumerate(zip(breweries, results)):
+            jobs.report_progress(done, len(breweries), brewery_name)
             try:
-                added = self._scrape_brewery(brewery_name, scraper_class, dry_run)
-                total_added += added
+                counts = self._scrape_brewery(brewery_name, result, pages, dry_run)
             except Exception as e:
                 total_errors += 1
                 logger.error(f'Error processing {brewery_name}: {e}', exc_info=True)
                 self.stdout.write(
                     self.style.ERROR(f'  [!] Error: {brewery_name} - {e}')
                 )
+                continue
+            if counts is None:
+                unchanged += 1
+                continue
+            for key, count in counts.items():
+                totals[key] += count
+
+        jobs.report_progress(len(breweries), len(breweries), 'Scraping finished')
 
         # Print summary
         self.stdout.write(f'\n{"="*70}')
         self.stdout.write(self.style.SUCCESS('Summary'))
         self.stdout.write('='*70)
-        self.stdout.write(f'  New beers added: {total_added}')
+        self.stdout.write(f'  Pages unchanged: {unchanged} of {len(results)}')
+        self.stdout.write(f'  New beers added: {totals["added"]}')
+        self.stdout.write(f'  Beers changed: {totals["changed"]}')
+        self.stdout.write(f'  Beers no longer listed: {totals["removed"]}')
         self.stdout.write(f'  Errors: {total_errors}')
         self.stdout.write(f'  Total beers in database: {Beer.objects.count()}')
         self.stdout.write(f'  Total breweries: {Brewery.objects.count()}')
+        cache_summary = format_cache_stats()
+        if cache_summary:
+            self.stdout.write(cache_summary)
+            logger.info(f'HTTP cache:\n{cache_summary}')
         self.stdout.write('='*70 + '\n')
 
-        logger.info(f'Daily scrape complete: {total_added} beers added, {total_errors} errors')
+        logger.info(
+            f'Daily scrape complete: {unchanged} pages unchanged, {totals["added"]} beers added, '
+            f'{totals["changed"]} changed, {totals["removed"]} no longer listed, {total_errors} errors'
+        )
 
-    def _scrape_brewery(self, brewery_name, scraper_class, dry_run):
-        """Scrape beers from a specific brewery."""
+        # New or changed beers invalidate home, listing and sitemap caches:
+        # refill them. Nothing to do when nothing changed.
+        if dry_run or options['skip_warm'] or not (totals['added'] or totals['changed']):
+            return
+        jobs.report_progress(len(breweries), len(breweries), 'Warming caches')
+        self.stdout.write('\nWarming caches...')
+        call_command('warm_caches', stdout=self.stdout)
+
+    def _scrape_brewery(self, brewery_name, result, pages, dry_run):
+        """
+        Apply the changes found on a brewery's beers page.
+
+        Args:
+            brewery_name: Name of the brewery
+            result: The brewery's ``ScrapeResult``
+            pages: ``ScrapedPage`` objects from the last run, by URL
+            dry_run: Report changes without saving anything
+
+        Returns:
+            Dict of ``added``/``changed``/``removed`` counts, or None if
+            the page was unchanged
+        """
         self.stdout.write(f'\n{brewery_name}')
         self.stdout.write('-' * 70)
 
         # Get or create brewery
-        brewery = Brewery.objects.filter(name=brewery_name).first()
-        if not brewery and not dry_run:
-            brewery = Brewery.objects.create(
-                name=brewery_name,
-                slug=slugify(brewery_name),
-                location='United Kingdom',
-                description=f'{brewery_name} - British Brewery'
-            )
-            logger.info(f'Created brewery: {brewery_name}')
-
-        # Initialize scraper
-        try:
-            scraper = scraper_class()
-            beers_data = scraper.fetch_beers()
-            self.stdout.write(f'  Found {len(beers_data)} beers on website')
-            logger.info(f'{brewery_name}: Found {len(beers_data)} beers')
-        except Exception as e:
-            logger.error(f'{brewery_name}: Scraping failed - {e}')
+        brewery = self.ingestor.get_brewery(
+            brewery_name,
+            create=not dry_run,
+            location='United Kingdom',
+            description=f'{brewery_name} - British Brewery',
+        ) or Brewery(name=brewery_name)
+
+        if result.error is not None:
+            logger.error(f'{brewery_name}: Scraping failed - {result.error}')
             self.stdout.write(
-                self.style.WARNING(f'  [!] Could not scrape: {e}')
+                self.style.WARNING(f'  [!] Could not scrape: {result.error}')
             )
-            return 0
-
-        if not beers_data:
-            return 0
-
-        # Process beers
-        beers_added = 0
-        for beer_data in beers_data:
-            beer_name = beer_data.get('name', '').strip()
-            if not beer_name:
-                continue
-
-            # Skip if already exists
-            if brewery and Beer.objects.filter(name__iexact=beer_name, brewery=brewery).exists():
-                continue
+            return {'added': 0, 'changed': 0, 'removed': 0}
+
+        if result.unchanged:
+            self.stdout.write(f'  Unchanged since last run ({result.elapsed:.1f}s)')
+            logger.info(f'{brewery_name}: Page unchanged')
+            if not dry_run:
+                ScrapedPage.objects.filter(url__in=result.pages).update(fetched_at=timezone.now())
+            return None
+
+        url = result.scraper.beers_url
+        content_hash = result.pages.get(url)
+        beers_data = result.beers
+        self.stdout.write(f'  Found {len(beers_data)} beers on website ({result.elapsed:.1f}s)')
+        logger.info(f'{brewery_name}: Found {len(beers_data)} beers')
+        if content_hash is None:
+            # Page never fetched: nothing to compare
+            return {'added': 0, 'changed': 0, 'removed': 0}
+
+        page = pages.get(url)
+        changes = diff_records(page.records if page else {}, beers_data)
+        records = fingerprint_records(beers_data)
+
+        # New beers are created unless already in the database, as before
+        # the page was first recorded; only beers the page shows changed
+        # get their new ABV/description
+        ingested = [
+            self.ingestor.ingest(brewery, beers, update=update, dry_run=dry_run)
+            for beers, update in (
+                (changes.added, False),
+                ([beer_data for beer_data, _ in changes.changed], True),
+            )
+            if beers
+        ]
+        created = [name for result in ingested for name in result.created]
+        failed = [failure for result in ingested for failure in result.failed]
 
+        for beer_name in created:
             if dry_run:
                 self.stdout.write(f'    [DRY RUN] Would add: {beer_name}')
-                beers_added += 1
-                continue
-
-            # Add beer
-            try:
-                # Get category
-                style = beer_data.get('style', 'Ale')
-                category_name = STYLE_TO_CATEGORY.get(style.lower(), DEFAULT_CATEGORY)
-                category, _ = Category.objects.get_or_create(
-                    name=category_name,
-                    defaults={
-                        'slug': slugify(category_name),
-                        'description': f'{category_name} beers'
-                    }
-                )
-
-                # Handle ABV
-                abv = beer_data.get('abv')
-                if abv is None or abv == '':
-                    abv = 5.0
-
-                # Handle IBU
-                ibu = beer_data.get('ibu')
-                if ibu == '':
-                    ibu = None
-
-                # Create beer
-                beer = Beer.objects.create(
-                    name=beer_name,
-                    slug=slugify(beer_name),
-                    brewery=brewery,
-                    category=category,
-                    description=beer_data.get('description', '')[:500],
-                    abv=abv,
-                    ibu=ibu,
-                )
-
-                self.stdout.write(
-                    self.style.SUCCESS(f'    [+] Added: {beer_name}')
-                )
+            else:
+                self.stdout.write(self.style.SUCCESS(f'    [+] Added: {beer_name}'))
                 logger.info(f'Added beer: {beer_name} ({brewery_name})')
-                beers_added += 1
-
-            except Exception as e:
-                logger.error(f'Error adding beer {beer_name}: {e}')
-                self.stdout.write(
-                    self.style.ERROR(f'    [!] Failed to add: {beer_name}')
-                )
 
-        return beers_added
+        for beer_name, error in failed:
+            logger.error(f'Error adding beer {beer_name}: {error}')
+            self.stdout.write(self.style.ERROR(f'    [!] Failed to add: {beer_name}'))
+            # Leave it out of the state so the next run reports it as new
+            records.pop(record_key({'name': beer_name}), None)
+
+        for beer_data, fields in changes.changed:
+            beer_name = beer_data['name'].strip()
+            prefix = '[DRY RUN] Would update' if dry_run else '[~] Changed'
+            self.stdout.write(f'    {prefix}: {beer_name} ({", ".join(fields)})')
+            logger.info(f'Changed beer: {beer_name} ({brewery_name}): {", ".join(fields)}')
+
+        for beer_name in changes.removed:
+            self.stdout.write(self.style.WARNING(f'    [-] No longer listed: {beer_name}'))
+            logger.info(f'Beer no longer listed: {beer_name} ({brewery_name})')
+
+        if not dry_run:
+            ScrapedPage.objects.update_or_create(url=url, defaults={
+                # No hash after failures, so the next run re-parses the
+                # page and retries them even if it hasn't changed
+                'content_hash': '' if failed else content_hash,
+                'records': records,
+                'changed_at': timezone.now() if changes or not page else page.changed_at,
+            })
+        if not changes:
+            self.stdout.write('  No beer changes')
+
+        return {
+            'added': len(created),
+            'changed': len(changes.changed),
+            'removed': len(changes.removed),
+        }
@@ -8,15 +8,13 @@ from typing import Dict, List
 from django.core.management.base import BaseCommand
 from django.core.files.base import ContentFile
 from django.db.models import Q
-import requests
 from PIL import Image
 from io import BytesIO
 
 from reviews.models import Beer, Brewery
-from reviews.scrapers.brewery_scrapers.darkstar import DarkStarScraper
-from reviews.scrapers.brewery_scrapers.harveys import HarveysScraper
-from reviews.scrapers.brewery_scrapers.brighton_bier import BrightonBierScraper
-from reviews.scrapers.brewery_scrapers.burning_sky import BurningSkyScraper
+from reviews.scrapers.brewery_scrapers.breweries import BREWERY_SPECS
+from reviews.scrapers.brewery_scrapers.spec import SpecScraper
+from reviews.scrapers.utils.http_cache import cached_session, format_cache_stats
 
 
 logger = logging.getLogger('beer_scraper')
@@ -49,6 +47,7 @@ class Command(BaseCommand):
             logging.basicConfig(level=logging.INFO)
 
         dry_run = options['dry_run']
+        self.session = cached_session('images')
         specific_brewery = options.get('brewery')
 
         self.stdout.write(self.style.SUCCESS('\n' + '='*60))
@@ -59,12 +58,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('[!] DRY RUN - No images will be saved\n'))
 
         # Initialize scrapers
-        scrapers = {
-            'Dark Star Brewing Co': DarkStarScraper(),
-            'Harveys & Son': HarveysScraper(),
-            'Brighton Bier': BrightonBierScraper(),
-            'Burning Sky Brewery': BurningSkyScraper(),
-        }
+        scrapers = {spec.name: SpecScraper(spec) for spec in BREWERY_SPECS}
 
         # Filter to specific brewery if requested
         if specific_brewery:
@@ -131,6 +125,9 @@ class Command(BaseCommand):
         self.stdout.write(f'  [+] Images updated: {total_updated}')
         self.stdout.write(f'  [!] Failed downloads: {total_failed}')
         self.stdout.write(f'  [-] Not found on website: {total_not_found}')
+        cache_summary = format_cache_stats()
+        if cache_summary:
+            self.stdout.write(cache_summary)
         self.stdout.write('='*60 + '\n')
 
     def _match_and_update_images(self, db_beers, scraped_beers: List[Dict],
@@ -210,7 +207,7 @@ class Command(BaseCommand):
         try:
             logger.debug(f'Downloading image: {url}')
 
-            response = requests.get(url, timeout=30)
+            response = self.session.get(url, timeout=30)
             response.raise_for_status()
 
             # Open with PIL
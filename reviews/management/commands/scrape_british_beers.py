@@ -4,6 +4,9 @@ Django management command to scrape British beer data.
 Usage:
     python manage.py scrape_british_beers --sources all --dry-run
     python manage.py scrape_british_beers --sources openbrewerydb --max-breweries 10
+    python manage.py scrape_british_beers --update-existing
+    python manage.py scrape_british_beers --offline
+    python manage.py scrape_british_beers --snapshot-max-age 24 --workers 8
 """
 
 import logging
@@ -11,13 +14,14 @@ import time
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from django.db import transaction
 from pathlib import Path
 from tqdm import tqdm
 from slugify import slugify
 
+from reviews.ingest import clear_catalogue, import_breweries
 from reviews.models import Category, Brewery, Beer
-from reviews.scrapers.api_scrapers.openbrewerydb import OpenBreweryDBScraper
+from reviews.scrapers.api_scrapers.openbrewerydb import DEFAULT_WORKERS, OpenBreweryDBScraper
+from reviews.scrapers.utils.http_cache import format_cache_stats
 from reviews.scrapers.utils.normalizers import STYLE_TO_CATEGORY, DEFAULT_CATEGORY
 
 
@@ -58,6 +62,32 @@ class Command(BaseCommand):
             help='Delete all existing beers, breweries, categories before scraping'
         )
 
+        parser.add_argument(
+            '--update-existing',
+            action='store_true',
+            help='Refresh description, location and website of breweries already imported'
+        )
+
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Import from the latest Open Brewery DB snapshot without using the network'
+        )
+
+        parser.add_argument(
+            '--snapshot-max-age',
+            type=float,
+            default=None,
+            help='Reuse the latest snapshot if it is younger than this many hours'
+        )
+
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f'Open Brewery DB pages fetched concurrently (default: {DEFAULT_WORKERS})'
+        )
+
         parser.add_argument(
             '--max-breweries',
             type=int,
@@ -80,6 +110,10 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.dry_run = options['dry_run']
         self.clear_existing = options['clear_existing']
+        self.update_existing = options['update_existing']
+        self.offline = options['offline']
+        self.snapshot_max_age = options['snapshot_max_age']
+        self.workers = options['workers']
         self.max_breweries = options['max_breweries']
         self.skip_images = options['skip_images']
         self.verbose = options['verbose']
@@ -139,18 +173,11 @@ class Command(BaseCommand):
 
     def _clear_existing_data(self):
         """Delete all existing beers, breweries, and categories."""
-        with transaction.atomic():
-            beer_count = Beer.objects.count()
-            brewery_count = Brewery.objects.count()
-            category_count = Category.objects.count()
-
-            Beer.objects.all().delete()
-            Brewery.objects.all().delete()
-            Category.objects.all().delete()
-
-            self.stdout.write(self.style.WARNING(
-                f"Deleted {beer_count} beers, {brewery_count} breweries, {category_count} categories"
-            ))
+        counts = clear_catalogue()
+        self.stdout.write(self.style.WARNING(
+            f"Deleted {counts['reviews.Beer']} beers, {counts['reviews.Brewery']} breweries, "
+            f"{counts['reviews.Category']} categories, {counts['reviews.Review']} reviews"
+        ))
 
     def _create_categories(self):
         """Create standard British beer categories."""
@@ -191,39 +218,43 @@ class Command(BaseCommand):
 
     def _scrape_openbrewerydb(self, categories):
         """Scrape breweries from Open Brewery DB."""
-        scraper = OpenBreweryDBScraper()
+        scraper = OpenBreweryDBScraper(max_workers=self.workers)
 
         try:
             # Fetch breweries
             self.stdout.write("Fetching UK breweries...")
-            brewery_data = scraper.fetch_breweries(limit=self.max_breweries)
+            max_age = self.snapshot_max_age * 3600 if self.snapshot_max_age is not None else None
+            brewery_data = scraper.fetch_breweries(
+                limit=self.max_breweries, offline=self.offline, max_age=max_age
+            )
 
             self.stdout.write(f"Found {len(brewery_data)} breweries")
-
-            # Create breweries
-            breweries_created = 0
-
-            for data in tqdm(brewery_data, desc="Creating breweries"):
-                if not self.dry_run:
-                    try:
-                        brewery, created = Brewery.objects.get_or_create(
-                            name=data['name'],
-                            defaults={
-                                'slug': slugify(data['name']),
-                                'description': data.get('description', ''),
-                                'location': data['location'],
-                                'website': data.get('website', ''),
-                            }
-                        )
-                        if created:
-                            breweries_created += 1
-                            logger.info(f"Created brewery: {data['name']}")
-                    except Exception as e:
-                        logger.error(f"Error creating brewery {data['name']}: {e}")
+            if scraper.snapshot:
+                self.stdout.write(
+                    f"Snapshot: {scraper.snapshot.path.name} "
+                    f"(taken {scraper.snapshot.taken_at:%Y-%m-%d %H:%M} UTC)"
+                )
+            if scraper.snapshot_diff:
+                self.stdout.write(f"Changes since last snapshot: {scraper.snapshot_diff.summary()}")
+
+            # Create breweries in bulk
+            result = import_breweries(
+                brewery_data, update=self.update_existing, dry_run=self.dry_run
+            )
+            for name in result.created:
+                if self.dry_run:
+                    self.stdout.write(f"Would create brewery: {name}")
                 else:
-                    self.stdout.write(f"Would create brewery: {data['name']} ({data['location']})")
-
-            self.stdout.write(self.style.SUCCESS(f"Created {breweries_created} breweries"))
+                    logger.debug(f"Created brewery: {name}")
+            for name, error in result.failed:
+                logger.error(f"Error creating brewery {name}: {error}")
+
+            verb = 'Would create' if self.dry_run else 'Created'
+            self.stdout.write(self.style.SUCCESS(
+                f"{verb} {len(result.created)} breweries "
+                f"({len(result.updated)} updated, {len(result.skipped)} already present, "
+                f"{len(result.failed)} failed)"
+            ))
 
             # Print stats
             stats = scraper.get_stats()
@@ -241,6 +272,9 @@ class Command(BaseCommand):
         self.stdout.write("=" * 50)
 
         self.stdout.write(f"Duration: {duration:.1f} seconds")
+        cache_summary = format_cache_stats()
+        if cache_summary:
+            self.stdout.write(cache_summary)
 
         if not self.dry_run:
             self.stdout.write(f"\nCategories: {Category.objects.count()}")
@@ -4,18 +4,28 @@ Django management command to scrape beer data from RateBeer for existing breweri
 Usage:
     python manage.py scrape_ratebeer_beers --brewery "Dark Star" --limit 10
     python manage.py scrape_ratebeer_beers --all --limit 5 --dry-run
+    python manage.py scrape_ratebeer_beers --all --workers 8
+    python manage.py scrape_ratebeer_beers --all --restart
+
+``--all`` runs are resumable: breweries whose beers have been saved are
+recorded in a checkpoint file, and an interrupted run skips them next
+time. The checkpoint is deleted once a run finishes every brewery.
 """
 
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.core.management.base import BaseCommand
-from django.db import transaction
-from slugify import slugify
+from django.db import connection, transaction
 from pathlib import Path
 from tqdm import tqdm
 
-from reviews.models import Category, Brewery, Beer
+from reviews.ingest import BeerIngestor
+from reviews.models import Brewery
 from reviews.scrapers.platform_scrapers.ratebeer_scraper import RateBeerScraper, RATEBEER_AVAILABLE
-from reviews.scrapers.utils.normalizers import STYLE_TO_CATEGORY, DEFAULT_CATEGORY
+from reviews.scrapers.utils.checkpoint import Checkpoint
+from reviews.scrapers.utils.http_cache import format_cache_stats
 
 
 # Set up logging
@@ -30,6 +40,13 @@ logging.basicConfig(
 
 logger = logging.getLogger('ratebeer_scraper')
 
+DEFAULT_WORKERS = 4
+
+# Most breweries saved per writer transaction
+WRITE_BATCH = 25
+
+DEFAULT_CHECKPOINT = Path('logs') / 'ratebeer_checkpoint.json'
+
 
 class Command(BaseCommand):
     help = 'Scrape beer data from RateBeer for existing breweries'
@@ -60,6 +77,25 @@ class Command(BaseCommand):
             help='Preview what would be scraped without database changes'
         )
 
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f'Breweries fetched concurrently (default: {DEFAULT_WORKERS})'
+        )
+
+        parser.add_argument(
+            '--checkpoint',
+            default=str(DEFAULT_CHECKPOINT),
+            help=f'File recording finished breweries (default: {DEFAULT_CHECKPOINT})'
+        )
+
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the checkpoint and process every brewery again'
+        )
+
         parser.add_argument(
             '--verbose',
             action='store_true',
@@ -102,117 +138,173 @@ class Command(BaseCommand):
             )
             return
 
-        self.stdout.write(f'\nFound {breweries.count()} breweries to scrape\n')
+        breweries = list(breweries.order_by('pk'))
+        # Only whole-catalogue runs are checkpointed; a --brewery run
+        # mustn't make the next --all run skip breweries
+        checkpoint = Checkpoint(options['checkpoint']) if options['all'] else None
+        if checkpoint is not None and options['restart']:
+            checkpoint.clear()
+        todo = [brewery for brewery in breweries if checkpoint is None or brewery.pk not in checkpoint]
+        resumed = len(breweries) - len(todo)
+        self.stdout.write(
+            f'\nFound {len(breweries)} breweries to scrape'
+            + (f' ({resumed} already done, resuming)' if resumed else '') + '\n'
+        )
 
-        # Initialize RateBeer scraper
+        # Fail fast if the client can't be set up at all
         try:
-            scraper = RateBeerScraper()
+            RateBeerScraper().close()
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Failed to initialize RateBeer scraper: {e}')
             )
             return
 
-        total_beers_created = 0
-        total_beers_skipped = 0
-
-        # Scrape each brewery
-        for brewery in tqdm(breweries, desc="Processing breweries"):
-            self.stdout.write(f'\n{"-" * 60}')
-            self.stdout.write(f'Brewery: {brewery.name}')
-            self.stdout.write(f'{"-" * 60}')
+        self.totals = {'breweries': 0, 'done': 0, 'errors': 0, 'created': 0, 'skipped': 0, 'failed': 0}
 
-            # Fetch beers from RateBeer
-            try:
-                beer_data_list = scraper.fetch_beers(
-                    brewery_name=brewery.name,
-                    limit=self.limit
-                )
-            except Exception as e:
-                logger.error(f'Error fetching beers for {brewery.name}: {e}')
-                self.stdout.write(
-                    self.style.ERROR(f'  Failed to fetch beers: {e}')
-                )
-                continue
-
-            if not beer_data_list:
-                self.stdout.write(
-                    self.style.WARNING(f'  No beers found on RateBeer')
-                )
-                continue
-
-            self.stdout.write(f'  Found {len(beer_data_list)} beers on RateBeer')
-
-            # Create beers in database
-            for beer_data in beer_data_list:
-                created = self._create_beer(brewery, beer_data)
-                if created:
-                    total_beers_created += 1
-                else:
-                    total_beers_skipped += 1
+        # Workers fetch concurrently, each with its own client, all paced by
+        # the shared RateBeer host limiter; one thread does every DB write
+        workers = max(1, options['workers'])
+        results = queue.Queue(maxsize=workers * 4)
+        writer = threading.Thread(
+            target=self._write_results, args=(results, checkpoint), name='ratebeer-writer'
+        )
+        writer.start()
+        local = threading.local()
+        scrapers = []
+
+        def fetch(brewery):
+            if not hasattr(local, 'scraper'):
+                local.scraper = RateBeerScraper()
+                scrapers.append(local.scraper)
+            beers = local.scraper.fetch_beers(brewery_name=brewery.name, limit=self.limit)
+            return brewery, beers, local.scraper.last_error
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ratebeer')
+        try:
+            futures = [pool.submit(fetch, brewery) for brewery in todo]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Processing breweries"):
+                try:
+                    results.put(future.result())
+                except Exception as e:
+                    logger.error(f'Error fetching beers: {e}')
+            pool.shutdown()
+        except BaseException:
+            # Interrupted: saved breweries are checkpointed, the rest rerun
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            results.put(None)
+            writer.join()
+            for scraper in scrapers:
+                scraper.close()
+
+        remaining = len(todo) - self.totals['done']
 
         # Print summary
         self.stdout.write(f'\n{"=" * 60}')
         self.stdout.write(self.style.SUCCESS('Summary'))
         self.stdout.write('=' * 60)
-        self.stdout.write(f'  Beers created: {total_beers_created}')
-        self.stdout.write(f'  Beers skipped (already exist): {total_beers_skipped}')
+        self.stdout.write(f'  Breweries processed: {self.totals["breweries"]} ({self.totals["errors"]} errors)')
+        self.stdout.write(f'  Beers created: {self.totals["created"]}')
+        self.stdout.write(f'  Beers skipped (already exist): {self.totals["skipped"]}')
+        self.stdout.write(f'  Beers failed: {self.totals["failed"]}')
+        cache_summary = format_cache_stats()
+        if cache_summary:
+            self.stdout.write(cache_summary)
         self.stdout.write('=' * 60 + '\n')
 
         if self.dry_run:
             self.stdout.write(self.style.WARNING("\n=== DRY RUN COMPLETE - No changes were saved ===\n"))
+        elif remaining and checkpoint is not None:
+            self.stdout.write(self.style.WARNING(
+                f"\n=== {remaining} breweries left; run again to resume ===\n"
+            ))
         else:
+            if checkpoint is not None:
+                checkpoint.clear()
             self.stdout.write(self.style.SUCCESS("\n=== SCRAPING COMPLETE ===\n"))
 
-        scraper.close()
-
-    def _create_beer(self, brewery, beer_data):
-        """Create a beer in the database."""
-        if self.dry_run:
-            self.stdout.write(f'    [DRY RUN] Would create: {beer_data["name"]}')
-            return True
+    def _write_results(self, results, checkpoint):
+        """
+        Writer thread: save fetched breweries in batches.
 
+        Whatever has queued up (at most ``WRITE_BATCH`` breweries) is saved
+        in one transaction, then checkpointed.
+        """
+        ingestor = BeerIngestor()
+        batch = []
         try:
-            # Check if beer already exists
-            existing = Beer.objects.filter(
-                name__iexact=beer_data['name'],
-                brewery=brewery
-            ).first()
-
-            if existing:
-                logger.debug(f'Beer already exists: {beer_data["name"]}')
-                return False
-
-            # Get or create category
-            category_name = beer_data.get('category', DEFAULT_CATEGORY)
-            category, _ = Category.objects.get_or_create(
-                name=category_name,
-                defaults={
-                    'slug': slugify(category_name),
-                    'description': f'{category_name} beers'
-                }
-            )
-
-            # Create beer
-            beer = Beer.objects.create(
-                name=beer_data['name'],
-                slug=slugify(beer_data['name']),
-                brewery=brewery,
-                category=category,
-                description=beer_data.get('description', ''),
-                abv=beer_data.get('abv'),
-                ibu=beer_data.get('ibu'),
-            )
-
-            logger.info(f'Created beer: {beer.name} ({brewery.name})')
-            self.stdout.write(
-                self.style.SUCCESS(f'    [+] Created: {beer.name}')
-            )
-            return True
-
-        except Exception as e:
-            logger.error(f'Error creating beer {beer_data["name"]}: {e}')
-            self.stdout.write(
-                self.style.ERROR(f'    [!] Failed: {beer_data["name"]} - {e}')
-            )
-            return False
+            while True:
+                item = results.get()
+                if item is not None:
+                    batch.append(item)
+                if batch and (item is None or len(batch) >= WRITE_BATCH or results.empty()):
+                    try:
+                        self._save_batch(ingestor, batch, checkpoint)
+                    except Exception as e:
+                        logger.error(f'Error saving batch of {len(batch)} breweries: {e}', exc_info=True)
+                    batch = []
+                if item is None:
+                    return
+        finally:
+            connection.close()
+
+    def _save_batch(self, ingestor, batch, checkpoint):
+        done = []
+        with transaction.atomic():
+            for brewery, beer_data_list, error in batch:
+                self.stdout.write(f'\n{"-" * 60}')
+                self.stdout.write(f'Brewery: {brewery.name}')
+                self.stdout.write(f'{"-" * 60}')
+                self.totals['breweries'] += 1
+
+                if error is not None:
+                    self.totals['errors'] += 1
+                    self.stdout.write(
+                        self.style.ERROR(f'  Failed to fetch beers: {error}')
+                    )
+                    continue
+
+                if not beer_data_list:
+                    self.stdout.write(
+                        self.style.WARNING(f'  No beers found on RateBeer')
+                    )
+                    done.append(brewery.pk)
+                    continue
+
+                self.stdout.write(f'  Found {len(beer_data_list)} beers on RateBeer')
+
+                # Create beers in database, in one bulk insert per brewery
+                try:
+                    result = ingestor.ingest(brewery, beer_data_list, dry_run=self.dry_run)
+                except Exception as e:
+                    self.totals['errors'] += 1
+                    logger.error(f'Error saving beers for {brewery.name}: {e}')
+                    self.stdout.write(
+                        self.style.ERROR(f'  Failed to save beers: {e}')
+                    )
+                    continue
+                self._report(brewery, result)
+                self.totals['created'] += len(result.created)
+                self.totals['skipped'] += len(result.skipped)
+                self.totals['failed'] += len(result.failed)
+                done.append(brewery.pk)
+
+        self.totals['done'] += len(done)
+        if checkpoint is not None and not self.dry_run:
+            checkpoint.add_many(done)
+
+    def _report(self, brewery, result):
+        """Print what ingesting a brewery's beers did."""
+        for name in result.created:
+            if self.dry_run:
+                self.stdout.write(f'    [DRY RUN] Would create: {name}')
+            else:
+                logger.info(f'Created beer: {name} ({brewery.name})')
+                self.stdout.write(self.style.SUCCESS(f'    [+] Created: {name}'))
+        for name in result.skipped:
+            logger.debug(f'Beer already exists: {name}')
+        for name, error in result.failed:
+            logger.error(f'Error creating beer {name}: {error}')
+            self.stdout.write(self.style.ERROR(f'    [!] Failed: {name} - {error}'))
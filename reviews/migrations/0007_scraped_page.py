@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_image_placeholder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapedPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('records', models.JSONField(blank=True, default=dict)),
+                ('fetched_at', models.DateTimeField(auto_now=True)),
+                ('changed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['url'],
+            },
+        ),
+    ]
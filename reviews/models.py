@@ -4,13 +4,14 @@ from django.urls import reverse
 from django.core.validators import MinValueValidator, MaxValueValidator
 from ckeditor.fields import RichTextField
 from taggit.managers import TaggableManager
-from PIL import Image
 import os
 
+from core.models import ResponsiveImageMixin
+
 User = get_user_model()
 
 
-class Category(models.Model):
+class Category(ResponsiveImageMixin, models.Model):
     """Beer categories (Ales, Lagers, Stouts, IPAs, etc.)"""
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
@@ -29,7 +30,7 @@ class Category(models.Model):
         return reverse('reviews:category_detail', kwargs={'slug': self.slug})
 
 
-class Brewery(models.Model):
+class Brewery(ResponsiveImageMixin, models.Model):
     """Brewery information"""
     name = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
@@ -51,7 +52,7 @@ class Brewery(models.Model):
         return reverse('reviews:brewery_detail', kwargs={'slug': self.slug})
 
 
-class Beer(models.Model):
+class Beer(ResponsiveImageMixin, models.Model):
     """Beer model with all beer information"""
     name = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
@@ -94,15 +95,6 @@ class Beer(models.Model):
     def get_absolute_url(self):
         return reverse('reviews:beer_detail', kwargs={'slug': self.slug})
     
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        if self.image:
-            img = Image.open(self.image.path)
-            if img.height > 1200 or img.width > 1200:
-                output_size = (1200, 1200)
-                img.thumbnail(output_size)
-                img.save(self.image.path)
-    
     def get_average_rating(self):
         """Calculate average rating for this beer"""
         reviews = self.reviews.filter(is_approved=True)
@@ -190,6 +182,19 @@ class Review(models.Model):
         ordering = ['-created_at']
         unique_together = ['beer', 'user']  # One review per user per beer
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets save handlers spot approvals without querying the old row
+        if 'is_approved' in field_names:
+            instance._stored_is_approved = values[field_names.index('is_approved')]
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None or 'is_approved' in fields:
+            self._stored_is_approved = self.is_approved
+
     def __str__(self):
         return f"{self.title} - {self.beer.name} by {self.user.username}"
     
@@ -231,3 +236,24 @@ class ReviewComment(models.Model):
     
     def __str__(self):
         return f"Comment by {self.user.username} on {self.review.title}"
+
+
+class ScrapedPage(models.Model):
+    """
+    Scrape state for one fetched page, so nightly runs only handle changes.
+
+    ``content_hash`` is the SHA-256 of the page body last parsed;
+    ``records`` holds a fingerprint per beer listed on it (see
+    ``reviews.scrapers.utils.fingerprints``).
+    """
+    url = models.URLField(max_length=500, unique=True)
+    content_hash = models.CharField(max_length=64)
+    records = models.JSONField(default=dict, blank=True)
+    fetched_at = models.DateTimeField(auto_now=True)
+    changed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['url']
+
+    def __str__(self):
+        return self.url
@@ -3,18 +3,43 @@ Open Brewery DB API scraper.
 
 Fetches UK brewery data from Open Brewery DB (https://www.openbrewerydb.org/)
 Free, no API key required.
+
+Each UK nation's page count is read from the ``/meta`` endpoint, then all
+pages are fetched concurrently: requests still start at most once per
+``rate_limit`` seconds through the shared host limiter, but one slow
+response no longer holds up the next. The raw records are stored as an
+NDJSON snapshot (``utils/snapshot.py``), which later runs diff against
+and which ``offline`` runs use instead of the API.
+
+Usage:
+    scraper = OpenBreweryDBScraper()
+    breweries = scraper.fetch_breweries()
+    print(scraper.snapshot_diff.summary())
+
+    # no network: replay the latest snapshot
+    breweries = scraper.fetch_breweries(offline=True)
 """
 
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import List, Dict, Optional
 import requests
 
 from ..base import BaseScraper
+from ..utils.snapshot import Snapshot, SnapshotDiff, diff_records, latest_snapshot, write_snapshot
 
 
 logger = logging.getLogger('beer_scraper.openbrewerydb')
 
 
+# Values of the API's country field for the four UK nations
+UK_COUNTRIES = ('England', 'Scotland', 'Wales', 'Northern Ireland')
+
+DEFAULT_WORKERS = 4
+
+
 class OpenBreweryDBScraper(BaseScraper):
     """
     Scraper for Open Brewery DB API.
@@ -23,21 +48,38 @@ class OpenBreweryDBScraper(BaseScraper):
     """
 
     BASE_URL = 'https://api.openbrewerydb.org/v1/breweries'
+    META_URL = BASE_URL + '/meta'
+    PER_PAGE = 200  # API max
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, snapshot_dir=None):
+        """
+        Initialize OpenBreweryDB scraper.
 
-    def __init__(self):
-        """Initialize OpenBreweryDB scraper."""
+        Args:
+            max_workers: Pages fetched concurrently
+            snapshot_dir: Overrides ``SCRAPER_SNAPSHOT_DIR``
+        """
         super().__init__(
             source_name='openbrewerydb',
             rate_limit=1.0,  # 1 second between requests
             check_robots=False  # API, no robots.txt needed
         )
-
-    def fetch_breweries(self, limit: Optional[int] = None) -> List[Dict]:
+        self.max_workers = max(1, max_workers)
+        self.snapshot_dir = snapshot_dir
+        # Set by fetch_breweries
+        self.snapshot: Optional[Snapshot] = None
+        self.snapshot_diff: Optional[SnapshotDiff] = None
+
+    def fetch_breweries(self, limit: Optional[int] = None, offline: bool = False,
+                        max_age: Optional[float] = None) -> List[Dict]:
         """
         Fetch UK brewery data from Open Brewery DB.
 
         Args:
             limit: Optional limit on number of breweries
+            offline: Use the latest snapshot instead of the API
+            max_age: Reuse the latest snapshot if younger than this many
+                seconds
 
         Returns:
             List of brewery data dictionaries
@@ -45,70 +87,93 @@ class OpenBreweryDBScraper(BaseScraper):
         API Documentation:
             https://www.openbrewerydb.org/documentation
         """
-        breweries = []
-        page = 1
-        per_page = 50  # API max
-
-        logger.info("Fetching breweries from Open Brewery DB...")
-
-        while True:
-            try:
-                # Fetch page of breweries
-                # Note: Open Brewery DB uses 'United Kingdom' or country code 'gb'
-                params = {
-                    'by_country': 'England',  # Try England specifically
-                    'per_page': per_page,
-                    'page': page
-                }
-
-                logger.debug(f"Fetching page {page} (per_page={per_page})")
-
-                response = self.make_request(
-                    self.BASE_URL,
-                    params=params,
-                    timeout=30
-                )
-
-                if not response:
-                    logger.warning(f"No response for page {page}")
-                    break
-
-                data = response.json()
+        previous = latest_snapshot(self.source_name, self.snapshot_dir)
+        reuse = previous is not None and max_age is not None and previous.age <= max_age
+        if offline or reuse:
+            if previous is None:
+                logger.error("No Open Brewery DB snapshot to work offline from")
+                return []
+            logger.info(f"Using snapshot {previous.path.name} ({len(previous.records)} records)")
+            self.snapshot = previous
+            self.snapshot_diff = SnapshotDiff([], [], [])
+            records = previous.records
+        else:
+            records, complete = self.fetch_raw_breweries()
+            self.snapshot_diff = diff_records(previous.records if previous else [], records)
+            logger.info(f"Open Brewery DB changes since last snapshot: {self.snapshot_diff.summary()}")
+            if complete:
+                taken_at = datetime.now(timezone.utc).replace(microsecond=0)
+                path = write_snapshot(self.source_name, records, self.snapshot_dir, taken_at)
+                self.snapshot = Snapshot(path, taken_at, records)
+            else:
+                # A partial fetch would look like mass removals next time
+                logger.warning("Some pages failed; snapshot not updated")
 
-                if not data:
-                    logger.info(f"No more breweries after page {page-1}")
+        breweries = []
+        for brewery_data in records:
+            processed = self._process_brewery(brewery_data)
+            if processed:
+                breweries.append(processed)
+                self.stats['breweries_scraped'] += 1
+                if limit and len(breweries) >= limit:
+                    logger.info(f"Reached limit of {limit} breweries")
                     break
 
-                # Process each brewery
-                for brewery_data in data:
-                    processed = self._process_brewery(brewery_data)
-                    if processed:
-                        breweries.append(processed)
-                        self.stats['breweries_scraped'] += 1
-
-                        # Check limit
-                        if limit and len(breweries) >= limit:
-                            logger.info(f"Reached limit of {limit} breweries")
-                            return breweries
-
-                logger.info(f"Fetched {len(data)} breweries from page {page} (total: {len(breweries)})")
-
-                # Check if we got a full page (if not, we're done)
-                if len(data) < per_page:
-                    logger.info("Reached last page")
-                    break
+        logger.info(f"Fetched total of {len(breweries)} breweries from Open Brewery DB")
+        return breweries
 
-                page += 1
+    def fetch_raw_breweries(self, countries=UK_COUNTRIES):
+        """
+        Fetch every raw brewery record for ``countries``, pages in parallel.
 
-            except requests.RequestException as e:
-                logger.error(f"Error fetching page {page}: {e}")
-                break
-            except Exception as e:
-                logger.error(f"Unexpected error on page {page}: {e}")
-                break
+        Returns:
+            Tuple of (records in API order without duplicates, True if
+            every request succeeded)
+        """
+        logger.info("Fetching breweries from Open Brewery DB...")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='obdb') as pool:
+            totals = list(pool.map(self._fetch_total, countries))
+            pages = [
+                (country, page)
+                for country, total in zip(countries, totals) if total
+                for page in range(1, math.ceil(total / self.PER_PAGE) + 1)
+            ]
+            logger.info(f"Fetching {len(pages)} pages for {sum(t or 0 for t in totals)} breweries")
+            results = list(pool.map(lambda args: self._fetch_page(*args), pages))
+
+        complete = None not in totals and None not in results
+        records, seen = [], set()
+        for page_records in results:
+            for record in page_records or []:
+                key = record.get('id')
+                if key not in seen:
+                    seen.add(key)
+                    records.append(record)
+        return records, complete
+
+    def _fetch_total(self, country: str) -> Optional[int]:
+        """Number of breweries in ``country``, or None on error."""
+        try:
+            response = self.make_request(self.META_URL, params={'by_country': country}, timeout=30)
+            return int(response.json()['total']) if response else 0
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error fetching brewery count for {country}: {e}")
+            return None
 
-        logger.info(f"Fetched total of {len(breweries)} breweries from Open Brewery DB")
-        return breweries
+    def _fetch_page(self, country: str, page: int) -> Optional[List[Dict]]:
+        """One page of raw records, or None on error."""
+        params = {
+            'by_country': country,
+            'per_page': self.PER_PAGE,
+            'page': page,
+        }
+        logger.debug(f"Fetching {country} page {page} (per_page={self.PER_PAGE})")
+        try:
+            response = self.make_request(self.BASE_URL, params=params, timeout=30)
+            return response.json() if response else []
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Error fetching {country} page {page}: {e}")
+            return None
 
     def _process_brewery(self, data: Dict) -> Optional[Dict]:
         """
@@ -5,14 +5,16 @@ Provides common functionality for rate limiting, error handling,
 data validation, and robots.txt compliance.
 """
 
+import asyncio
 import logging
 import requests
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
 from fake_useragent import UserAgent
 
-from .utils.rate_limiter import RateLimiter, RetryStrategy
+from .utils.rate_limiter import RetryStrategy, get_host_limiter
 from .utils.robots_checker import RobotsChecker
+from .utils.http_cache import cached_session
 from .utils.validators import (
     validate_beer_data,
     validate_brewery_data,
@@ -32,7 +34,7 @@ class BaseScraper(ABC):
     Abstract base class for all scrapers.
 
     Provides common functionality:
-    - HTTP session management with proper headers
+    - HTTP session management with proper headers and caching
     - Rate limiting and retry logic
     - Robots.txt compliance checking
     - Data validation and normalization
@@ -46,26 +48,25 @@ class BaseScraper(ABC):
 
         Args:
             source_name: Name of data source (for rate limiting)
-            rate_limit: Delay between requests in seconds
+            rate_limit: Minimum delay between requests to a host in seconds
+                (robots.txt Crawl-delay wins if longer)
             check_robots: Whether to check robots.txt
         """
         self.source_name = source_name
         self.rate_limit = rate_limit
         self.check_robots_txt = check_robots
 
-        # HTTP session with proper headers
-        self.session = requests.Session()
+        # HTTP session with proper headers, backed by the on-disk HTTP cache
+        self.session = cached_session(source_name)
         self.session.headers.update(self._get_headers())
 
-        # Rate limiter
-        self.rate_limiter = RateLimiter({
-            self.source_name: rate_limit,
-            'default': rate_limit
-        })
+        # Rate limiter, shared per host with every other scraper
+        self.host_limiter = get_host_limiter()
 
-        # Robots checker
+        # Robots checker, fetching through this scraper's session
         self.robots_checker = RobotsChecker(
-            user_agent=self.session.headers.get('User-Agent', '*')
+            user_agent=self.session.headers.get('User-Agent', '*'),
+            session=self.session,
         )
 
         # Retry strategy
@@ -76,6 +77,9 @@ class BaseScraper(ABC):
             backoff_factor=2.0
         )
 
+        # Content hash of each page fetched in a ScrapeEngine run, by URL
+        self.page_fingerprints: Dict[str, str] = {}
+
         # Statistics
         self.stats = {
             'requests_made': 0,
@@ -135,7 +139,7 @@ class BaseScraper(ABC):
             return None
 
         # Rate limit
-        self.rate_limiter.wait(self.source_name)
+        self.host_limiter.wait(url, self.rate_limit, self._crawl_delay_source())
 
         # Make request with retry
         def _request():
@@ -154,6 +158,10 @@ class BaseScraper(ABC):
             self.stats['http_errors'] += 1
             raise
 
+    def _crawl_delay_source(self) -> Optional[RobotsChecker]:
+        """Robots checker to read Crawl-delay from, if robots.txt is honoured."""
+        return self.robots_checker if self.check_robots_txt else None
+
     def validate_and_normalize_beer(self, beer_data: Dict) -> Optional[Dict]:
         """
         Validate and normalize beer data.
@@ -242,6 +250,25 @@ class BaseScraper(ABC):
         """
         pass
 
+    async def afetch_beers(self, engine, brewery_name: Optional[str] = None,
+                           limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Fetch beer data from source inside a ``ScrapeEngine`` run.
+
+        Scrapers without a native async implementation run ``fetch_beers``
+        in a thread, so they still overlap with other sites.
+
+        Args:
+            engine: The ``ScrapeEngine`` running this scraper
+            brewery_name: Optional brewery to filter by
+            limit: Optional limit on number of beers to fetch
+
+        Returns:
+            List of beer data dictionaries, or None if the scraper found
+            its pages unchanged (``engine.page_changed``) and skipped them
+        """
+        return await asyncio.to_thread(self.fetch_beers, brewery_name, limit)
+
     def get_stats(self) -> Dict:
         """
         Get scraper statistics.
@@ -0,0 +1,126 @@
+"""
+Offline parse benchmarks for brewery website scrapers.
+
+Pages come from recorded HTTP fixtures (see ``utils.http_fixtures``), so
+a benchmark measures parsing alone and gives the same numbers on any
+machine with or without network access. Each page is parsed ``repeat``
+times for timing, then once more under ``tracemalloc`` for peak memory.
+``tracemalloc`` only sees Python allocations: memory libxml2 allocates
+for an lxml tree isn't counted, a BeautifulSoup tree is.
+
+Usage:
+    from reviews.scrapers.benchmark import benchmark_scraper, fixture_dir, offline
+
+    offline(scraper, fixture_dir('tests/fixtures/scrapers', scraper))
+    result = benchmark_scraper(scraper, repeat=20)
+    print(result.pages_per_second, result.beers_per_second, result.peak_memory)
+"""
+
+import logging
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from slugify import slugify
+
+from .utils.http_fixtures import FixtureStore, replay
+
+
+logger = logging.getLogger('beer_scraper.benchmark')
+
+
+DEFAULT_REPEAT = 20
+
+
+class BenchmarkResult(NamedTuple):
+    """Parse timings for one scraper over its recorded pages."""
+    name: str
+    scraper: str
+    # Pages and beers parsed across every repeat
+    pages: int
+    beers: int
+    parse_seconds: float
+    # Peak bytes of Python allocations while parsing the pages once
+    peak_memory: int
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.parse_seconds if self.parse_seconds else 0.0
+
+    @property
+    def beers_per_second(self) -> float:
+        return self.beers / self.parse_seconds if self.parse_seconds else 0.0
+
+    @property
+    def ms_per_page(self) -> float:
+        return self.parse_seconds * 1000 / self.pages if self.pages else 0.0
+
+
+def fixture_dir(root, scraper) -> Path:
+    """Where ``scraper``'s responses are recorded under ``root``."""
+    return Path(root) / slugify(scraper.brewery_name)
+
+
+def offline(scraper, directory) -> FixtureStore:
+    """
+    Run ``scraper`` from recorded responses only.
+
+    Replayed pages need no politeness, so robots.txt checks, pacing and
+    retries are switched off too.
+    """
+    scraper.check_robots_txt = False
+    scraper.rate_limit = 0
+    scraper.retry_strategy.max_attempts = 1
+    return replay(scraper.session, directory)
+
+
+def fetch_pages(scraper) -> List:
+    """The responses a brewery website scraper parses: its beers page."""
+    response = scraper.make_request(scraper.beers_url, timeout=30)
+    return [response] if response else []
+
+
+def benchmark_scraper(scraper, pages: Optional[List] = None,
+                      repeat: int = DEFAULT_REPEAT) -> BenchmarkResult:
+    """
+    Time ``scraper`` parsing its pages.
+
+    Args:
+        scraper: Brewery website scraper, usually set up with ``offline``
+        pages: Responses to parse (default: fetched with ``fetch_pages``)
+        repeat: Times each page is parsed
+
+    Returns:
+        ``BenchmarkResult``
+    """
+    if pages is None:
+        pages = fetch_pages(scraper)
+
+    beers = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for response in pages:
+            beers += len(scraper._parse_response(response))
+    elapsed = time.perf_counter() - started
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for response in pages:
+        scraper._parse_response(response)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    if not tracing:
+        tracemalloc.stop()
+
+    logger.debug(f"Parsed {len(pages) * repeat} {scraper.brewery_name} pages in {elapsed:.3f}s")
+    return BenchmarkResult(
+        name=scraper.brewery_name,
+        scraper=type(scraper).__name__,
+        pages=len(pages) * repeat,
+        beers=beers,
+        parse_seconds=elapsed,
+        peak_memory=max(peak, 0),
+    )
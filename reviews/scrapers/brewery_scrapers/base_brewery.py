@@ -18,9 +18,14 @@ class BreweryWebsiteScraper(BaseScraper):
     Base class for scraping individual brewery websites.
 
     Each brewery has different HTML structure, so subclasses
-    must implement their own parsing logic.
+    must implement their own parsing logic in ``parse_beers``.
+    Sites that fit the usual listing layout don't need a subclass;
+    see ``spec.SpecScraper``.
     """
 
+    # Path of the beers page, relative to base_url
+    beers_path = '/beers'
+
     def __init__(self, brewery_name: str, base_url: str):
         """
         Initialize brewery scraper.
@@ -37,6 +42,11 @@ class BreweryWebsiteScraper(BaseScraper):
         self.brewery_name = brewery_name
         self.base_url = base_url
 
+    @property
+    def beers_url(self) -> str:
+        """URL of the page listing the brewery's beers."""
+        return self.base_url.rstrip('/') + self.beers_path
+
     def fetch_breweries(self, limit: Optional[int] = None) -> List[Dict]:
         """Not used for brewery-specific scrapers."""
         return []
@@ -45,9 +55,54 @@ class BreweryWebsiteScraper(BaseScraper):
                     limit: Optional[int] = None) -> List[Dict]:
         """
         Fetch beers from brewery website.
+
+        Returns:
+            List of beer dictionaries with name, image_url, etc.
+        """
+        logger.info(f"Fetching beers from {self.beers_url}")
+
+        soup = self._get_soup(self.beers_url)
+        if not soup:
+            logger.error(f"Could not fetch {self.brewery_name} beers page")
+            return []
+        return self.parse_beers(soup, limit)
+
+    async def afetch_beers(self, engine, brewery_name: Optional[str] = None,
+                           limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Fetch beers from brewery website inside a ``ScrapeEngine`` run.
+
+        The request is scheduled by the engine and parsing runs on its
+        thread pool, so the event loop is never blocked. A page identical
+        to the last run's isn't parsed at all.
+
+        Returns:
+            List of beer dictionaries, or None if the page is unchanged
+        """
+        logger.info(f"Fetching beers from {self.beers_url}")
+
+        try:
+            response = await engine.request(self, self.beers_url, timeout=30)
+        except Exception as e:
+            logger.error(f"Error fetching {self.beers_url}: {e}")
+            response = None
+        if not response:
+            logger.error(f"Could not fetch {self.brewery_name} beers page")
+            return []
+        if not engine.page_changed(self, self.beers_url, response.content):
+            logger.info(f"{self.brewery_name} beers page unchanged, skipping parse")
+            return None
+        return await engine.run_blocking(self._parse_response, response, limit)
+
+    def parse_beers(self, soup: BeautifulSoup, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Parse beers from the brewery's beers page.
         Must be implemented by subclass.
         """
-        raise NotImplementedError("Subclass must implement fetch_beers()")
+        raise NotImplementedError("Subclass must implement parse_beers()")
+
+    def _parse_response(self, response, limit: Optional[int] = None) -> List[Dict]:
+        return self.parse_beers(BeautifulSoup(response.content, 'lxml'), limit)
 
     def _get_soup(self, url: str) -> Optional[BeautifulSoup]:
         """
@@ -86,12 +141,14 @@ class BreweryWebsiteScraper(BaseScraper):
         if not img_url:
             return None
 
-        # Make absolute URL if relative
-        if img_url.startswith('//'):
-            img_url = 'https:' + img_url
-        elif img_url.startswith('/'):
-            img_url = self.base_url.rstrip('/') + img_url
-        elif not img_url.startswith('http'):
-            img_url = self.base_url.rstrip('/') + '/' + img_url
-
-        return img_url
+        return self._absolute_url(img_url)
+
+    def _absolute_url(self, url: str) -> str:
+        """Make a URL from the brewery's site absolute."""
+        if url.startswith('//'):
+            return 'https:' + url
+        if url.startswith('/'):
+            return self.base_url.rstrip('/') + url
+        if not url.startswith('http'):
+            return self.base_url.rstrip('/') + '/' + url
+        return url
@@ -0,0 +1,74 @@
+"""
+Brewery websites scraped for beers.
+
+Each brewery is a ``BrewerySpec``; add one to ``BREWERY_SPECS`` and the
+daily scrape, image scrape and import scripts pick it up.
+
+Usage:
+    from reviews.scrapers.brewery_scrapers.breweries import BREWERY_SPECS, get_spec
+    from reviews.scrapers.brewery_scrapers.spec import SpecScraper
+
+    scrapers = [SpecScraper(spec) for spec in BREWERY_SPECS]
+    scraper = SpecScraper(get_spec('Harveys & Son'))
+"""
+
+from typing import Optional
+
+from .spec import BrewerySpec, Field, class_matches, href_contains, tag_in
+
+
+# Product or beer cards, else links to product pages
+LISTING_ITEMS = (
+    f"//*[{tag_in('div', 'article')}][{class_matches('product', 'beer', 'brew')}]",
+    f"//a[{href_contains('/beer/', '/product/')}]",
+)
+
+LISTING_FIELDS = (
+    Field('name', (
+        f".//*[{tag_in('h2', 'h3', 'h4', 'a')}][{class_matches('title', 'name', 'product')}]",
+        './/a',
+        # Link items are their own name
+        'self::a',
+    ), required=True),
+    Field('image_url', ('.//img',), attrs=('src', 'data-src'), url=True),
+    Field('description', (
+        f".//*[{tag_in('p', 'div')}][{class_matches('description', 'excerpt')}]",
+    ), default=''),
+)
+
+
+BREWERY_SPECS = (
+    BrewerySpec(
+        name='Dark Star Brewing Co',
+        base_url='https://www.darkstarbrewing.co.uk',
+        items=LISTING_ITEMS,
+        fields=LISTING_FIELDS,
+    ),
+    BrewerySpec(
+        name='Harveys & Son',
+        base_url='https://www.harveys.org.uk',
+        beers_path='/our-beers',
+        items=(
+            LISTING_ITEMS[0],
+            f"//a[{href_contains('/beer/', '/product/', '/beers/')}]",
+        ),
+        fields=LISTING_FIELDS,
+    ),
+    BrewerySpec(
+        name='Brighton Bier',
+        base_url='https://www.brightonbier.com',
+        items=LISTING_ITEMS,
+        fields=LISTING_FIELDS,
+    ),
+    BrewerySpec(
+        name='Burning Sky Brewery',
+        base_url='https://www.burningskybeer.com',
+        items=LISTING_ITEMS,
+        fields=LISTING_FIELDS,
+    ),
+)
+
+
+def get_spec(name: str) -> Optional[BrewerySpec]:
+    """The spec for brewery ``name``, or None."""
+    return next((spec for spec in BREWERY_SPECS if spec.name == name), None)
@@ -0,0 +1,264 @@
+"""
+Declarative brewery website scrapers.
+
+Most brewery sites list their beers the same way: a repeated block per
+beer holding a name, an image and a blurb. Rather than a scraper class
+per site, a ``BrewerySpec`` describes where the beers page is, which
+elements are beers and how to read each field from them. ``SpecScraper``
+runs any spec, so a new brewery is a few lines of config in
+``breweries.py``.
+
+Selectors are XPath (or CSS with a ``css:`` prefix, which needs the
+``cssselect`` package) and are compiled to ``lxml`` XPath objects once per
+spec. Pages are parsed straight into an lxml tree; no BeautifulSoup tree
+is built. A spec's ``root`` limits the search for beers to one part of
+the page, such as ``//main``.
+
+Usage:
+    from reviews.scrapers.brewery_scrapers.spec import BrewerySpec, Field, SpecScraper
+
+    spec = BrewerySpec(
+        name='Example Brewery',
+        base_url='https://example.com',
+        items=("//div[contains(@class, 'beer')]",),
+        fields=(
+            Field('name', ('.//h3',), required=True),
+            Field('image_url', ('.//img',), attrs=('src', 'data-src'), url=True),
+        ),
+    )
+    beers = SpecScraper(spec).fetch_beers()
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from .base_brewery import BreweryWebsiteScraper
+
+
+logger = logging.getLogger('beer_scraper.brewery')
+
+try:
+    from cssselect import GenericTranslator
+    CSSSELECT_AVAILABLE = True
+except ImportError:
+    CSSSELECT_AVAILABLE = False
+
+
+_UPPER = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def tag_in(*names: str) -> str:
+    """XPath predicate matching any of the tag ``names``."""
+    return ' or '.join(f'self::{name}' for name in names)
+
+
+def class_matches(*words: str) -> str:
+    """XPath predicate: the class attribute contains any of ``words``, ignoring case."""
+    lowered = f"translate(@class, '{_UPPER}', '{_UPPER.lower()}')"
+    return ' or '.join(f"contains({lowered}, '{word.lower()}')" for word in words)
+
+
+def href_contains(*parts: str) -> str:
+    """XPath predicate: the href contains any of ``parts``."""
+    return ' or '.join(f"contains(@href, '{part}')" for part in parts)
+
+
+class Field(NamedTuple):
+    """How to read one field of a beer from its element."""
+    name: str
+    # Selectors relative to the beer element, tried in order
+    selectors: Tuple[str, ...]
+    # Attributes to read, first non-empty wins; the element's text if empty
+    attrs: Tuple[str, ...] = ()
+    # Make the value an absolute URL on the brewery's site
+    url: bool = False
+    # Skip the beer if this field is missing or empty
+    required: bool = False
+    default: object = None
+
+
+class BrewerySpec(NamedTuple):
+    """Where a brewery lists its beers and how to read them."""
+    name: str
+    base_url: str
+    # Selectors for beer elements, tried in order until one matches;
+    # searched within ``root`` if set
+    items: Tuple[str, ...]
+    fields: Tuple[Field, ...]
+    beers_path: str = '/beers'
+    # Only look for beers inside the first element this matches
+    root: Optional[str] = None
+
+
+def _to_xpath(selector: str) -> str:
+    if not selector.startswith('css:'):
+        return selector
+    if not CSSSELECT_AVAILABLE:
+        raise ValueError(f'CSS selector {selector!r} needs cssselect. Install with: pip install cssselect')
+    return GenericTranslator().css_to_xpath(selector[4:], prefix='descendant-or-self::')
+
+
+def _relative(xpath: str) -> str:
+    return '.' + xpath if xpath.startswith('/') else xpath
+
+
+def _first(selector: str) -> etree.XPath:
+    return etree.XPath(f'({_to_xpath(selector)})[1]')
+
+
+def _text(node) -> str:
+    """Like BeautifulSoup's ``get_text(strip=True)``."""
+    if isinstance(node, str):
+        return node.strip()
+    return ''.join(text.strip() for text in node.itertext())
+
+
+def parse_html(content: bytes):
+    """Parse a page into an lxml tree, or None if it is empty."""
+    # A parser per call: lxml parsers mustn't be shared between threads
+    parser = etree.HTMLParser(remove_comments=True, remove_pis=True)
+    return etree.fromstring(content, parser) if content.strip() else None
+
+
+class CompiledSpec:
+    """A ``BrewerySpec`` with its selectors compiled to XPath objects."""
+
+    def __init__(self, spec: BrewerySpec):
+        self.spec = spec
+        self.root = _first(spec.root) if spec.root else None
+        # Item selectors search below the root, not the whole document
+        self.items = [etree.XPath(_relative(_to_xpath(selector))) for selector in spec.items]
+        self.fields = [
+            (field, [_first(selector) for selector in field.selectors])
+            for field in spec.fields
+        ]
+
+    def select_items(self, tree) -> List:
+        """Beer elements from the first item selector that finds any."""
+        if self.root is not None:
+            found = self.root(tree)
+            if not found:
+                return []
+            tree = found[0]
+        for xpath in self.items:
+            elements = xpath(tree)
+            if elements:
+                return elements
+        return []
+
+    def extract(self, element) -> Optional[Dict]:
+        """
+        Read every field from a beer element.
+
+        Returns:
+            Field values by name, or None if a required field is missing
+        """
+        values = {}
+        for field, xpaths in self.fields:
+            value = None
+            for xpath in xpaths:
+                found = xpath(element)
+                if found:
+                    value = self._value(found[0], field.attrs)
+                    break
+            if not value:
+                if field.required:
+                    return None
+                value = field.default if value is None else value
+            values[field.name] = value
+        return values
+
+    @staticmethod
+    def _value(node, attrs: Tuple[str, ...]) -> Optional[str]:
+        if not attrs or isinstance(node, str):
+            return _text(node)
+        for attr in attrs:
+            value = node.get(attr)
+            if value:
+                return value
+        return None
+
+
+@lru_cache(maxsize=None)
+def compile_spec(spec: BrewerySpec) -> CompiledSpec:
+    """Compile ``spec``, once per distinct spec."""
+    return CompiledSpec(spec)
+
+
+class SpecScraper(BreweryWebsiteScraper):
+    """Scrapes a brewery website as described by a ``BrewerySpec``."""
+
+    def __init__(self, spec: BrewerySpec):
+        super().__init__(brewery_name=spec.name, base_url=spec.base_url)
+        self.spec = spec
+        self.beers_path = spec.beers_path
+        self.compiled = compile_spec(spec)
+
+    def fetch_beers(self, brewery_name: Optional[str] = None,
+                    limit: Optional[int] = None) -> List[Dict]:
+        """
+        Fetch beers from brewery website.
+
+        Returns:
+            List of beer dictionaries with name, image_url, etc.
+        """
+        logger.info(f"Fetching beers from {self.beers_url}")
+
+        try:
+            response = self.make_request(self.beers_url, timeout=30)
+        except Exception as e:
+            logger.error(f"Error fetching {self.beers_url}: {e}")
+            response = None
+        if not response:
+            logger.error(f"Could not fetch {self.brewery_name} beers page")
+            return []
+        return self.parse_html(response.content, limit)
+
+    def parse_html(self, content: bytes, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Parse beers from the raw beers page.
+
+        Args:
+            content: Page body
+            limit: Maximum number of beers
+
+        Returns:
+            List of beer dictionaries with name, image_url, etc.
+        """
+        tree = parse_html(content)
+        elements = self.compiled.select_items(tree) if tree is not None else []
+        logger.info(f"Found {len(elements)} potential beer elements")
+
+        beers = []
+        for element in elements:
+            try:
+                beer_data = self.compiled.extract(element)
+            except Exception as e:
+                logger.error(f"Error parsing beer element: {e}")
+                continue
+            if not beer_data:
+                continue
+            for field in self.spec.fields:
+                if field.url and beer_data[field.name]:
+                    beer_data[field.name] = self._absolute_url(beer_data[field.name])
+            beer_data['brewery'] = self.brewery_name
+            beers.append(beer_data)
+            self.stats['beers_scraped'] += 1
+            logger.debug(f"Parsed beer: {beer_data.get('name')}")
+
+            if limit and len(beers) >= limit:
+                break
+
+        logger.info(f"Scraped {len(beers)} beers from {self.brewery_name}")
+        return beers
+
+    def parse_beers(self, soup: BeautifulSoup, limit: Optional[int] = None) -> List[Dict]:
+        """Parse beers from an already built soup."""
+        return self.parse_html(soup.encode('utf-8'), limit)
+
+    def _parse_response(self, response, limit: Optional[int] = None) -> List[Dict]:
+        return self.parse_html(response.content, limit)
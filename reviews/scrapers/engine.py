@@ -0,0 +1,198 @@
+"""
+Asyncio engine for running many scrapers at once.
+
+Scrapers for different sites run concurrently, so a run takes about as
+long as the slowest site instead of the sum of all of them. Politeness is
+kept per host: requests to one host are serialised and paced by the
+shared ``HostRateLimiter`` (the scraper's ``rate_limit`` or the host's
+robots.txt ``Crawl-delay``, whichever is slower), while a global
+semaphore bounds how many requests are in flight across all hosts. A
+host waiting for its next slot never holds up the others.
+
+Given the page fingerprints stored by the last run, the engine also
+makes runs incremental: a scraper whose page hashes to the same value
+skips parsing, and its result comes back marked ``unchanged``.
+
+Requests go through each scraper's own ``requests.Session`` on a thread
+pool, so headers, cookies, retries and robots.txt checks behave exactly
+as they do for ``BaseScraper.make_request``.
+
+Usage:
+    from reviews.scrapers.engine import ScrapeEngine
+
+    engine = ScrapeEngine(max_concurrency=8, fingerprints={url: sha256})
+    for result in engine.scrape([SpecScraper(spec) for spec in BREWERY_SPECS]):
+        print(result.scraper.brewery_name, len(result.beers), result.error)
+        print(result.unchanged, result.pages)
+
+    # inside a coroutine
+    results = await engine.scrape_async(scrapers)
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, NamedTuple, Optional
+
+import requests
+
+from .utils.fingerprints import content_hash
+
+
+logger = logging.getLogger('beer_scraper.engine')
+
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class ScrapeResult(NamedTuple):
+    """Outcome of one scraper's run."""
+    scraper: object
+    beers: List[Dict]
+    error: Optional[Exception]
+    elapsed: float
+    # Content hash of each page fetched, by URL
+    pages: Dict[str, str] = {}
+    # True if the page matched its stored fingerprint and wasn't parsed
+    unchanged: bool = False
+
+
+class ScrapeEngine:
+    """
+    Run scrapers concurrently on one event loop.
+
+    Each ``scrape``/``scrape_async`` call gets its own host locks,
+    semaphore and thread pool, so an engine can be reused across runs.
+    Pacing state lives in the scrapers' shared ``HostRateLimiter`` and
+    carries over between runs.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 fingerprints: Optional[Dict[str, str]] = None):
+        """
+        Initialize engine.
+
+        Args:
+            max_concurrency: Most requests in flight across all hosts
+            fingerprints: Content hashes from the last run, by URL; pages
+                still matching them are not parsed again
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.fingerprints = fingerprints or {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._semaphore = None
+        self._executor = None
+
+    def scrape(self, scrapers, limit: Optional[int] = None) -> List[ScrapeResult]:
+        """
+        Run ``fetch_beers`` for every scraper and wait for all of them.
+
+        Synchronous facade for management commands; must not be called
+        from a running event loop.
+
+        Returns:
+            One ``ScrapeResult`` per scraper, in the order given
+        """
+        return asyncio.run(self.scrape_async(scrapers, limit=limit))
+
+    async def scrape_async(self, scrapers, limit: Optional[int] = None) -> List[ScrapeResult]:
+        """Async version of ``scrape``."""
+        self._host_locks = {}
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix='scrape'
+        )
+        try:
+            return await asyncio.gather(
+                *(self._scrape_one(scraper, limit) for scraper in scrapers)
+            )
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _scrape_one(self, scraper, limit):
+        start = time.monotonic()
+        scraper.page_fingerprints.clear()
+        try:
+            beers = await scraper.afetch_beers(self, limit=limit)
+            error = None
+        except Exception as e:
+            logger.error(f"{scraper.__class__.__name__} failed: {e}")
+            beers, error = [], e
+        return ScrapeResult(
+            scraper, beers or [], error, time.monotonic() - start,
+            pages=dict(scraper.page_fingerprints),
+            unchanged=error is None and beers is None,
+        )
+
+    def page_changed(self, scraper, url: str, content: bytes) -> bool:
+        """
+        Fingerprint a fetched page and compare it with the last run's.
+
+        The hash is recorded on ``scraper.page_fingerprints`` either way,
+        so it ends up in the scraper's ``ScrapeResult.pages``.
+
+        Returns:
+            False if the page is byte-for-byte what was stored last time
+        """
+        fingerprint = content_hash(content)
+        scraper.page_fingerprints[url] = fingerprint
+        return self.fingerprints.get(url) != fingerprint
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call (HTTP, parsing) on the engine's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def request(self, scraper, url: str, method: str = 'GET',
+                      **kwargs) -> Optional[requests.Response]:
+        """
+        Make an HTTP request for ``scraper`` with per-host politeness.
+
+        Mirrors ``BaseScraper.make_request``: robots.txt is checked first,
+        failures are retried with the scraper's ``RetryStrategy``, and the
+        scraper's stats are updated.
+
+        Returns:
+            Response object, or None if disallowed by robots.txt
+
+        Raises:
+            requests.RequestException: If request fails after retries
+        """
+        if scraper.check_robots_txt:
+            allowed = await self.run_blocking(scraper.robots_checker.can_fetch, url)
+            if not allowed:
+                logger.warning(f"URL disallowed by robots.txt: {url}")
+                return None
+
+        host = scraper.host_limiter.host(url)
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        strategy = scraper.retry_strategy
+
+        for attempt in range(strategy.max_attempts):
+            try:
+                await scraper.host_limiter.wait_async(
+                    url, scraper.rate_limit, scraper._crawl_delay_source()
+                )
+                # One request in flight per host, however the slots fall
+                async with lock, self._semaphore:
+                    response = await self.run_blocking(self._send, scraper, method, url, kwargs)
+            except requests.RequestException as e:
+                logger.warning(f"Attempt {attempt + 1}/{strategy.max_attempts} failed: {e}")
+                if attempt < strategy.max_attempts - 1:
+                    await asyncio.sleep(strategy._calculate_delay(attempt))
+                    continue
+                logger.error(f"Request failed for {url}: {e}")
+                scraper.stats['http_errors'] += 1
+                raise
+            scraper.stats['requests_made'] += 1
+            return response
+
+    @staticmethod
+    def _send(scraper, method, url, kwargs):
+        logger.debug(f"Making {method} request to {url}")
+        response = scraper.session.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response
@@ -2,6 +2,11 @@
 RateBeer scraper using the unofficial ratebeer Python library.
 
 Fetches beer data including ratings, ABV, IBU, and descriptions.
+
+The library makes its own HTTP requests, so every call goes through
+``_call``, which waits for a slot in the shared host limiter first. Many
+scrapers (one per worker thread) can then run at once and still share
+RateBeer's rate budget.
 """
 
 import logging
@@ -29,6 +34,9 @@ class RateBeerScraper(BaseScraper):
     Note: This is an unofficial scraper and may break if RateBeer changes their site.
     """
 
+    # Host the ratebeer library talks to, for pacing its requests
+    RATEBEER_URL = 'https://www.ratebeer.com/'
+
     def __init__(self):
         """Initialize RateBeer scraper."""
         if not RATEBEER_AVAILABLE:
@@ -40,6 +48,9 @@ class RateBeerScraper(BaseScraper):
             check_robots=True  # Respect robots.txt
         )
 
+        # Error that made the last fetch_beers return early, if any
+        self.last_error: Optional[Exception] = None
+
         # Initialize RateBeer API
         try:
             self.rb = ratebeer.RateBeer()
@@ -48,6 +59,12 @@ class RateBeerScraper(BaseScraper):
             logger.error(f"Failed to initialize RateBeer client: {e}")
             raise
 
+    def _call(self, func, *args):
+        """Call the ratebeer library once RateBeer's rate budget allows."""
+        self.host_limiter.wait(self.RATEBEER_URL, self.rate_limit, self._crawl_delay_source())
+        self.stats['requests_made'] += 1
+        return func(*args)
+
     def fetch_breweries(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Fetch brewery data from RateBeer.
@@ -77,6 +94,7 @@ class RateBeerScraper(BaseScraper):
             List of beer data dictionaries
         """
         beers = []
+        self.last_error = None
 
         if not brewery_name:
             logger.warning("brewery_name required for RateBeer search")
@@ -86,7 +104,7 @@ class RateBeerScraper(BaseScraper):
             logger.info(f"Searching RateBeer for beers from '{brewery_name}'...")
 
             # Search for brewery
-            search_results = self.rb.search(brewery_name)
+            search_results = self._call(self.rb.search, brewery_name)
 
             if not search_results or 'breweries' not in search_results:
                 logger.warning(f"No breweries found for '{brewery_name}'")
@@ -109,7 +127,7 @@ class RateBeerScraper(BaseScraper):
             logger.info(f"Found brewery: {brewery.get('name')} (ID: {brewery_id})")
 
             # Get beers for brewery
-            brewery_beers = self.rb.get_brewery(brewery_id)
+            brewery_beers = self._call(self.rb.get_brewery, brewery_id)
 
             if not brewery_beers or 'beers' not in brewery_beers:
                 logger.warning(f"No beers found for brewery {brewery_id}")
@@ -132,6 +150,7 @@ class RateBeerScraper(BaseScraper):
 
         except Exception as e:
             logger.error(f"Error fetching beers from RateBeer: {e}")
+            self.last_error = e
 
         return beers
 
@@ -196,7 +215,7 @@ class RateBeerScraper(BaseScraper):
         try:
             logger.info(f"Searching for beer: '{beer_name}'")
 
-            results = self.rb.search(beer_name)
+            results = self._call(self.rb.search, beer_name)
 
             if not results or 'beers' not in results:
                 logger.warning(f"No results for '{beer_name}'")
@@ -216,7 +235,7 @@ class RateBeerScraper(BaseScraper):
                 return None
 
             # Get full beer details
-            full_beer = self.rb.get_beer(beer_id)
+            full_beer = self._call(self.rb.get_beer, beer_id)
 
             if full_beer:
                 # Extract brewery name
@@ -246,7 +265,7 @@ class RateBeerScraper(BaseScraper):
             logger.info(f"Searching for '{style}' beers...")
 
             # Search by style
-            results = self.rb.search(style)
+            results = self._call(self.rb.search, style)
 
             if not results or 'beers' not in results:
                 logger.warning(f"No results for style '{style}'")
@@ -0,0 +1,70 @@
+"""
+Resumable progress for long scraping runs.
+
+A checkpoint is a small JSON file listing the ids of items already done.
+It is rewritten atomically after each saved batch, so an interrupted run
+picks up where it stopped and never sees a half-written file.
+
+Usage:
+    from reviews.scrapers.utils.checkpoint import Checkpoint
+
+    checkpoint = Checkpoint('logs/ratebeer_checkpoint.json')
+    todo = [pk for pk in pks if pk not in checkpoint]
+    checkpoint.add_many(saved_pks)
+    checkpoint.clear()  # once the whole run is done
+"""
+
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+
+class Checkpoint:
+    """Set of completed ids persisted to a JSON file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.done = set()
+        try:
+            with open(self.path) as f:
+                self.done = set(json.load(f)['done'])
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, item) -> bool:
+        return item in self.done
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def add_many(self, items: Iterable):
+        """Mark ``items`` done and save."""
+        with self._lock:
+            self.done.update(items)
+            self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'updated': datetime.now(timezone.utc).isoformat(),
+            'done': sorted(self.done),
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def clear(self):
+        """Forget all progress and delete the file."""
+        with self._lock:
+            self.done = set()
+            self.path.unlink(missing_ok=True)
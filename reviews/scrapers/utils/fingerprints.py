@@ -0,0 +1,98 @@
+"""
+Content fingerprints for incremental scraping.
+
+A page's fingerprint is the SHA-256 of its body: when it matches the one
+stored by the last run, the page hasn't changed and neither parsing nor
+database reconciliation is needed. When it doesn't, each parsed beer is
+fingerprinted field by field and compared with the stored records, so
+only real changes are applied and reported.
+
+Usage:
+    from reviews.scrapers.utils.fingerprints import diff_records, fingerprint_records
+
+    changes = diff_records(stored_records, beers)
+    for beer, fields in changes.changed:
+        print(beer['name'], fields)
+    stored_records = fingerprint_records(beers)
+"""
+
+import hashlib
+from typing import Dict, List, NamedTuple, Tuple
+
+
+# Beer fields whose changes are tracked between runs: those the daily
+# scrape applies (images are fetched by scrape_beer_images)
+TRACKED_FIELDS = ('abv', 'description')
+
+
+class RecordChanges(NamedTuple):
+    """Differences between the stored records and a fresh parse."""
+    added: List[Dict]
+    changed: List[Tuple[Dict, List[str]]]
+    removed: List[str]
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+def content_hash(content: bytes) -> str:
+    """SHA-256 hex digest of a response body."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def record_key(beer: Dict) -> str:
+    """Identity of a beer within its page: the normalised name."""
+    return ' '.join(str(beer.get('name') or '').split()).lower()
+
+
+def _field_hash(value) -> str:
+    text = '' if value is None else ' '.join(str(value).split())
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def record_fingerprint(beer: Dict) -> Dict[str, str]:
+    """Display name plus a short hash of each tracked field."""
+    fingerprint = {field: _field_hash(beer.get(field)) for field in TRACKED_FIELDS}
+    fingerprint['name'] = ' '.join(str(beer.get('name') or '').split())
+    return fingerprint
+
+
+def fingerprint_records(beers: List[Dict]) -> Dict[str, Dict[str, str]]:
+    """Fingerprints of a page's beers, by ``record_key`` (first listing wins)."""
+    records = {}
+    for beer in beers:
+        key = record_key(beer)
+        if key and key not in records:
+            records[key] = record_fingerprint(beer)
+    return records
+
+
+def diff_records(stored: Dict[str, Dict[str, str]], beers: List[Dict]) -> RecordChanges:
+    """
+    Compare freshly parsed beers with the records stored by the last run.
+
+    Args:
+        stored: ``fingerprint_records`` output from the last run
+        beers: Beers parsed from the page now
+
+    Returns:
+        ``RecordChanges``: new beers, changed beers with the names of
+        their changed fields, and display names of beers no longer listed
+    """
+    added, changed = [], []
+    seen = set()
+    for beer in beers:
+        key = record_key(beer)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        previous = stored.get(key)
+        if previous is None:
+            added.append(beer)
+            continue
+        current = record_fingerprint(beer)
+        fields = [field for field in TRACKED_FIELDS if previous.get(field) != current[field]]
+        if fields:
+            changed.append((beer, fields))
+    removed = [record.get('name') or key for key, record in stored.items() if key not in seen]
+    return RecordChanges(added, changed, removed)
@@ -0,0 +1,209 @@
+"""
+On-disk HTTP cache for scraper requests.
+
+Scraper and image downloader sessions are ``requests_cache`` sessions
+sharing one SQLite file (``HTTP_CACHE_PATH``). Each source has a policy:
+how many seconds a stored response is reused without asking the server.
+After that the request is sent with ``If-None-Match``/``If-Modified-Since``
+built from the stored ETag/Last-Modified, and a 304 reply is served from
+the cache. A policy of 0 revalidates every time, which still saves the
+download whenever the page hasn't changed.
+
+Every response is counted per source as a hit (served from the cache),
+revalidated (304) or miss (downloaded), for scrape summaries.
+
+Usage:
+    from reviews.scrapers.utils.http_cache import cached_session, format_cache_stats
+
+    session = cached_session('openbrewerydb')
+    session.get(url, timeout=30)
+    print(format_cache_stats())
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+from requests import Session
+from requests_cache import BaseCache, CachedSession, SQLiteCache
+
+
+logger = logging.getLogger('beer_scraper.http_cache')
+
+
+# Seconds a response is reused before revalidating, by source name
+# prefix (longest match wins)
+DEFAULT_CACHE_POLICIES = {
+    'openbrewerydb': 6 * 60 * 60,
+    'ratebeer': 24 * 60 * 60,
+    'brewery_': 0,
+    'images': 7 * 24 * 60 * 60,
+    'default': 0,
+}
+
+
+class CacheStats:
+    """Thread-safe hit/revalidated/miss counters for one source."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def record(self, response):
+        with self._lock:
+            if getattr(response, 'revalidated', False):
+                self.revalidated += 1
+            elif getattr(response, 'from_cache', False):
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.revalidated + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of requests answered without a full download."""
+        return (self.hits + self.revalidated) / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+        }
+
+
+class ScraperSession(CachedSession):
+    """Cached session that counts how each response was served."""
+
+    def __init__(self, source: str, **kwargs):
+        super().__init__(**kwargs)
+        self.source = source
+        self.cache_stats = get_cache_stats(source)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.cache_stats.record(response)
+        return response
+
+    def close(self):
+        # The backend is shared with other sessions; leave it open
+        Session.close(self)
+
+
+_backend = None
+_stats: Dict[str, CacheStats] = {}
+_lock = threading.Lock()
+
+
+def _settings() -> Dict:
+    try:
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+    except ImportError:
+        return {}
+    try:
+        return {
+            'path': getattr(settings, 'HTTP_CACHE_PATH', None),
+            'policies': getattr(settings, 'HTTP_CACHE_POLICIES', {}),
+        }
+    except ImproperlyConfigured:
+        return {}
+
+
+def get_backend():
+    """
+    Get the cache storage shared by every scraper session.
+
+    SQLite at ``HTTP_CACHE_PATH`` when set, otherwise in memory.
+    """
+    global _backend
+    with _lock:
+        if _backend is None:
+            path = _settings().get('path')
+            if path:
+                _backend = SQLiteCache(str(path), wal=True)
+            else:
+                _backend = BaseCache()
+        return _backend
+
+
+def reset_backend():
+    """Forget the shared storage, so the next session opens it from the settings again."""
+    global _backend
+    with _lock:
+        _backend = None
+
+
+def policy_for(source: str) -> int:
+    """
+    Seconds responses for ``source`` are reused before revalidation.
+
+    ``HTTP_CACHE_POLICIES`` entries override ``DEFAULT_CACHE_POLICIES``.
+    """
+    policies = {**DEFAULT_CACHE_POLICIES, **_settings().get('policies', {})}
+    matches = [prefix for prefix in policies if prefix != 'default' and source.startswith(prefix)]
+    return policies[max(matches, key=len)] if matches else policies['default']
+
+
+def cached_session(source: str, expire_after: Optional[int] = None, backend=None) -> ScraperSession:
+    """
+    Create a cached session for ``source``.
+
+    Args:
+        source: Source name, used for the policy and stats
+        expire_after: Overrides the source's policy
+        backend: Overrides the shared backend (tests)
+
+    Returns:
+        ``ScraperSession``; a drop-in ``requests.Session``
+    """
+    return ScraperSession(
+        source,
+        backend=backend or get_backend(),
+        expire_after=policy_for(source) if expire_after is None else expire_after,
+        allowable_methods=('GET', 'HEAD'),
+        allowable_codes=(200,),
+        # Our policies decide freshness; servers' validators still apply
+        cache_control=False,
+        stale_if_error=True,
+    )
+
+
+def get_cache_stats(source: str) -> CacheStats:
+    """Counters for ``source``, created on first use."""
+    with _lock:
+        return _stats.setdefault(source, CacheStats())
+
+
+def cache_stats() -> Dict[str, Dict]:
+    """Stats for every source seen in this process."""
+    with _lock:
+        return {source: stats.as_dict() for source, stats in sorted(_stats.items())}
+
+
+def reset_cache_stats():
+    """Zero all counters."""
+    with _lock:
+        for stats in _stats.values():
+            with stats._lock:
+                stats.hits = stats.revalidated = stats.misses = 0
+
+
+def format_cache_stats() -> str:
+    """One summary line per source, for command output."""
+    lines = []
+    for source, stats in cache_stats().items():
+        if stats['requests']:
+            lines.append(
+                f"  HTTP cache {source}: {stats['requests']} requests, "
+                f"{stats['hits']} hits, {stats['revalidated']} not modified, "
+                f"{stats['misses']} downloaded ({stats['hit_rate']:.0%} saved)"
+            )
+    return '\n'.join(lines)
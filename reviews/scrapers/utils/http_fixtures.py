@@ -0,0 +1,175 @@
+"""
+Recorded HTTP fixtures for running scrapers offline.
+
+In record mode a session's requests go to the network as usual and every
+response is also saved to a fixture directory. In replay mode the same
+session is answered from that directory only: nothing reaches the
+network, and a request that was never recorded fails with
+``FixtureMissing``, a ``requests.ConnectionError``, so scrapers handle it
+like any other connection failure.
+
+Both modes are ``requests`` transport adapters mounted on the session,
+so they work for ``BaseScraper.session``, ``ImageDownloader.session`` or
+any other session, and everything above the transport (headers,
+retries, robots.txt checks, parsing) runs unchanged. The HTTP cache is
+bypassed while a session records or replays.
+
+Each response is stored as ``<key>.json`` (method, URL, status, headers)
+next to ``<key>.body`` (the raw bytes), where the key is a hash of the
+method and URL.
+
+Usage:
+    from reviews.scrapers.utils.http_fixtures import record, replay
+
+    record(scraper.session, 'tests/fixtures/scrapers/harveys')
+    scraper.fetch_beers()  # live, and saved
+
+    replay(scraper.session, 'tests/fixtures/scrapers/harveys')
+    scraper.fetch_beers()  # offline
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+logger = logging.getLogger('beer_scraper.fixtures')
+
+
+# Headers worth keeping; the rest (cookies, dates, tracing) only add noise
+KEPT_HEADERS = ('Content-Type', 'Content-Encoding', 'ETag', 'Last-Modified', 'Location')
+
+
+class FixtureMissing(requests.ConnectionError):
+    """No response was recorded for a request being replayed."""
+
+
+class FixtureStore:
+    """Recorded responses in one directory."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return hashlib.sha1(f'{method.upper()} {url}'.encode()).hexdigest()[:16]
+
+    def save(self, response: requests.Response):
+        """Store ``response`` under its request's method and URL."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        request = response.request
+        key = self.key(request.method, request.url)
+        meta = {
+            'method': request.method.upper(),
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {
+                name: response.headers[name] for name in KEPT_HEADERS if name in response.headers
+            },
+        }
+        # Bodies are stored decoded
+        meta['headers'].pop('Content-Encoding', None)
+        self._write(self.directory / f'{key}.body', response.content)
+        self._write(self.directory / f'{key}.json', json.dumps(meta, indent=2).encode())
+
+    def _write(self, path: Path, data: bytes):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, request: requests.PreparedRequest) -> requests.Response:
+        """
+        The recorded response to ``request``.
+
+        Raises:
+            FixtureMissing: If nothing was recorded for it
+        """
+        key = self.key(request.method, request.url)
+        try:
+            meta = json.loads((self.directory / f'{key}.json').read_text())
+            body = (self.directory / f'{key}.body').read_bytes()
+        except FileNotFoundError:
+            raise FixtureMissing(
+                f'No recorded response for {request.method} {request.url} in {self.directory}',
+                request=request,
+            )
+
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.reason = meta.get('reason')
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response._content = body
+        response._content_consumed = True
+        response.url = meta['url']
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def entries(self) -> List[Dict]:
+        """Metadata of every recorded response."""
+        return [json.loads(path.read_text()) for path in sorted(self.directory.glob('*.json'))]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests to the network and saves each response."""
+
+    def __init__(self, store: FixtureStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.store.save(response)
+        logger.debug(f'Recorded {request.method} {request.url}')
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from recorded responses only."""
+
+    def __init__(self, store: FixtureStore):
+        super().__init__()
+        self.store = store
+
+    def send(self, request, **kwargs):
+        return self.store.load(request)
+
+    def close(self):
+        pass
+
+
+def _mount(session: requests.Session, adapter: BaseAdapter):
+    for prefix in ('http://', 'https://'):
+        session.mount(prefix, adapter)
+    settings = getattr(session, 'settings', None)
+    if settings is not None:
+        # A cached response would never reach the adapter
+        settings.disabled = True
+
+
+def record(session: requests.Session, directory) -> FixtureStore:
+    """Save every response ``session`` receives to ``directory``."""
+    store = FixtureStore(directory)
+    _mount(session, RecordingAdapter(store))
+    return store
+
+
+def replay(session: requests.Session, directory) -> FixtureStore:
+    """Answer ``session`` from responses recorded in ``directory``."""
+    store = FixtureStore(directory)
+    _mount(session, ReplayAdapter(store))
+    return store
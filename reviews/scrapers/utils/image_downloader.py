@@ -11,6 +11,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Optional, Tuple
 from PIL import Image
 
+from .http_cache import cached_session
+
 
 logger = logging.getLogger('beer_scraper.images')
 
@@ -32,7 +34,7 @@ class ImageDownloader:
         self.max_workers = max_workers
         self.timeout = timeout
         self.max_retries = max_retries
-        self.session = requests.Session()
+        self.session = cached_session('images')
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
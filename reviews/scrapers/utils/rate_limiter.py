@@ -2,15 +2,22 @@
 Rate limiting utilities for polite web scraping.
 
 Implements rate limiting with exponential backoff and configurable delays.
+
+``HostRateLimiter`` is the limiter scrapers share: one token bucket per
+host, paced by the slower of the scraper's own delay and the host's
+robots.txt ``Crawl-delay``, safe to use from threads and event loops.
 """
 
+import asyncio
 import time
 import random
 import logging
+import threading
 from functools import wraps
 from typing import Dict, Optional, Callable
 from collections import defaultdict
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 
 
 logger = logging.getLogger('beer_scraper.rate_limiter')
@@ -113,9 +120,192 @@ class RateLimiter:
             }
 
 
+class TokenBucket:
+    """
+    Token bucket allowing one request per ``interval`` seconds.
+
+    Up to ``capacity`` unused tokens accumulate for bursts. Tokens may go
+    negative: each reservation takes the next free slot, so callers get
+    a schedule instead of racing for the same moment. Not locked;
+    ``HostRateLimiter`` serialises access.
+    """
+
+    def __init__(self, interval: float, capacity: float = 1.0):
+        """
+        Initialize token bucket.
+
+        Args:
+            interval: Seconds between requests
+            capacity: Most requests allowed back to back
+        """
+        self.interval = interval
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.interval <= 0:
+            self.tokens = self.capacity
+        else:
+            elapsed = max(0.0, now - self.updated)
+            self.tokens = min(self.capacity, self.tokens + elapsed / self.interval)
+        self.updated = now
+
+    def time_until_available(self, now: Optional[float] = None) -> float:
+        """
+        Seconds until a token is free, without taking it.
+
+        Args:
+            now: ``time.monotonic()`` value to use
+
+        Returns:
+            0 if a request may be made now
+        """
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.interval
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """
+        Take the next free slot.
+
+        Returns:
+            Seconds the caller must wait before making its request
+        """
+        delay = self.time_until_available(now)
+        self.tokens -= 1
+        return delay
+
+
+class HostRateLimiter:
+    """
+    Per-host token buckets shared by all scrapers.
+
+    Keyed by host rather than scraper, so two scrapers hitting one site
+    share its budget. A host's interval is the largest of the limiter's
+    default, any interval asked for by a caller and the host's robots.txt
+    ``Crawl-delay``. Uses ``time.monotonic`` and a lock, so it is safe
+    from many threads; ``reserve`` and ``time_until_next`` never sleep,
+    so schedulers can serve other hosts while one is cooling down.
+    """
+
+    def __init__(self, default_interval: float = 0.0, capacity: float = 1.0):
+        """
+        Initialize host rate limiter.
+
+        Args:
+            default_interval: Minimum seconds between requests to any host
+            capacity: Burst size per host
+        """
+        self.default_interval = default_interval
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._crawl_delays: Dict[str, Optional[float]] = {}
+
+    @staticmethod
+    def host(url: str) -> str:
+        """Host part of ``url`` (the key buckets are stored under)."""
+        return urlparse(url).netloc.lower() or url
+
+    def crawl_delay(self, url: str, robots_checker) -> Optional[float]:
+        """
+        Host's robots.txt ``Crawl-delay``, looked up once per host.
+
+        May fetch robots.txt, so async callers should run it in a thread
+        (``wait_async`` does).
+        """
+        host = self.host(url)
+        if host not in self._crawl_delays:
+            # Fetch outside the lock: robots.txt can be slow
+            delay = robots_checker.get_crawl_delay(url)
+            with self._lock:
+                self._crawl_delays.setdefault(host, float(delay) if delay else None)
+        return self._crawl_delays[host]
+
+    def _bucket(self, host: str, interval: float) -> TokenBucket:
+        interval = max(interval, self.default_interval)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(interval, self.capacity)
+        elif interval > bucket.interval:
+            bucket.interval = interval
+        return bucket
+
+    def _interval(self, url: str, interval: float, robots_checker) -> float:
+        if robots_checker is not None:
+            crawl_delay = self.crawl_delay(url, robots_checker)
+            if crawl_delay:
+                interval = max(interval, crawl_delay)
+        return interval
+
+    def time_until_next(self, url: str) -> float:
+        """
+        Seconds until a request to ``url``'s host may be made, without
+        reserving it.
+
+        Returns:
+            0 for hosts with a free slot or not seen yet
+        """
+        with self._lock:
+            bucket = self._buckets.get(self.host(url))
+            return bucket.time_until_available() if bucket else 0.0
+
+    def reserve(self, url: str, interval: float = 0.0, robots_checker=None) -> float:
+        """
+        Reserve the next slot for ``url``'s host.
+
+        Args:
+            url: URL about to be requested
+            interval: Caller's own minimum seconds between requests
+            robots_checker: ``RobotsChecker`` to read ``Crawl-delay`` from
+
+        Returns:
+            Seconds to wait before making the request
+        """
+        interval = self._interval(url, interval, robots_checker)
+        with self._lock:
+            return self._bucket(self.host(url), interval).reserve()
+
+    def wait(self, url: str, interval: float = 0.0, robots_checker=None):
+        """Block until the next slot for ``url``'s host."""
+        delay = self.reserve(url, interval, robots_checker)
+        if delay > 0:
+            logger.debug(f"Rate limiting {self.host(url)}: sleeping {delay:.2f}s")
+            time.sleep(delay)
+
+    async def wait_async(self, url: str, interval: float = 0.0, robots_checker=None):
+        """Wait for the next slot for ``url``'s host without blocking the event loop."""
+        if robots_checker is not None and self.host(url) not in self._crawl_delays:
+            await asyncio.to_thread(self.crawl_delay, url, robots_checker)
+        delay = self.reserve(url, interval, robots_checker)
+        if delay > 0:
+            logger.debug(f"Rate limiting {self.host(url)}: sleeping {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def reset(self, host: Optional[str] = None):
+        """
+        Forget buckets and crawl delays.
+
+        Args:
+            host: Host to reset, or None to reset all
+        """
+        with self._lock:
+            if host:
+                self._buckets.pop(host, None)
+                self._crawl_delays.pop(host, None)
+            else:
+                self._buckets.clear()
+                self._crawl_delays.clear()
+
+
 # Global rate limiter instance
 _global_rate_limiter = RateLimiter()
 
+# Per-host limiter shared by every scraper
+_global_host_limiter = HostRateLimiter()
+
 
 def rate_limited(source: str = 'default', jitter: bool = True):
     """
@@ -297,3 +487,13 @@ def get_rate_limit_stats(source: Optional[str] = None) -> Dict:
         Statistics dictionary
     """
     return _global_rate_limiter.get_stats(source)
+
+
+def get_host_limiter() -> HostRateLimiter:
+    """
+    Get the per-host limiter shared by all scrapers.
+
+    Returns:
+        The process-wide ``HostRateLimiter``
+    """
+    return _global_host_limiter
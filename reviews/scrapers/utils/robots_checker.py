@@ -2,33 +2,243 @@
 Robots.txt compliance checker for ethical web scraping.
 
 Checks if URLs can be scraped according to robots.txt rules.
+
+Fetched robots.txt files live in one process-wide ``RobotsCache``, kept
+in memory and (when ``ROBOTS_CACHE_DIR`` is set) on disk, so every
+scraper and checker shares them and a daily run downloads each file at
+most once. Files are kept for ``ROBOTS_CACHE_TTL`` seconds; failed
+fetches are remembered for the shorter ``ROBOTS_NEGATIVE_TTL`` so a dead
+host isn't retried on every request.
 """
 
+import hashlib
+import json
 import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
 from urllib.robotparser import RobotFileParser
 from urllib.parse import urlparse
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+
+import requests
 
 
 logger = logging.getLogger('beer_scraper.robots')
 
 
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL = 60 * 60
+FETCH_TIMEOUT = 10
+
+
+def build_parser(status: Optional[int], body: str) -> Optional[RobotFileParser]:
+    """
+    Build a parser from a robots.txt response, as ``RobotFileParser.read`` would.
+
+    Args:
+        status: HTTP status, or None if the host could not be reached
+        body: Response body
+
+    Returns:
+        RobotFileParser, or None if the host could not be reached
+    """
+    if status is None:
+        return None
+    parser = RobotFileParser()
+    if status in (401, 403):
+        parser.disallow_all = True
+    elif 400 <= status < 500:
+        # No robots.txt: everything is allowed
+        parser.allow_all = True
+    elif status >= 500:
+        parser.disallow_all = True
+    else:
+        parser.parse(body.splitlines())
+    return parser
+
+
+class RobotsCache:
+    """
+    Shared store of robots.txt responses with TTL and negative caching.
+
+    Entries are kept in memory and, if ``directory`` is given, as one
+    JSON file per domain so later processes reuse them. Concurrent
+    lookups for one domain wait for a single fetch.
+    """
+
+    def __init__(self, directory=None, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        """
+        Initialize robots.txt cache.
+
+        Args:
+            directory: Where to persist entries, or None for memory only
+            ttl: Seconds to keep a fetched robots.txt
+            negative_ttl: Seconds to keep a failed fetch (network or 5xx error)
+        """
+        self.directory = Path(directory) if directory else None
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Optional[RobotFileParser]]] = {}
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self.fetches = 0
+
+    def get(self, domain: str, fetch) -> Optional[RobotFileParser]:
+        """
+        Parser for ``domain``, fetching robots.txt if not cached or expired.
+
+        Args:
+            domain: Scheme and host (e.g., "https://example.com")
+            fetch: Callable taking the domain and returning (status, body)
+
+        Returns:
+            RobotFileParser, or None if the host could not be reached
+        """
+        entry = self._entries.get(domain)
+        if entry and entry[0] > time.time():
+            return entry[1]
+
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(domain, threading.Lock())
+        with fetch_lock:
+            # Another thread may have fetched it while we waited
+            entry = self._entries.get(domain)
+            if entry and entry[0] > time.time():
+                return entry[1]
+
+            stored = self._load(domain)
+            if stored is None:
+                status, body = fetch(domain)
+                self.fetches += 1
+                stored = {'status': status, 'body': body, 'fetched': time.time()}
+                self._save(domain, stored)
+
+            parser = build_parser(stored['status'], stored['body'])
+            self._entries[domain] = (self._expires(stored), parser)
+            return parser
+
+    def _expires(self, stored: Dict) -> float:
+        failed = stored['status'] is None or stored['status'] >= 500
+        return stored['fetched'] + (self.negative_ttl if failed else self.ttl)
+
+    def clear(self, domain: Optional[str] = None):
+        """
+        Forget cached entries, in memory and on disk.
+
+        Args:
+            domain: Specific domain to clear, or None for all
+        """
+        with self._lock:
+            domains = [domain] if domain else list(self._entries)
+            for name in domains:
+                self._entries.pop(name, None)
+                if self.directory:
+                    self._path(name).unlink(missing_ok=True)
+            if not domain and self.directory and self.directory.exists():
+                for path in self.directory.glob('*.json'):
+                    path.unlink(missing_ok=True)
+
+    def _path(self, domain: str) -> Path:
+        return self.directory / f'{hashlib.sha1(domain.encode()).hexdigest()}.json'
+
+    def _load(self, domain: str) -> Optional[Dict]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(domain)) as f:
+                stored = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if stored.get('domain') != domain or self._expires(stored) <= time.time():
+            return None
+        return stored
+
+    def _save(self, domain: str, stored: Dict):
+        if not self.directory:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so other processes never read half a file
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'domain': domain, **stored}, f)
+            os.replace(tmp, self._path(domain))
+        except OSError as e:
+            logger.warning(f"Could not persist robots.txt for {domain}: {e}")
+
+
+_robots_cache = None
+_robots_cache_lock = threading.Lock()
+
+
+def _cache_settings() -> Dict:
+    try:
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+    except ImportError:
+        return {}
+    try:
+        return {
+            'directory': getattr(settings, 'ROBOTS_CACHE_DIR', None),
+            'ttl': getattr(settings, 'ROBOTS_CACHE_TTL', DEFAULT_TTL),
+            'negative_ttl': getattr(settings, 'ROBOTS_NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL),
+        }
+    except ImproperlyConfigured:
+        return {}
+
+
+def get_robots_cache() -> RobotsCache:
+    """
+    Get the process-wide robots.txt cache.
+
+    Configured from Django's ``ROBOTS_CACHE_DIR``, ``ROBOTS_CACHE_TTL``
+    and ``ROBOTS_NEGATIVE_TTL`` settings when available, otherwise kept
+    in memory only.
+    """
+    global _robots_cache
+    with _robots_cache_lock:
+        if _robots_cache is None:
+            _robots_cache = RobotsCache(**_cache_settings())
+        return _robots_cache
+
+
 class RobotsChecker:
     """
     Check robots.txt compliance for URLs.
 
-    Caches robot parsers to avoid repeated fetches.
+    Parsers come from the shared ``RobotsCache``, so checkers are cheap
+    to create and never refetch what another checker already has.
     """
 
-    def __init__(self, user_agent: str = '*'):
+    def __init__(self, user_agent: str = '*', session: Optional[requests.Session] = None,
+                 cache: Optional[RobotsCache] = None, timeout: float = FETCH_TIMEOUT):
         """
         Initialize robots checker.
 
         Args:
             user_agent: User agent string to check permissions for
+            session: Session to fetch robots.txt with (pooled connections,
+                scraper headers); a plain request is made without one
+            cache: Cache to use instead of the process-wide one
+            timeout: Fetch timeout in seconds
         """
         self.user_agent = user_agent
-        self._parsers: Dict[str, RobotFileParser] = {}
+        self.session = session
+        self._cache = cache
+        self.timeout = timeout
+
+    @property
+    def cache(self) -> RobotsCache:
+        return self._cache or get_robots_cache()
+
+    def _get_parser(self, url: str) -> Optional[RobotFileParser]:
+        parsed_url = urlparse(url)
+        domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        return self.cache.get(domain, self._fetch_robots)
 
     def can_fetch(self, url: str) -> bool:
         """
@@ -44,18 +254,11 @@ class RobotsChecker:
             If robots.txt cannot be fetched, assumes allowed (fail open).
         """
         try:
-            parsed_url = urlparse(url)
-            domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
-
-            # Get or create parser for domain
-            if domain not in self._parsers:
-                self._parsers[domain] = self._fetch_robots(domain)
-
-            parser = self._parsers[domain]
+            parser = self._get_parser(url)
 
             if parser is None:
                 # Could not fetch robots.txt, assume allowed
-                logger.warning(f"Could not fetch robots.txt for {domain}, assuming allowed")
+                logger.warning(f"Could not fetch robots.txt for {url}, assuming allowed")
                 return True
 
             # Check if URL is allowed
@@ -71,30 +274,26 @@ class RobotsChecker:
             # On error, assume allowed (fail open)
             return True
 
-    def _fetch_robots(self, domain: str) -> Optional[RobotFileParser]:
+    def _fetch_robots(self, domain: str) -> Tuple[Optional[int], str]:
         """
-        Fetch and parse robots.txt for domain.
+        Fetch robots.txt for domain.
 
         Args:
             domain: Domain URL (e.g., "https://example.com")
 
         Returns:
-            RobotFileParser or None if fetch fails
+            Tuple of (HTTP status or None if unreachable, body)
         """
+        robots_url = f"{domain}/robots.txt"
+        logger.debug(f"Fetching robots.txt from {robots_url}")
         try:
-            robots_url = f"{domain}/robots.txt"
-            logger.debug(f"Fetching robots.txt from {robots_url}")
-
-            parser = RobotFileParser()
-            parser.set_url(robots_url)
-            parser.read()
-
-            logger.info(f"Successfully loaded robots.txt for {domain}")
-            return parser
-
-        except Exception as e:
+            response = (self.session or requests).get(robots_url, timeout=self.timeout)
+        except requests.RequestException as e:
             logger.warning(f"Could not fetch robots.txt for {domain}: {e}")
-            return None
+            return None, ''
+
+        logger.info(f"Loaded robots.txt for {domain} (HTTP {response.status_code})")
+        return response.status_code, response.text
 
     def get_crawl_delay(self, url: str) -> Optional[float]:
         """
@@ -107,13 +306,7 @@ class RobotsChecker:
             Crawl delay in seconds, or None if not specified
         """
         try:
-            parsed_url = urlparse(url)
-            domain = f"{parsed_url.scheme}://{parsed_url.netloc}"
-
-            if domain not in self._parsers:
-                self._parsers[domain] = self._fetch_robots(domain)
-
-            parser = self._parsers[domain]
+            parser = self._get_parser(url)
 
             if parser is None:
                 return None
@@ -122,7 +315,7 @@ class RobotsChecker:
             delay = parser.crawl_delay(self.user_agent)
 
             if delay:
-                logger.info(f"Crawl delay for {domain}: {delay}s")
+                logger.info(f"Crawl delay for {urlparse(url).netloc}: {delay}s")
 
             return delay
 
@@ -137,13 +330,8 @@ class RobotsChecker:
         Args:
             domain: Specific domain to clear, or None for all
         """
-        if domain:
-            if domain in self._parsers:
-                del self._parsers[domain]
-                logger.debug(f"Cleared robots.txt cache for {domain}")
-        else:
-            self._parsers.clear()
-            logger.debug("Cleared all robots.txt cache")
+        self.cache.clear(domain)
+        logger.debug(f"Cleared robots.txt cache for {domain or 'all domains'}")
 
 
 # Global robots checker instance
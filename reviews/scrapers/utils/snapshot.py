@@ -0,0 +1,170 @@
+"""
+Compressed NDJSON snapshots of raw API records.
+
+A snapshot is one gzip file per fetch, named after the source and the UTC
+time it was taken (``openbrewerydb-20261019T040000Z.ndjson.gz``), holding
+one raw JSON record per line. Keeping the raw records means a later run
+can be replayed offline (or in tests) through the current processing
+code, and diffed against the previous snapshot to see what changed
+upstream.
+
+Usage:
+    from reviews.scrapers.utils.snapshot import diff_records, latest_snapshot, write_snapshot
+
+    previous = latest_snapshot('openbrewerydb')
+    path = write_snapshot('openbrewerydb', records)
+    diff = diff_records(previous.records if previous else [], records)
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+
+logger = logging.getLogger('beer_scraper.snapshot')
+
+
+DEFAULT_DIRECTORY = 'snapshots'
+
+# Snapshots kept per source; older ones are deleted on write
+DEFAULT_KEEP = 5
+
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+class Snapshot(NamedTuple):
+    """A stored snapshot and its records."""
+    path: Path
+    taken_at: datetime
+    records: List[Dict]
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was taken."""
+        return (datetime.now(timezone.utc) - self.taken_at).total_seconds()
+
+
+class SnapshotDiff(NamedTuple):
+    """Records added, changed and removed between two snapshots."""
+    added: List[Dict]
+    changed: List[Dict]
+    removed: List[Dict]
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self) -> str:
+        return f'{len(self.added)} new, {len(self.changed)} changed, {len(self.removed)} removed'
+
+
+def _settings() -> Dict:
+    try:
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+    except ImportError:
+        return {}
+    try:
+        return {
+            'directory': getattr(settings, 'SCRAPER_SNAPSHOT_DIR', None),
+            'keep': getattr(settings, 'SCRAPER_SNAPSHOT_KEEP', DEFAULT_KEEP),
+        }
+    except ImproperlyConfigured:
+        return {}
+
+
+def snapshot_dir(directory=None) -> Path:
+    """``directory``, else ``SCRAPER_SNAPSHOT_DIR``, else ./snapshots."""
+    return Path(directory or _settings().get('directory') or DEFAULT_DIRECTORY)
+
+
+def _pattern(source: str):
+    return re.compile(rf'{re.escape(source)}-(\d{{8}}T\d{{6}}Z)\.ndjson\.gz')
+
+
+def list_snapshots(source: str, directory=None) -> List[Path]:
+    """Snapshot files for ``source``, oldest first."""
+    root = snapshot_dir(directory)
+    if not root.exists():
+        return []
+    pattern = _pattern(source)
+    return sorted(path for path in root.iterdir() if pattern.fullmatch(path.name))
+
+
+def write_snapshot(source: str, records: List[Dict], directory=None,
+                   taken_at: Optional[datetime] = None, keep: Optional[int] = None) -> Path:
+    """
+    Store ``records`` as a new snapshot and prune old ones.
+
+    Written to a temporary file and renamed, so readers never see a
+    partial snapshot.
+
+    Args:
+        source: Source name, the file name prefix
+        records: JSON-serialisable records
+        directory: Overrides ``SCRAPER_SNAPSHOT_DIR``
+        taken_at: Timestamp for the file name (default: now)
+        keep: Snapshots to keep for this source, this one included
+
+    Returns:
+        Path of the new snapshot
+    """
+    root = snapshot_dir(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    taken_at = taken_at or datetime.now(timezone.utc)
+    path = root / f'{source}-{taken_at.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)}.ndjson.gz'
+
+    fd, tmp = tempfile.mkstemp(dir=root, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for record in records:
+                f.write(json.dumps(record, sort_keys=True, separators=(',', ':')).encode())
+                f.write(b'\n')
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    keep = keep or _settings().get('keep') or DEFAULT_KEEP
+    for old in list_snapshots(source, root)[:-keep]:
+        old.unlink(missing_ok=True)
+    logger.info(f'Wrote {len(records)} records to {path}')
+    return path
+
+
+def read_snapshot(path) -> Snapshot:
+    """Load a snapshot file."""
+    path = Path(path)
+    stamp = re.search(r'(\d{8}T\d{6}Z)\.ndjson\.gz$', path.name).group(1)
+    taken_at = datetime.strptime(stamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return Snapshot(path, taken_at, records)
+
+
+def latest_snapshot(source: str, directory=None) -> Optional[Snapshot]:
+    """Most recent snapshot for ``source``, or None if there isn't one."""
+    paths = list_snapshots(source, directory)
+    return read_snapshot(paths[-1]) if paths else None
+
+
+def diff_records(old: List[Dict], new: List[Dict], key: str = 'id') -> SnapshotDiff:
+    """
+    Compare two lists of records by ``key``.
+
+    Returns:
+        ``SnapshotDiff`` of new records, new versions of changed
+        records, and old versions of removed records
+    """
+    before = {record.get(key): record for record in old}
+    after = {record.get(key): record for record in new}
+    return SnapshotDiff(
+        added=[record for k, record in after.items() if k not in before],
+        changed=[record for k, record in after.items() if k in before and before[k] != record],
+        removed=[record for k, record in before.items() if k not in after],
+    )
@@ -0,0 +1,65 @@
+"""
+Signal handlers for the reviews app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core import images, jobs
+
+from . import live, sitemaps
+from .models import Beer, Brewery, Category, Review, ReviewLike
+
+
+def publish_review_approved(sender, instance, raw=False, **kwargs):
+    """Push a review to live feeds once it becomes approved."""
+    was_approved = getattr(instance, '_stored_is_approved', False)
+    instance._stored_is_approved = instance.is_approved
+    if raw or not instance.is_approved or was_approved:
+        return
+    review_id = instance.pk
+    transaction.on_commit(lambda: live.publish_approved_reviews([review_id]))
+
+
+def publish_like_count(sender, instance, raw=False, **kwargs):
+    """Push the new like count after a like is added or removed."""
+    if raw:
+        return
+    review_id = instance.review_id
+    transaction.on_commit(lambda: live.publish_like_count(review_id))
+
+
+post_save.connect(publish_review_approved, sender=Review, dispatch_uid='live_review_save')
+post_save.connect(publish_like_count, sender=ReviewLike, dispatch_uid='live_like_save')
+post_delete.connect(publish_like_count, sender=ReviewLike, dispatch_uid='live_like_delete')
+
+
+def process_changed_image(sender, instance, raw=False, **kwargs):
+    """Shrink the image and build derivatives in the background if it changed."""
+    if raw or not images.image_changed(instance):
+        return
+    image_name = instance.image.name or ''
+    images.remember_stored_image(instance)
+    jobs.enqueue(
+        images.process_instance_image, sender._meta.label_lower, instance.pk, image_name
+    )
+
+
+for model in (Beer, Brewery, Category):
+    post_save.connect(
+        process_changed_image, sender=model,
+        dispatch_uid=f'image_save_{model.__name__.lower()}'
+    )
+
+
+def invalidate_sitemap(sender, instance, raw=False, **kwargs):
+    """Expire the sitemap shard holding the saved or deleted row."""
+    if raw:
+        return
+    sitemaps.invalidate(sender, [instance.pk])
+
+
+for model in (Beer, Brewery, Category, Review):
+    name = model.__name__.lower()
+    post_save.connect(invalidate_sitemap, sender=model, dispatch_uid=f'sitemap_save_{name}')
+    post_delete.connect(invalidate_sitemap, sender=model, dispatch_uid=f'sitemap_delete_{name}')
@@ -1,26 +1,291 @@
+"""
+Sitemaps for beers, reviews, breweries and categories.
+
+Every section is sharded by primary key range, so a shard never holds more
+than ``SITEMAP_SHARD_SIZE`` URLs. Shards are rendered straight from
+``values_list`` rows and kept in the shared cache (see core/cache.py),
+so every web and worker process sees the same XML. Each shard has its own
+cache version: ``invalidate`` bumps only the shards holding the written
+rows, plus the index, once the transaction commits. The views only render
+a shard on a miss; ``build_sitemaps`` renders them all ahead of time.
+
+Usage:
+    from reviews import sitemaps
+
+    xml = sitemaps.get_shard('beers', 1)
+    sitemaps.invalidate(Beer, [beer.pk])
+"""
+
+from xml.sax.saxutils import escape
+
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
-from .models import Beer, Review
+from django.db.models import Max
+from django.urls import reverse
+
+from core import cache
+
+from .models import Beer, Brewery, Category, Review
+
+
+# Maximum number of URLs per sitemap file (sitemaps.org protocol limit)
+SITEMAP_SHARD_SIZE = 50000
+
+INDEX_FILENAME = 'sitemap.xml'
+
+# Cache version label of the index, which also keys the shard counts
+INDEX_VERSION = 'sitemap.index'
+
+
+class ShardedSitemap(Sitemap):
+    """
+    Sitemap over lightweight ``(pk, lookup, lastmod)`` rows.
+
+    Shard ``n`` (1-based) covers primary keys ``((n - 1) * limit, n * limit]``,
+    so new rows only ever land in the last shard and deletes never shift
+    rows between shards.
+    """
+    limit = SITEMAP_SHARD_SIZE
+    model = None
+    url_name = None
+    lookup_field = 'slug'
+    lastmod_field = 'created_at'
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def shard_for_pk(self, pk):
+        """Return the shard number holding primary key ``pk``."""
+        return (pk - 1) // self.limit + 1
 
+    def shard_count(self):
+        """Return the number of shards needed for the current rows."""
+        max_pk = self.get_queryset().aggregate(max_pk=Max('pk'))['max_pk']
+        return self.shard_for_pk(max_pk) if max_pk else 0
 
-class BeerSitemap(Sitemap):
+    def shard_lastmod(self, shard):
+        """Return the most recent lastmod within a shard."""
+        return self._shard_queryset(shard).aggregate(
+            latest=Max(self.lastmod_field)
+        )['latest']
+
+    def items(self, shard=None):
+        queryset = self.get_queryset()
+        if shard is not None:
+            queryset = self._shard_queryset(shard)
+        return queryset.order_by('pk').values_list(
+            'pk', self.lookup_field, self.lastmod_field
+        )
+
+    def location(self, item):
+        return reverse(self.url_name, kwargs={self.lookup_field: item[1]})
+
+    def lastmod(self, item):
+        return item[2]
+
+    def _shard_queryset(self, shard):
+        return self.get_queryset().filter(
+            pk__gt=(shard - 1) * self.limit,
+            pk__lte=shard * self.limit,
+        )
+
+
+class BeerSitemap(ShardedSitemap):
     """Sitemap for beer pages"""
     changefreq = "weekly"
     priority = 0.8
-    
-    def items(self):
-        return Beer.objects.all()
-    
-    def lastmod(self, obj):
-        return obj.updated_at
+    model = Beer
+    url_name = 'reviews:beer_detail'
+    lastmod_field = 'updated_at'
 
 
-class ReviewSitemap(Sitemap):
+class ReviewSitemap(ShardedSitemap):
     """Sitemap for review pages"""
     changefreq = "monthly"
     priority = 0.6
-    
-    def items(self):
+    model = Review
+    url_name = 'reviews:review_detail'
+    lookup_field = 'pk'
+    lastmod_field = 'updated_at'
+
+    def get_queryset(self):
         return Review.objects.filter(is_approved=True)
-    
-    def lastmod(self, obj):
-        return obj.updated_at
+
+
+class BrewerySitemap(ShardedSitemap):
+    """Sitemap for brewery pages"""
+    changefreq = "weekly"
+    priority = 0.7
+    model = Brewery
+    url_name = 'reviews:brewery_detail'
+
+
+class CategorySitemap(ShardedSitemap):
+    """Sitemap for category pages"""
+    changefreq = "weekly"
+    priority = 0.5
+    model = Category
+    url_name = 'reviews:category_detail'
+
+
+SITEMAPS = {
+    'beers': BeerSitemap,
+    'reviews': ReviewSitemap,
+    'breweries': BrewerySitemap,
+    'categories': CategorySitemap,
+}
+
+
+def site_url():
+    """Return the absolute site root used for sitemap locations."""
+    return f"{settings.SITE_PROTOCOL}://{settings.SITE_DOMAIN}"
+
+
+def shard_filename(section, shard):
+    return f'sitemap-{section}-{shard}.xml'
+
+
+def render_shard(section, shard):
+    """
+    Render one sitemap shard as XML.
+
+    Returns:
+        XML string, or None if the shard does not exist
+    """
+    sitemap = SITEMAPS[section]()
+    if shard < 1 or shard > sitemap.shard_count():
+        return None
+
+    base = site_url()
+    changefreq = f'<changefreq>{sitemap.changefreq}</changefreq>'
+    priority = f'<priority>{sitemap.priority}</priority>'
+
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+    ]
+    for item in sitemap.items(shard).iterator(chunk_size=2000):
+        lastmod = sitemap.lastmod(item)
+        parts.append(
+            '<url><loc>{}</loc>{}{}{}</url>\n'.format(
+                escape(base + sitemap.location(item)),
+                f'<lastmod>{lastmod:%Y-%m-%d}</lastmod>' if lastmod else '',
+                changefreq,
+                priority,
+            )
+        )
+    parts.append('</urlset>\n')
+    return ''.join(parts)
+
+
+def render_index():
+    """Render the sitemap index listing every shard of every section."""
+    base = site_url()
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+    ]
+    for section, sitemap_class in SITEMAPS.items():
+        sitemap = sitemap_class()
+        for shard in range(1, sitemap.shard_count() + 1):
+            location = base + reverse(
+                'sitemap_section', kwargs={'section': section, 'page': shard}
+            )
+            lastmod = sitemap.shard_lastmod(shard)
+            parts.append(
+                '<sitemap><loc>{}</loc>{}</sitemap>\n'.format(
+                    escape(location),
+                    f'<lastmod>{lastmod.isoformat()}</lastmod>' if lastmod else '',
+                )
+            )
+    parts.append('</sitemapindex>\n')
+    return ''.join(parts)
+
+
+def _ttl():
+    return getattr(settings, 'SITEMAP_CACHE_TTL', 24 * 60 * 60)
+
+
+def _shard_version(section, shard):
+    return f'sitemap.{section}.{shard}'
+
+
+def _shard_count(section):
+    sitemap = SITEMAPS[section]()
+    # Only a change to the index can add or remove shards
+    return cache.cached_call(
+        'sitemap_shards', sitemap.shard_count, section,
+        models=(INDEX_VERSION,), ttl=_ttl(),
+    )
+
+
+def get_index(force=False):
+    """Return the cached sitemap index, rendering it on a miss."""
+    return cache.cached_call(
+        'sitemap', render_index, models=(INDEX_VERSION,), ttl=_ttl(), force=force,
+    )
+
+
+def get_shard(section, shard, force=False):
+    """Return a cached shard, rendering it on a miss."""
+    # Checked first so out of range pages never add cache entries
+    if shard < 1 or shard > _shard_count(section):
+        return None
+    return cache.cached_call(
+        'sitemap', lambda: render_shard(section, shard), section, shard,
+        models=(_shard_version(section, shard),), ttl=_ttl(), force=force,
+    )
+
+
+def invalidate(model, pks):
+    """
+    Expire the shards holding rows ``pks`` of ``model``, and the index.
+
+    Takes effect once the current transaction commits. Models without a
+    sitemap section are ignored.
+    """
+    versions = {
+        _shard_version(section, sitemap_class().shard_for_pk(pk))
+        for section, sitemap_class in SITEMAPS.items()
+        if sitemap_class.model is model
+        for pk in pks
+    }
+    if versions:
+        for version in sorted(versions | {INDEX_VERSION}):
+            cache.bump_version_on_commit(version)
+
+
+def invalidate_all():
+    """
+    Expire every shard that currently exists, and the index.
+
+    Call before deleting rows without signals, while the shards can still
+    be counted; takes effect once the transaction commits.
+    """
+    versions = {INDEX_VERSION}
+    for section, sitemap_class in SITEMAPS.items():
+        for shard in range(1, sitemap_class().shard_count() + 1):
+            versions.add(_shard_version(section, shard))
+    for version in sorted(versions):
+        cache.bump_version_on_commit(version)
+
+
+def build_sitemaps(sections=None):
+    """
+    Render and cache the index and every shard.
+
+    Args:
+        sections: Optional list of section names to rebuild
+
+    Returns:
+        List of ``(filename, bytes)`` tuples
+    """
+    written = []
+    for section in sections or SITEMAPS:
+        for shard in range(1, SITEMAPS[section]().shard_count() + 1):
+            content = get_shard(section, shard, force=True)
+            written.append((shard_filename(section, shard), len(content)))
+
+    content = get_index(force=True)
+    written.append((INDEX_FILENAME, len(content)))
+    return written
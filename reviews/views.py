@@ -1,18 +1,20 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from django.core.paginator import Page, Paginator
 from django.db.models import Q, Avg, Count, Case, When, Value, IntegerField
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST
 from django import forms
 from .models import Beer, Review, Category, Brewery, ReviewLike, ReviewComment
 from .forms import ReviewForm, BeerSearchForm, CommentForm, BeerForm
+from . import sitemaps
+from core.cache import cached_call
+from core.db_routers import replica_reads
 
 
-def beer_list(request):
-    """List all beers with search and filtering"""
-    form = BeerSearchForm(request.GET)
+def _search_beers(form):
+    """Apply the search form's filters and sorting to the beer queryset"""
     beers = Beer.objects.select_related('brewery', 'category').annotate(
         avg_rating=Avg('reviews__rating', filter=Q(reviews__is_approved=True)),
         review_count=Count('reviews', filter=Q(reviews__is_approved=True))
@@ -54,7 +56,15 @@ def beer_list(request):
             beers = beers.order_by('-created_at')
     else:
         beers = beers.order_by('-created_at')
-    
+    return beers
+
+
+@replica_reads
+def beer_list(request):
+    """List all beers with search and filtering"""
+    form = BeerSearchForm(request.GET)
+    beers = _search_beers(form)
+
     # Pagination
     paginator = Paginator(beers, 12)
     page_number = request.GET.get('page')
@@ -69,27 +79,18 @@ def beer_list(request):
         'page_obj': page_obj,
         'is_paginated': page_obj.has_other_pages(),
         'form': form,
-        'total_beers': beers.count(),
+        'total_beers': paginator.count,
         'categories': categories,
         'breweries': breweries,
     }
     return render(request, 'reviews/beer_list.html', context)
 
 
-def beer_detail(request, slug):
-    """Detailed view of a single beer"""
-    beer = get_object_or_404(Beer.objects.select_related('brewery', 'category'), slug=slug)
-    reviews = Review.objects.filter(
-        beer=beer, is_approved=True
-    ).select_related('user').order_by('-created_at')
-    
-    # Pagination for reviews
-    paginator = Paginator(reviews, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Calculate statistics in one query
-    aggregates = reviews.aggregate(
+def _compute_beer_stats(beer_id):
+    """Rating statistics for a beer, calculated in one query"""
+    aggregates = Review.objects.filter(
+        beer_id=beer_id, is_approved=True
+    ).aggregate(
         avg_rating=Avg('rating'),
         total_reviews=Count('id'),
         star_1=Count(Case(When(rating=1, then=1), output_field=IntegerField())),
@@ -115,7 +116,33 @@ def beer_detail(request, slug):
             'count': count,
             'percentage': (count / total_reviews * 100) if total_reviews > 0 else 0
         }
+    return stats
+
+
+def get_beer_stats(beer_id, force=False):
+    """Cached rating statistics for a beer"""
+    return cached_call(
+        'beer_stats', lambda: _compute_beer_stats(beer_id), beer_id,
+        models=(Review,), force=force
+    )
+
+
+@replica_reads
+def beer_detail(request, slug):
+    """Detailed view of a single beer"""
+    beer = get_object_or_404(Beer.objects.select_related('brewery', 'category'), slug=slug)
+    reviews = Review.objects.filter(
+        beer=beer, is_approved=True
+    ).select_related('user').order_by('-created_at')
+    
+    # Pagination for reviews
+    paginator = Paginator(reviews, 10)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
     
+    # Rating statistics
+    stats = get_beer_stats(beer.pk)
+
     # Check if user has already reviewed this beer
     user_review = None
     if request.user.is_authenticated:
@@ -172,6 +199,7 @@ def review_create(request, beer_slug=None):
     return render(request, 'reviews/review_form.html', context)
 
 
+@replica_reads
 def review_detail(request, pk):
     """Detailed view of a single review"""
     review = get_object_or_404(Review, pk=pk, is_approved=True)
@@ -228,27 +256,76 @@ def toggle_like(request, review_id):
     })
 
 
-def category_detail(request, slug):
-    """List beers in a specific category"""
-    category = get_object_or_404(Category, slug=slug)
-    beers = Beer.objects.filter(category=category).select_related('brewery').annotate(
+LISTING_PAGE_SIZE = 12
+
+
+def _category_beers(category_id):
+    return Beer.objects.filter(category_id=category_id).select_related('brewery').annotate(
         avg_rating=Avg('reviews__rating', filter=Q(reviews__is_approved=True)),
         review_count=Count('reviews', filter=Q(reviews__is_approved=True))
     ).order_by('-avg_rating', '-review_count')
-    
-    # Pagination
-    paginator = Paginator(beers, 12)
+
+
+def _brewery_beers(brewery_id):
+    return Beer.objects.filter(brewery_id=brewery_id).select_related('category').annotate(
+        avg_rating=Avg('reviews__rating', filter=Q(reviews__is_approved=True)),
+        review_count=Count('reviews', filter=Q(reviews__is_approved=True))
+    ).order_by('-avg_rating', '-review_count')
+
+
+def get_first_page(name, queryset, key, models, force=False):
+    """Cached first page of a listing and its total count"""
+    def compute():
+        return list(queryset[:LISTING_PAGE_SIZE]), queryset.count()
+
+    return cached_call(name, compute, key, models=models, force=force)
+
+
+def get_category_first_page(category_id, force=False):
+    """Cached first page of beers in a category"""
+    return get_first_page(
+        'category_page', _category_beers(category_id), category_id,
+        models=(Beer, Review, Brewery), force=force
+    )
+
+
+def get_brewery_first_page(brewery_id, force=False):
+    """Cached first page of beers from a brewery"""
+    return get_first_page(
+        'brewery_page', _brewery_beers(brewery_id), brewery_id,
+        models=(Beer, Review, Category), force=force
+    )
+
+
+def _paginate_listing(request, queryset, first_page):
+    """Paginate a beer listing, serving page 1 from the cache"""
+    paginator = Paginator(queryset, LISTING_PAGE_SIZE)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if page_number in (None, '', '1'):
+        object_list, total = first_page()
+        paginator.count = total
+        return Page(object_list, 1, paginator), total
+    return paginator.get_page(page_number), paginator.count
+
+
+@replica_reads
+def category_detail(request, slug):
+    """List beers in a specific category"""
+    category = get_object_or_404(Category, slug=slug)
+    page_obj, total_beers = _paginate_listing(
+        request, _category_beers(category.pk),
+        lambda: get_category_first_page(category.pk)
+    )
     
     context = {
         'category': category,
         'page_obj': page_obj,
-        'total_beers': beers.count(),
+        'total_beers': total_beers,
     }
     return render(request, 'reviews/category_detail.html', context)
 
 
+@replica_reads
 def brewery_list(request):
     """List all breweries"""
     breweries = Brewery.objects.annotate(
@@ -269,27 +346,24 @@ def brewery_list(request):
     return render(request, 'reviews/brewery_list.html', context)
 
 
+@replica_reads
 def brewery_detail(request, slug):
     """List beers from a specific brewery"""
     brewery = get_object_or_404(Brewery, slug=slug)
-    beers = Beer.objects.filter(brewery=brewery).select_related('category').annotate(
-        avg_rating=Avg('reviews__rating', filter=Q(reviews__is_approved=True)),
-        review_count=Count('reviews', filter=Q(reviews__is_approved=True))
-    ).order_by('-avg_rating', '-review_count')
-
-    # Pagination
-    paginator = Paginator(beers, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj, total_beers = _paginate_listing(
+        request, _brewery_beers(brewery.pk),
+        lambda: get_brewery_first_page(brewery.pk)
+    )
 
     context = {
         'brewery': brewery,
         'page_obj': page_obj,
-        'total_beers': beers.count(),
+        'total_beers': total_beers,
     }
     return render(request, 'reviews/brewery_detail.html', context)
 
 
+@replica_reads
 def review_list(request):
     """List all approved reviews"""
     reviews = Review.objects.filter(is_approved=True).select_related(
@@ -331,3 +405,20 @@ def beer_create(request):
         'title': 'Add New Beer'
     }
     return render(request, 'reviews/beer_form.html', context)
+
+
+@replica_reads
+def sitemap_index(request):
+    """Serve the pre-rendered sitemap index"""
+    return HttpResponse(sitemaps.get_index(), content_type='application/xml')
+
+
+@replica_reads
+def sitemap_section(request, section, page):
+    """Serve one pre-rendered sitemap shard"""
+    if section not in sitemaps.SITEMAPS:
+        raise Http404('Unknown sitemap section')
+    content = sitemaps.get_shard(section, page)
+    if content is None:
+        raise Http404('Sitemap page out of range')
+    return HttpResponse(content, content_type='application/xml')
@@ -11,15 +11,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'greatbritishbeer.settings')
 django.setup()
 
 from reviews.models import Brewery, Beer, Category
-from reviews.scrapers.brewery_scrapers.darkstar import DarkStarScraper
-from reviews.scrapers.brewery_scrapers.harveys import HarveysScraper
-from reviews.scrapers.brewery_scrapers.brighton_bier import BrightonBierScraper
-from reviews.scrapers.brewery_scrapers.burning_sky import BurningSkyScraper
+from reviews.scrapers.brewery_scrapers.breweries import BREWERY_SPECS
+from reviews.scrapers.brewery_scrapers.spec import SpecScraper
 from reviews.scrapers.utils.normalizers import STYLE_TO_CATEGORY, DEFAULT_CATEGORY
 from slugify import slugify
 
 
-def add_beers_from_scraper(brewery_name, scraper_class):
+def add_beers_from_scraper(brewery_name, spec):
     """Add beers from a brewery scraper."""
     print(f'\n{"=" * 60}')
     print(f'Processing: {brewery_name}')
@@ -38,7 +36,7 @@ def add_beers_from_scraper(brewery_name, scraper_class):
 
     # Initialize scraper
     try:
-        scraper = scraper_class()
+        scraper = SpecScraper(spec)
         beers_data = scraper.fetch_beers()
         print(f'  Found {len(beers_data)} beers on website')
     except Exception as e:
@@ -95,16 +93,11 @@ def add_beers_from_scraper(brewery_name, scraper_class):
 def main():
     print('\nScraping beers from brewery websites...\n')
 
-    breweries = [
-        ('Dark Star Brewing Co', DarkStarScraper),
-        ('Harveys & Son', HarveysScraper),
-        ('Brighton Bier', BrightonBierScraper),
-        ('Burning Sky Brewery', BurningSkyScraper),
-    ]
+    breweries = [(spec.name, spec) for spec in BREWERY_SPECS]
 
     total_added = 0
-    for brewery_name, scraper_class in breweries:
-        added = add_beers_from_scraper(brewery_name, scraper_class)
+    for brewery_name, spec in breweries:
+        added = add_beers_from_scraper(brewery_name, spec)
         total_added += added
 
     print(f'\n{"=" * 60}')
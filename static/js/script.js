@@ -16,6 +16,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Form validation
     initializeFormValidation();
 
+    // Live latest reviews and like counts
+    initializeLiveFeed();
+
     // Handle like buttons (AJAX)
     const likeButtons = document.querySelectorAll('.like-btn');
     likeButtons.forEach(button => {
@@ -472,3 +475,38 @@ function clearValidation(field, feedback) {
     field.classList.remove('is-valid', 'is-invalid');
     feedback.style.display = 'none';
 }
+
+/**
+ * Keep the latest reviews and like counts current via server-sent events
+ */
+function initializeLiveFeed() {
+    const feed = document.querySelector('[data-live-stream]');
+    if (!feed || !window.EventSource) {
+        return;
+    }
+
+    const maxCards = feed.children.length || 3;
+    const source = new EventSource(feed.dataset.liveStream);
+
+    source.addEventListener('review.approved', function(e) {
+        const data = JSON.parse(e.data);
+        if (feed.querySelector(`[data-review-id="${data.review_id}"]`)) {
+            return;
+        }
+        const template = document.createElement('template');
+        template.innerHTML = data.html.trim();
+        feed.prepend(template.content.firstElementChild);
+        while (feed.children.length > maxCards) {
+            feed.lastElementChild.remove();
+        }
+    });
+
+    source.addEventListener('review.likes', function(e) {
+        const data = JSON.parse(e.data);
+        const selector = `[data-like-count-for="${data.review_id}"], ` +
+            `.like-btn[data-review-id="${data.review_id}"] .like-count`;
+        document.querySelectorAll(selector).forEach(function(element) {
+            element.textContent = data.like_count;
+        });
+    });
+}
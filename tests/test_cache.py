@@ -0,0 +1,189 @@
+"""
+Test cases for the two-level cache layer.
+"""
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from core import cache
+from core.cache import LRUCache
+from reviews.admin import ReviewAdmin
+from reviews.models import Beer, Brewery, Category, Review
+from reviews.views import get_beer_stats
+from users.models import User
+
+
+class LRUCacheTest(TestCase):
+    """Test cases for the in-process L1 cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted first."""
+        lru = LRUCache(max_entries=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIs(lru.get('b'), cache.MISSING)
+        self.assertEqual(len(lru), 2)
+
+    def test_entries_expire(self):
+        """Test entries are dropped once their TTL has passed."""
+        lru = LRUCache(default_ttl=10)
+        with mock.patch('core.cache.time.monotonic', return_value=100.0):
+            lru.set('a', 1)
+        with mock.patch('core.cache.time.monotonic', return_value=105.0):
+            self.assertEqual(lru.get('a'), 1)
+        with mock.patch('core.cache.time.monotonic', return_value=111.0):
+            self.assertIs(lru.get('a'), cache.MISSING)
+
+
+class TieredCacheTest(TestCase):
+    """Test cases for versioned keys, single-flight and counters."""
+
+    def setUp(self):
+        """Start every test with empty caches."""
+        cache.clear()
+
+    def test_l1_and_l2_hits_are_counted(self):
+        """Test a miss is followed by an L1 hit, then an L2 hit."""
+        cache.get_or_set('k', lambda: 'value')
+        cache.get_or_set('k', lambda: 'other')
+        cache.l1.clear()
+        self.assertEqual(cache.get_or_set('k', lambda: 'other'), 'value')
+        counts = cache.stats.snapshot()
+        self.assertEqual(counts['misses'], 1)
+        self.assertEqual(counts['l1_hits'], 1)
+        self.assertEqual(counts['l2_hits'], 1)
+
+    def test_caches_none(self):
+        """Test a computed None is cached rather than recomputed."""
+        compute = mock.Mock(return_value=None)
+        cache.get_or_set('none', compute)
+        cache.get_or_set('none', compute)
+        self.assertEqual(compute.call_count, 1)
+
+    def test_bump_version_changes_key(self):
+        """Test bumping a model version produces a fresh key."""
+        before = cache.make_key('beer_stats', 1, models=(Review,))
+        cache.bump_version(Review)
+        after = cache.make_key('beer_stats', 1, models=(Review,))
+        self.assertNotEqual(before, after)
+
+    def test_evicted_version_is_not_reused(self):
+        """Test a version lost from L2 restarts past every earlier version."""
+        cache.cache.set(cache._version_key(Review), 7, timeout=None)
+        before = cache.make_key('beer_stats', 1, models=(Review,))
+        cache.clear()
+        self.assertGreater(cache.get_version(Review), 7)
+        self.assertNotEqual(cache.make_key('beer_stats', 1, models=(Review,)), before)
+
+    def test_single_flight(self):
+        """Test concurrent misses on one key compute the value once."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_set('sf', compute)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+
+    def test_review_save_invalidates_beer_stats(self):
+        """Test saving a review refreshes the cached beer statistics."""
+        brewery = Brewery.objects.create(name='Brewery', slug='brewery', location='Kent')
+        category = Category.objects.create(name='Bitter', slug='bitter')
+        beer = Beer.objects.create(
+            name='Beer', slug='beer', brewery=brewery, category=category,
+            abv=Decimal('4.0'), style='Bitter'
+        )
+        user = User.objects.create_user(
+            username='drinker', email='drinker@example.com', password='x'
+        )
+        self.assertEqual(get_beer_stats(beer.pk)['total_reviews'], 0)
+
+        version = cache.get_version(Review)
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(
+                beer=beer, user=user, title='Good', content='Good', rating=4,
+                is_approved=True
+            )
+            # Readers keep the old version until the write is committed
+            self.assertEqual(cache.get_version(Review), version)
+        stats = get_beer_stats(beer.pk)
+        self.assertEqual(stats['total_reviews'], 1)
+        self.assertEqual(stats['rating_distribution'][4]['count'], 1)
+
+    def test_admin_action_invalidates_on_commit(self):
+        """Test a bulk admin action only bumps the version once it commits."""
+        brewery = Brewery.objects.create(name='Brewery', slug='brewery', location='Kent')
+        category = Category.objects.create(name='Bitter', slug='bitter')
+        beer = Beer.objects.create(
+            name='Beer', slug='beer', brewery=brewery, category=category,
+            abv=Decimal('4.0'), style='Bitter'
+        )
+        user = User.objects.create_user(
+            username='drinker', email='drinker@example.com', password='x'
+        )
+        Review.objects.create(beer=beer, user=user, title='Good', content='Good', rating=4)
+        admin = ReviewAdmin(Review, site)
+        request = RequestFactory().post('/admin/reviews/review/')
+
+        version = cache.get_version(Review)
+        with mock.patch.object(admin, 'message_user'):
+            with self.captureOnCommitCallbacks(execute=True):
+                admin.approve_reviews(request, Review.objects.all())
+                self.assertEqual(cache.get_version(Review), version)
+        self.assertGreater(cache.get_version(Review), version)
+
+
+class WarmCachesTest(TestCase):
+    """Test cases for the warm_caches command."""
+
+    COMMAND = 'core.management.commands.warm_caches'
+
+    def setUp(self):
+        """Create a brewery with two beers and one with a single beer."""
+        cache.clear()
+        category = Category.objects.create(name='Bitter', slug='bitter')
+        self.big = Brewery.objects.create(name='Big', slug='big', location='Kent')
+        self.small = Brewery.objects.create(name='Small', slug='small', location='Kent')
+        for i, brewery in enumerate((self.big, self.big, self.small)):
+            Beer.objects.create(
+                name=f'Beer {i}', slug=f'beer-{i}', brewery=brewery, category=category,
+                abv=Decimal('4.0'), style='Bitter'
+            )
+
+    def test_skipped_without_shared_cache(self):
+        """Test nothing is warmed into a per-process cache."""
+        out = StringIO()
+        with mock.patch(f'{self.COMMAND}.get_home_block') as get_home_block:
+            call_command('warm_caches', stdout=out)
+        get_home_block.assert_not_called()
+        self.assertIn('Skipping', out.getvalue())
+
+    def test_warms_only_top_listings(self):
+        """Test only the breweries with the most beers get their first page warmed."""
+        with mock.patch(f'{self.COMMAND}.LOCAL_CACHE_BACKENDS', ()), \
+                mock.patch(f'{self.COMMAND}.get_brewery_first_page') as get_page:
+            call_command(
+                'warm_caches', '--top-listings', '1', '--skip-sitemaps', '--workers', '1',
+                stdout=StringIO(),
+            )
+        get_page.assert_called_once_with(self.big.pk, force=False)
@@ -0,0 +1,102 @@
+"""
+Test cases for the read replica router.
+
+The test settings have no replica, so this module registers a second,
+separate SQLite database under the ``replica`` alias before the runner
+creates the test databases. Primary and replica hold different beers,
+which shows where each read went.
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core import cache
+from core.db_routers import REPLICA_ALIAS, ReplicaRouter, lag_monitor, use_replica
+from core.middleware import ReplicaPinningMiddleware
+from reviews.models import Beer, Brewery, Category
+from users.models import User
+
+
+# Replaces a configured replica too: its test database mirrors the primary
+settings.DATABASES[REPLICA_ALIAS] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+connections.configure_settings(settings.DATABASES)
+
+
+@override_settings(DATABASE_ROUTERS=['core.db_routers.ReplicaRouter'])
+class ReplicaRouterTest(TestCase):
+    """Test cases for replica reads, primary writes and session pinning."""
+
+    databases = {'default', REPLICA_ALIAS}
+
+    def setUp(self):
+        """Create a different beer on the primary and on the replica."""
+        lag_monitor.reset()
+        cache.clear()
+        for alias, name in (('default', 'Primary Pale'), (REPLICA_ALIAS, 'Replica Pale')):
+            brewery = Brewery.objects.using(alias).create(
+                name='Brewery', slug='brewery', location='Kent'
+            )
+            category = Category.objects.using(alias).create(name='Bitter', slug='bitter')
+            Beer.objects.using(alias).create(
+                name=name, slug='pale', brewery=brewery, category=category,
+                abv=Decimal('4.0'), style='Bitter'
+            )
+
+    def test_reads_default_to_primary(self):
+        """Test reads outside use_replica() hit the primary."""
+        self.assertEqual(Beer.objects.get().name, 'Primary Pale')
+
+    def test_use_replica_reads_from_replica(self):
+        """Test reads inside use_replica() hit the replica."""
+        with use_replica():
+            self.assertEqual(Beer.objects.get().name, 'Replica Pale')
+
+    def test_writes_go_to_primary(self):
+        """Test writes inside use_replica() still go to the primary."""
+        with use_replica():
+            self.assertEqual(ReplicaRouter().db_for_write(Category), 'default')
+            Category.objects.create(name='Stout', slug='stout')
+        self.assertTrue(Category.objects.using('default').filter(slug='stout').exists())
+        self.assertFalse(Category.objects.using(REPLICA_ALIAS).filter(slug='stout').exists())
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        """Test reads go to the primary when the replica lags too far."""
+        with mock.patch.object(lag_monitor, '_measure', return_value=60.0):
+            with use_replica():
+                self.assertEqual(Beer.objects.get().name, 'Primary Pale')
+
+    def test_public_view_reads_from_replica(self):
+        """Test an anonymous GET of a public list view uses the replica."""
+        response = self.client.get(reverse('reviews:beer_list'))
+        self.assertContains(response, 'Replica Pale')
+        self.assertNotContains(response, 'Primary Pale')
+
+    def test_session_pinned_to_primary_after_write(self):
+        """Test a session reads its own writes right after a POST."""
+        User.objects.create_user(
+            username='drinker', email='drinker@example.com', password='secret'
+        )
+        self.client.post(
+            reverse('users:login'),
+            {'email': 'drinker@example.com', 'password': 'secret'}
+        )
+        response = self.client.get(reverse('reviews:beer_list'))
+        self.assertContains(response, 'Primary Pale')
+        self.assertEqual(response.wsgi_request.user.username, 'drinker')
+
+    def test_anonymous_write_creates_no_session(self):
+        """Test pinning an anonymous client doesn't store a session."""
+        response = self.client.post(reverse('users:login'), {})
+        self.assertIn(ReplicaPinningMiddleware.COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pin_expires(self):
+        """Test reads return to the replica once the pin has expired."""
+        self.client.post(reverse('users:login'), {})
+        response = self.client.get(reverse('reviews:beer_list'))
+        self.assertContains(response, 'Replica Pale')
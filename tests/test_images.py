@@ -0,0 +1,303 @@
+"""
+Test cases for responsive image derivatives.
+"""
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+from core import images, thumbnails
+from reviews.models import Beer, Brewery, Category
+from users.models import User
+
+
+def make_jpeg(size=(800, 600), color='orange'):
+    output = BytesIO()
+    Image.new('RGB', size, color).save(output, format='JPEG')
+    return ContentFile(output.getvalue())
+
+
+class MediaTestCase(TestCase):
+    """Base class storing media in a throwaway directory."""
+
+    def setUp(self):
+        """Store media in a throwaway directory."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            IMAGE_DERIVATIVE_WIDTHS=[160, 320, 640, 1200],
+            IMAGE_DERIVATIVE_FORMATS=['webp'],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.brewery = Brewery.objects.create(name='Brewery', slug='brewery', location='Kent')
+        self.category = Category.objects.create(name='Bitter', slug='bitter')
+
+    def _beer(self, slug, image=None):
+        beer = Beer.objects.create(
+            name=slug, slug=slug, brewery=self.brewery, category=self.category,
+            abv=Decimal('4.0'), style='Bitter'
+        )
+        if image is not None:
+            beer.image.save(f'{slug}.jpg', image)
+        return beer
+
+
+class ImageDerivativesTest(MediaTestCase):
+    """Test cases for derivative generation and the template tag."""
+
+    def test_generates_widths_up_to_source(self):
+        """Test widths never exceed the source and the row is updated."""
+        beer = self._beer('pale', make_jpeg())
+        self.assertTrue(images.needs_derivatives(beer))
+        self.assertTrue(images.generate_for_instance(beer))
+
+        beer.refresh_from_db()
+        self.assertEqual((beer.image_width, beer.image_height), (800, 600))
+        self.assertEqual(beer.image_variants['formats'], {'webp': [160, 320, 640, 800]})
+        self.assertFalse(images.needs_derivatives(beer))
+        name = images.derivative_name(beer.image_hash, 320, 'webp')
+        with default_storage.open(name) as f:
+            self.assertEqual(Image.open(f).size, (320, 240))
+
+    def test_identical_images_share_derivatives(self):
+        """Test derivatives are keyed by content, not by file name."""
+        first = self._beer('first', make_jpeg())
+        second = self._beer('second', make_jpeg())
+        images.generate_for_instance(first)
+        images.generate_for_instance(second)
+        self.assertEqual(first.image_hash, second.image_hash)
+        _, files = default_storage.listdir(f'derivatives/{first.image_hash[:2]}/{first.image_hash}')
+        self.assertEqual(len(files), 4)
+
+    def test_template_tag(self):
+        """Test the tag renders srcset, sizes and intrinsic dimensions."""
+        beer = self._beer('stout', make_jpeg())
+        images.generate_for_instance(beer)
+        html = Template(
+            '{% load images %}{% responsive_image beer sizes="50vw" class="card-img-top" alt=beer.name %}'
+        ).render(Context({'beer': beer}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(f'{images.derivative_url(beer.image_hash, 160, "webp")} 160w', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('width="800" height="600"', html)
+        self.assertIn('alt="stout"', html)
+        self.assertIn('loading="lazy"', html)
+
+    def test_placeholder(self):
+        """Test a tiny placeholder is stored and painted behind the image."""
+        beer = self._beer('porter', make_jpeg())
+        images.generate_for_instance(beer)
+        beer.refresh_from_db()
+        self.assertTrue(beer.image_placeholder.startswith('data:image/webp;base64,'))
+        self.assertLess(len(beer.image_placeholder), 1000)
+
+        html = Template(
+            '{% load images %}{% responsive_image beer eager=True style="object-fit: cover;" %}'
+        ).render(Context({'beer': beer}))
+        self.assertIn(f'style="background:url({beer.image_placeholder}) center/cover no-repeat;object-fit: cover;"', html)
+        self.assertIn('fetchpriority="high"', html)
+        self.assertNotIn('loading=', html)
+
+    def test_template_tag_without_derivatives(self):
+        """Test an image without derivatives falls back to a plain img."""
+        beer = self._beer('mild', make_jpeg())
+        html = Template('{% load images %}{% responsive_image beer %}').render(
+            Context({'beer': beer})
+        )
+        self.assertTrue(html.startswith('<img src="/media/beers/'))
+        self.assertNotIn('<picture', html)
+
+    def test_template_tag_skips_stale_derivatives(self):
+        """Test a replaced image isn't served its predecessor's derivatives."""
+        beer = self._beer('bitter', make_jpeg())
+        images.generate_for_instance(beer)
+        beer.image.save('bitter-new.jpg', make_jpeg(size=(400, 400)), save=False)
+        html = Template('{% load images %}{% responsive_image beer %}').render(
+            Context({'beer': beer})
+        )
+        self.assertTrue(html.startswith(f'<img src="{beer.image.url}"'))
+        self.assertNotIn('<source', html)
+        self.assertNotIn('width=', html)
+        self.assertNotIn('background:', html)
+
+    def test_srcset_ignores_stale_derivatives(self):
+        """Test srcset is empty until a replaced image has derivatives of its own."""
+        beer = self._beer('amber', make_jpeg())
+        images.generate_for_instance(beer)
+        self.assertIn('160w', images.srcset(beer, 'webp'))
+
+        beer.image.save('amber-new.jpg', make_jpeg(size=(400, 400)))
+        self.assertEqual(images.srcset(beer, 'webp'), '')
+        images.generate_for_instance(beer)
+        self.assertIn(images.derivative_url(beer.image_hash, 400, 'webp'), images.srcset(beer, 'webp'))
+
+    def test_stale_run_does_not_overwrite_newer_image(self):
+        """Test derivatives aren't recorded once the row points at another image."""
+        beer = self._beer('golden', make_jpeg())
+        stale = Beer.objects.get(pk=beer.pk)
+        beer.image.save('golden-new.jpg', make_jpeg(size=(400, 400)))
+
+        self.assertFalse(images.generate_for_instance(stale))
+        beer.refresh_from_db()
+        self.assertEqual(beer.image_variants, {})
+        self.assertEqual(beer.image_hash, '')
+
+
+@override_settings(JOBS_RUN_EAGERLY=True)
+class BackgroundImageProcessingTest(MediaTestCase):
+    """Test cases for processing images after save, off the request path."""
+
+    def test_large_upload_is_shrunk_then_processed(self):
+        """Test an oversized upload is replaced by a smaller copy with derivatives."""
+        with self.captureOnCommitCallbacks(execute=True):
+            beer = self._beer('big', make_jpeg(size=(2400, 1800)))
+        original = beer.image.name
+
+        beer.refresh_from_db()
+        self.assertNotEqual(beer.image.name, original)
+        self.assertFalse(default_storage.exists(original))
+        self.assertEqual((beer.image_width, beer.image_height), (1200, 900))
+        self.assertEqual(beer.image_variants['source'], beer.image.name)
+
+    def test_unrelated_save_does_not_reprocess(self):
+        """Test saves that don't touch the image schedule no work."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self._beer('pale', make_jpeg())
+        beer = Beer.objects.get(slug='pale')
+        with mock.patch('reviews.signals.jobs.enqueue') as enqueue:
+            beer.is_featured = True
+            beer.save()
+        enqueue.assert_not_called()
+
+    def test_avatar_is_shrunk(self):
+        """Test a large avatar is downscaled in the background."""
+        user = User.objects.create_user(
+            username='drinker', email='drinker@example.com', password='x'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            user.avatar.save('me.jpg', make_jpeg(size=(900, 900)))
+        user.refresh_from_db()
+        with user.avatar.open('rb') as f:
+            self.assertEqual(Image.open(f).size, (300, 300))
+        with mock.patch('users.signals.jobs.enqueue') as enqueue:
+            user.save(update_fields=['last_login'])
+        enqueue.assert_not_called()
+
+
+class ProcessImagesCommandTest(MediaTestCase):
+    """Test cases for the parallel, incremental batch processor."""
+
+    def setUp(self):
+        super().setUp()
+        manifest = Path(tempfile.mkdtemp()) / 'manifest.json'
+        self.addCleanup(shutil.rmtree, manifest.parent, ignore_errors=True)
+        settings_override = override_settings(IMAGE_MANIFEST_PATH=manifest)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('process_images', '--workers', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_resizes_then_skips_processed_files(self):
+        """Test oversized images are replaced once and skipped on the next run."""
+        beer = self._beer('big', make_jpeg(size=(2400, 1800)))
+        original = beer.image.name
+        self.assertIn('Processed 1 images', self._run())
+
+        beer.refresh_from_db()
+        self.assertNotEqual(beer.image.name, original)
+        with beer.image.open('rb') as f:
+            self.assertEqual(Image.open(f).size, (1200, 900))
+        self.assertIn('0 of 1 images need', self._run())
+
+    def test_pad_is_not_repeated(self):
+        """Test padding is recorded in the manifest and not applied twice."""
+        beer = self._beer('pale', make_jpeg(size=(100, 100)))
+        self._run('--transform', 'pad', '--pad', '10')
+        beer.refresh_from_db()
+        with beer.image.open('rb') as f:
+            self.assertEqual(Image.open(f).size, (120, 120))
+
+        self.assertIn('0 of 1 images need', self._run('--transform', 'pad', '--pad', '10'))
+
+
+class ThumbnailTest(MediaTestCase):
+    """Test cases for cached on-the-fly thumbnails."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        settings_override = override_settings(
+            THUMBNAIL_CACHE_DIR=self.cache_dir,
+            THUMBNAIL_SIZES=['100x100', '160x160'],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.beer = self._beer('ipa', make_jpeg())
+
+    def _url(self, size, name):
+        return f'/media/thumb/{size}/{name}'
+
+    def test_generates_cropped_thumbnail(self):
+        """Test the first request renders and caches a thumbnail of the preset size."""
+        response = self.client.get(self._url('100x100', self.beer.image.name))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        body = BytesIO(b''.join(response.streaming_content))
+        self.assertEqual(Image.open(body).size, (100, 100))
+        self.assertEqual(len(list(self.cache_dir.rglob('*.*'))), 1)
+
+    def test_cache_hit_skips_render(self):
+        """Test later requests are served from the disk cache."""
+        url = self._url('160x160', self.beer.image.name)
+        self.client.get(url)
+        with mock.patch('core.thumbnails.render') as render:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        render.assert_not_called()
+
+    def test_rejects_unknown_sizes_and_paths(self):
+        """Test sizes outside the presets and paths outside media dirs are 404s."""
+        name = self.beer.image.name
+        for url in [
+            self._url('101x101', name),
+            self._url('100x100', 'derivatives/x.webp'),
+            self._url('100x100', f'beers/../../{name}'),
+            self._url('100x100', 'beers/missing.jpg'),
+        ]:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_evict_removes_least_recently_used(self):
+        """Test eviction deletes the oldest thumbnails until under the cap."""
+        paths = []
+        for age, name in enumerate(['new', 'mid', 'old']):
+            path = self.cache_dir / 'ab' / 'cd' / f'{name}.webp'
+            thumbnails.write_atomic(path, b'x' * 100)
+            os.utime(path, (1000 - age, 1000 - age))
+            paths.append(path)
+
+        result = thumbnails.evict(max_bytes=250)
+        self.assertEqual(result, {'removed': 1, 'freed': 100})
+        self.assertEqual([p.exists() for p in paths], [True, True, False])
+
+    def test_filter_builds_url(self):
+        """Test the thumbnail filter returns the view URL for a preset."""
+        html = Template("{% load images %}{{ beer.image|thumbnail:'100x100' }}").render(
+            Context({'beer': self.beer})
+        )
+        self.assertEqual(html, self._url('100x100', self.beer.image.name))
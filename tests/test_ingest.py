@@ -0,0 +1,305 @@
+"""
+Test cases for bulk ingestion of scraped beers.
+"""
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from django.contrib.auth import get_user_model
+
+from reviews.ingest import BeerIngestor, clear_catalogue, import_breweries, unique_slug
+from reviews.models import Beer, Brewery, Category, Review, ReviewLike, ScrapedPage
+from reviews.scrapers.brewery_scrapers.breweries import BREWERY_SPECS
+from reviews.scrapers.engine import ScrapeEngine, ScrapeResult
+from reviews.scrapers.utils.checkpoint import Checkpoint
+from reviews.scrapers.utils import http_cache
+from reviews.scrapers.utils.fingerprints import content_hash
+
+
+# Scrapers in these tests keep their HTTP cache in memory
+_memory_http_cache = override_settings(HTTP_CACHE_PATH=None)
+
+
+def setUpModule():
+    _memory_http_cache.enable()
+    http_cache.reset_backend()
+
+
+def tearDownModule():
+    _memory_http_cache.disable()
+    http_cache.reset_backend()
+
+
+class BeerIngestorTest(TestCase):
+    """Test cases for BeerIngestor."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.brewery = Brewery.objects.create(name='Dark Star', slug='dark-star', location='Sussex')
+        self.other = Brewery.objects.create(name='Harveys', slug='harveys', location='Lewes')
+        self.stout = Category.objects.create(name='Stout', slug='stout')
+        Beer.objects.create(
+            name='Hophead', slug='hophead', brewery=self.brewery, category=self.stout,
+            abv=Decimal('3.8'), description='Pale and hoppy',
+        )
+
+    def test_bulk_import_uses_few_queries(self):
+        """Test hundreds of beers are created with a fixed number of queries."""
+        beers = [{'name': f'Beer {i}', 'abv': 4.0, 'category': 'Stout'} for i in range(300)]
+        ingestor = BeerIngestor(batch_size=40)
+        # Preload beers and categories, then 8 inserts in a savepoint
+        with self.assertNumQueries(12):
+            result = ingestor.ingest(self.brewery, beers)
+        self.assertEqual(len(result.created), 300)
+        self.assertEqual(Beer.objects.filter(brewery=self.brewery).count(), 301)
+
+    def test_existing_beers_are_skipped_or_updated(self):
+        """Test matching ignores case and spacing, and updates only on request."""
+        ingestor = BeerIngestor()
+        beers = [{'name': ' HOPHEAD', 'abv': '4.0', 'description': 'Pale and hoppy'}]
+
+        result = ingestor.ingest(self.brewery, beers)
+        self.assertEqual((result.created, result.skipped), ([], ['HOPHEAD']))
+
+        result = ingestor.ingest(self.brewery, beers, update=True)
+        self.assertEqual(result.updated, ['Hophead'])
+        self.assertEqual(Beer.objects.get(slug='hophead').abv, Decimal('4.00'))
+
+    def test_slugs_and_categories_are_allocated_in_bulk(self):
+        """Test slug collisions across breweries and new categories."""
+        ingestor = BeerIngestor()
+        result = ingestor.ingest(self.other, [
+            {'name': 'Hophead', 'abv': 4.1, 'style': 'Best Bitter'},
+            {'name': 'hophead', 'abv': 4.1},
+        ])
+
+        self.assertEqual(result.created, ['Hophead'])
+        beer = Beer.objects.get(brewery=self.other)
+        self.assertEqual(beer.slug, 'hophead-harveys')
+        self.assertEqual(beer.category.name, 'Bitter')
+
+    def test_missing_abv(self):
+        """Test beers without an ABV fail unless there is a default."""
+        beers = [{'name': 'Mystery'}]
+        result = BeerIngestor().ingest(self.brewery, beers)
+        self.assertEqual([name for name, _ in result.failed], ['Mystery'])
+
+        result = BeerIngestor(default_abv=5.0).ingest(self.brewery, beers)
+        self.assertEqual(result.created, ['Mystery'])
+        self.assertEqual(Beer.objects.get(name='Mystery').abv, Decimal('5.00'))
+
+    def test_dry_run_writes_nothing(self):
+        """Test a dry run reports what would be created."""
+        result = BeerIngestor().ingest(self.brewery, [{'name': 'Espresso', 'abv': 4.2}], dry_run=True)
+        self.assertEqual(result.created, ['Espresso'])
+        self.assertFalse(Beer.objects.filter(name='Espresso').exists())
+
+    def test_unique_slug(self):
+        """Test numbered fallbacks once every candidate is taken."""
+        taken = {'pale', 'pale-harveys'}
+        self.assertEqual(unique_slug(['Pale', 'Pale Harveys'], taken), 'pale-2')
+        self.assertIn('pale-2', taken)
+
+
+class BreweryImportTest(TestCase):
+    """Test cases for bulk brewery import and clearing."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.harveys = Brewery.objects.create(
+            name='Harveys', slug='harveys', location='Lewes', website='https://old.example'
+        )
+
+    def test_import_skips_existing_and_resolves_slugs(self):
+        """Test new breweries get free slugs and existing ones are left alone."""
+        records = [
+            {'name': 'Harveys', 'location': 'Lewes', 'website': 'https://harveys.example'},
+            {'name': 'Harvey\'s', 'location': 'Bristol'},
+            {'name': 'Harvey`s', 'location': 'Bristol'},
+            {'name': 'No Location'},
+        ]
+        with self.assertNumQueries(5):
+            result = import_breweries(records)
+
+        self.assertEqual(result.created, ["Harvey's", 'Harvey`s'])
+        self.assertEqual(result.skipped, ['Harveys'])
+        self.assertEqual([name for name, _ in result.failed], ['No Location'])
+        self.assertEqual(
+            sorted(Brewery.objects.values_list('slug', flat=True)),
+            ['harvey-s', 'harvey-s-bristol', 'harveys']
+        )
+        self.harveys.refresh_from_db()
+        self.assertEqual(self.harveys.website, 'https://old.example')
+
+    def test_import_updates_existing(self):
+        """Test update_conflicts refreshes existing breweries in place."""
+        result = import_breweries(
+            [{'name': 'Harveys', 'location': 'Lewes, Sussex', 'website': 'https://harveys.example'}],
+            update=True,
+        )
+        self.assertEqual(result.updated, ['Harveys'])
+        self.harveys.refresh_from_db()
+        self.assertEqual(self.harveys.location, 'Lewes, Sussex')
+        self.assertEqual(self.harveys.website, 'https://harveys.example')
+        self.assertEqual(Brewery.objects.count(), 1)
+
+    def test_clear_catalogue(self):
+        """Test clearing deletes dependants first without the cascade collector."""
+        category = Category.objects.create(name='Bitter', slug='bitter')
+        beer = Beer.objects.create(
+            name='Best', slug='best', brewery=self.harveys, category=category, abv=Decimal('4.0')
+        )
+        beer.tags.add('classic')
+        user = get_user_model().objects.create_user(username='taster', password='pw')
+        review = Review.objects.create(
+            beer=beer, user=user, title='Lovely', content='Malty', rating=5
+        )
+        ReviewLike.objects.create(review=review, user=user)
+        ScrapedPage.objects.create(url='https://harveys.example/beers', content_hash='0' * 64)
+
+        counts = clear_catalogue()
+
+        self.assertEqual(counts['reviews.Beer'], 1)
+        self.assertEqual(counts['taggit.TaggedItem'], 1)
+        for model in (ReviewLike, Review, Beer, Brewery, Category, ScrapedPage):
+            self.assertFalse(model.objects.exists(), model)
+        self.assertTrue(get_user_model().objects.filter(pk=user.pk).exists())
+
+
+class FakeRateBeerScraper:
+    """Stands in for RateBeerScraper; fails for breweries named in ``failing``."""
+
+    failing = set()
+
+    def __init__(self):
+        self.last_error = None
+
+    def fetch_beers(self, brewery_name=None, limit=None):
+        self.last_error = ConnectionError('timed out') if brewery_name in self.failing else None
+        if self.last_error:
+            return []
+        return [{'name': f'{brewery_name} Bitter', 'abv': 4.0}]
+
+    def close(self):
+        pass
+
+
+@mock.patch('reviews.management.commands.scrape_ratebeer_beers.RATEBEER_AVAILABLE', True)
+@mock.patch('reviews.management.commands.scrape_ratebeer_beers.RateBeerScraper', FakeRateBeerScraper)
+class ScrapeRateBeerCommandTest(TransactionTestCase):
+    """Test cases for concurrent, resumable RateBeer runs."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.checkpoint = Path(self.directory) / 'checkpoint.json'
+        for i in range(6):
+            Brewery.objects.create(name=f'Brewery {i}', slug=f'brewery-{i}', location='Kent')
+        self.addCleanup(setattr, FakeRateBeerScraper, 'failing', set())
+
+    def _run(self):
+        call_command(
+            'scrape_ratebeer_beers', '--all', '--workers', '3',
+            '--checkpoint', str(self.checkpoint), stdout=StringIO(),
+        )
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        """Test failed breweries are retried next run and finished runs clear the file."""
+        FakeRateBeerScraper.failing = {'Brewery 2'}
+        self._run()
+        self.assertEqual(Beer.objects.count(), 5)
+        done = set(json.loads(self.checkpoint.read_text())['done'])
+        self.assertEqual(len(done), 5)
+        self.assertNotIn(Brewery.objects.get(name='Brewery 2').pk, done)
+
+        FakeRateBeerScraper.failing = set()
+        with mock.patch.object(FakeRateBeerScraper, 'fetch_beers', autospec=True,
+                               side_effect=FakeRateBeerScraper.fetch_beers) as fetch:
+            self._run()
+        self.assertEqual([call.kwargs['brewery_name'] for call in fetch.call_args_list], ['Brewery 2'])
+        self.assertEqual(Beer.objects.count(), 6)
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_checkpoint_round_trip(self):
+        """Test checkpoints persist ids and clear removes the file."""
+        checkpoint = Checkpoint(self.checkpoint)
+        checkpoint.add_many([3, 1])
+        self.assertIn(1, Checkpoint(self.checkpoint))
+        self.assertEqual(len(Checkpoint(self.checkpoint)), 2)
+        checkpoint.clear()
+        self.assertFalse(self.checkpoint.exists())
+        self.assertEqual(len(Checkpoint(self.checkpoint)), 0)
+
+
+class DailyScrapeTest(TestCase):
+    """Test cases for reconciling scraped pages in daily_beer_scrape."""
+
+    PAGE = b'<h3>Hophead</h3><h3>Espresso</h3>'
+    BEERS = [{'name': 'Hophead', 'abv': 3.8}, {'name': 'Espresso', 'abv': 4.2}]
+
+    def _scrape(self, skipped):
+        def scrape(engine, scrapers, limit=None):
+            results = []
+            for scraper in scrapers:
+                page = {scraper.beers_url: content_hash(self.PAGE)}
+                if engine.fingerprints.get(scraper.beers_url) == page[scraper.beers_url]:
+                    skipped.append(scraper.brewery_name)
+                    results.append(ScrapeResult(scraper, [], None, 0.1, pages=page, unchanged=True))
+                else:
+                    results.append(ScrapeResult(scraper, list(self.BEERS), None, 0.1, pages=page))
+            return results
+        return scrape
+
+    def test_only_changed_beers_are_updated(self):
+        """Test the first run leaves catalogue beers alone and later runs apply changes."""
+        brewery = Brewery.objects.create(
+            name=BREWERY_SPECS[0].name, slug='brewery', location='Sussex'
+        )
+        category = Category.objects.create(name='Stout', slug='stout')
+        Beer.objects.create(
+            name='Hophead', slug='hophead', brewery=brewery, category=category,
+            abv=Decimal('4.0'), description='Curated',
+        )
+
+        with mock.patch.object(ScrapeEngine, 'scrape', self._scrape([])):
+            call_command('daily_beer_scrape', skip_warm=True, stdout=StringIO())
+            hophead = Beer.objects.get(brewery=brewery, name='Hophead')
+            self.assertEqual((hophead.abv, hophead.description), (Decimal('4.00'), 'Curated'))
+
+            self.PAGE = b'<h3>Hophead</h3><p>3.9%</p><h3>Espresso</h3>'
+            self.BEERS = [{'name': 'Hophead', 'abv': 3.9}, {'name': 'Espresso', 'abv': 4.2}]
+            call_command('daily_beer_scrape', skip_warm=True, stdout=StringIO())
+
+        hophead.refresh_from_db()
+        self.assertEqual((hophead.abv, hophead.description), (Decimal('3.90'), 'Curated'))
+
+    def test_failed_beers_are_retried_on_unchanged_pages(self):
+        """Test a page with failed beers isn't skipped as unchanged next run."""
+        real_ingest = BeerIngestor.ingest
+
+        def failing_ingest(ingestor, brewery, beers, **kwargs):
+            result = real_ingest(ingestor, brewery, [b for b in beers if b['name'] != 'Espresso'], **kwargs)
+            return result._replace(failed=[('Espresso', 'database error')])
+
+        skipped = []
+        with mock.patch.object(ScrapeEngine, 'scrape', self._scrape(skipped)):
+            with mock.patch.object(BeerIngestor, 'ingest', failing_ingest):
+                call_command('daily_beer_scrape', skip_warm=True, stdout=StringIO())
+            self.assertEqual(set(ScrapedPage.objects.values_list('content_hash', flat=True)), {''})
+
+            call_command('daily_beer_scrape', skip_warm=True, stdout=StringIO())
+
+        self.assertEqual(skipped, [])
+        # Retried and added for every brewery
+        self.assertEqual(Beer.objects.filter(name='Espresso').count(), len(BREWERY_SPECS))
+        self.assertEqual(
+            set(ScrapedPage.objects.values_list('content_hash', flat=True)), {content_hash(self.PAGE)}
+        )
@@ -0,0 +1,254 @@
+"""
+Test cases for the database job queue.
+"""
+import logging
+import time
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from core import jobs, tasks
+from core.models import Job, JobLogEntry
+
+
+calls = []
+test_logger = logging.getLogger('gbb.tests')
+test_logger.setLevel(logging.INFO)
+
+
+@jobs.task
+def record(value):
+    calls.append(value)
+    return value * 2
+
+
+@jobs.task(max_attempts=2)
+def explode():
+    raise ValueError('boom')
+
+
+@jobs.task
+def chatty():
+    jobs.report_progress(1, 2, 'halfway')
+    test_logger.info('first step done')
+    return 'ok'
+
+
+@jobs.task(max_attempts=1)
+def outlive_lease():
+    time.sleep(0.5)
+    return jobs.requeue_stale()
+
+
+@override_settings(JOBS_RUN_EAGERLY=False)
+class JobQueueTest(TestCase):
+    """Test cases for enqueueing, claiming and running jobs."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_requires_registered_task(self):
+        """Test only @task functions can be enqueued."""
+        with self.assertRaises(LookupError):
+            jobs.enqueue(print, 'hello')
+        with self.assertRaises(LookupError):
+            jobs.enqueue('os.system', 'true')
+
+    def test_claims_by_priority_then_age(self):
+        """Test higher priority jobs are claimed first, and each only once."""
+        low = jobs.enqueue(record, 1)
+        high = jobs.enqueue(record, 2, priority=5)
+        later = jobs.enqueue(record, 3, delay=60)
+
+        self.assertEqual(jobs.claim('a').pk, high.pk)
+        self.assertEqual(jobs.claim('b').pk, low.pk)
+        self.assertIsNone(jobs.claim('c'))
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.QUEUED)
+
+    def test_execute_records_result(self):
+        """Test a successful job stores its return value."""
+        jobs.enqueue(record, 21)
+        job = jobs.claim('worker')
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(jobs.execute(job), Job.SUCCEEDED)
+
+        job.refresh_from_db()
+        self.assertEqual(job.result, 42)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(calls, [21])
+
+    def test_failure_retries_with_backoff_then_fails(self):
+        """Test failed jobs are rescheduled until attempts run out."""
+        queued = jobs.enqueue(explode)
+        with self.assertLogs('gbb.jobs', 'WARNING'):
+            self.assertEqual(jobs.execute(jobs.claim('worker')), Job.QUEUED)
+        queued.refresh_from_db()
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn('ValueError: boom', queued.last_error)
+
+        Job.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        with self.assertLogs('gbb.jobs', 'ERROR'):
+            self.assertEqual(jobs.execute(jobs.claim('worker')), Job.FAILED)
+        queued.refresh_from_db()
+        self.assertEqual(queued.attempts, 2)
+
+    def test_stale_running_jobs_are_requeued(self):
+        """Test jobs orphaned by a dead worker go back on the queue."""
+        queued = jobs.enqueue(record, 1)
+        jobs.claim('dead-worker')
+        self.assertEqual(jobs.requeue_stale(), 0)
+        Job.objects.filter(pk=queued.pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        with self.assertLogs('gbb.jobs', 'WARNING'):
+            self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertEqual(jobs.claim('worker').pk, queued.pk)
+
+    def test_long_running_job_with_live_lease_is_left_alone(self):
+        """Test only the lease matters, not how long ago the job started."""
+        queued = jobs.enqueue(record, 1)
+        jobs.claim('busy-worker')
+        Job.objects.filter(pk=queued.pk).update(started_at=timezone.now() - timedelta(hours=6))
+        self.assertEqual(jobs.requeue_stale(), 0)
+        self.assertEqual(Job.objects.get(pk=queued.pk).status, Job.RUNNING)
+
+    def test_unique_key_deduplicates_active_jobs(self):
+        """Test a key shares one job while it is active, then allows a new one."""
+        first = jobs.enqueue(record, 1, unique_key='nightly')
+        self.assertEqual(jobs.enqueue(record, 2, unique_key='nightly').pk, first.pk)
+        jobs.execute(jobs.claim('worker'))
+        self.assertNotEqual(jobs.enqueue(record, 3, unique_key='nightly').pk, first.pk)
+
+    def test_progress_and_log_are_recorded(self):
+        """Test progress and log records from the job's thread are stored."""
+        job = jobs.enqueue(chatty)
+        test_logger.info('not part of any job')
+        jobs.execute(jobs.claim('worker'))
+
+        job.refresh_from_db()
+        self.assertEqual(job.progress, {'done': 1, 'total': 2, 'message': 'halfway'})
+        self.assertEqual(
+            list(job.log_entries.values_list('logger', 'message')),
+            [('gbb.tests', 'first step done')]
+        )
+
+
+
+@override_settings(JOBS_RUN_EAGERLY=False)
+class WorkerTest(TransactionTestCase):
+    """Test cases for worker threads, which need committed rows."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_burst_worker_drains_queue(self):
+        """Test a burst worker runs every due job on its threads and exits."""
+        for i in range(5):
+            jobs.enqueue(record, i)
+        worker = jobs.Worker(threads=2, burst=True)
+        worker.run()
+        self.assertEqual(worker.processed, 5)
+        self.assertEqual(sorted(calls), [0, 1, 2, 3, 4])
+        self.assertFalse(Job.objects.exclude(status=Job.SUCCEEDED).exists())
+
+    @override_settings(JOB_LEASE_SECONDS=0.2)
+    def test_heartbeat_keeps_lease_past_its_length(self):
+        """Test a job running longer than its lease isn't requeued under it."""
+        job = jobs.enqueue(outlive_lease)
+        self.assertEqual(jobs.execute(jobs.claim('worker')), Job.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual(job.result, 0)
+
+
+@override_settings(JOBS_RUN_EAGERLY=True)
+class EagerJobsTest(TestCase):
+    """Test cases for running jobs inline on commit."""
+
+    def test_runs_on_commit(self):
+        """Test eager jobs run once the transaction commits."""
+        calls.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            job = jobs.enqueue(record, 7)
+            self.assertEqual(calls, [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(calls, [7])
+
+
+@override_settings(JOBS_RUN_EAGERLY=False)
+class JobViewsTest(TestCase):
+    """Test cases for admin trigger views queueing work."""
+
+    def test_scrape_view_enqueues_once(self):
+        """Test the scrape endpoint queues one job and returns its id."""
+        url = reverse('core:scrape_beers_daily')
+        with mock.patch('core.tasks.call_command') as call_command:
+            first = self.client.get(url, {'secret': 'scrape2026'})
+            second = self.client.get(url, {'secret': 'scrape2026'})
+        self.assertEqual(first.status_code, 202)
+        call_command.assert_not_called()
+        job = Job.objects.get()
+        self.assertEqual((job.task, job.args), (tasks.run_command.job_name, ['daily_beer_scrape']))
+        self.assertEqual(first.json()['id'], job.pk)
+        self.assertEqual(second.json()['id'], job.pk)
+        self.assertEqual(
+            first.json()['status_url'],
+            reverse('core:scrape_status', args=[job.pk]) + '?secret=scrape2026'
+        )
+
+    def test_long_scrape_still_blocks_new_triggers(self):
+        """Test a scrape running for hours keeps its key while its lease is live."""
+        url = reverse('core:scrape_beers_daily')
+        first = self.client.get(url, {'secret': 'scrape2026'}).json()
+        jobs.claim('scrape-worker')
+        Job.objects.filter(pk=first['id']).update(started_at=timezone.now() - timedelta(hours=5))
+
+        self.assertEqual(jobs.requeue_stale(), 0)
+        second = self.client.get(url, {'secret': 'scrape2026'}).json()
+        self.assertEqual(second['id'], first['id'])
+        self.assertEqual(Job.objects.count(), 1)
+
+    def _finished_scrape(self):
+        job = Job.objects.create(
+            task=tasks.run_command.job_name, args=['daily_beer_scrape'],
+            unique_key='daily_beer_scrape', status=Job.SUCCEEDED,
+            progress={'done': 4, 'total': 4, 'message': 'Scraping finished'},
+        )
+        for message in ('Found 12 beers', 'Added beer: Hophead'):
+            JobLogEntry.objects.create(job=job, level='INFO', logger='daily_scraper', message=message)
+        return job
+
+    def test_scrape_status_snapshot(self):
+        """Test the status endpoint returns progress and the log after an id."""
+        job = self._finished_scrape()
+        first_entry = job.log_entries.first()
+        url = reverse('core:scrape_status', args=[job.pk])
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        data = self.client.get(url, {'secret': 'scrape2026', 'after': first_entry.pk}).json()
+        self.assertEqual(data['status'], Job.SUCCEEDED)
+        self.assertEqual(data['progress']['done'], 4)
+        self.assertEqual([entry['message'] for entry in data['log']], ['Added beer: Hophead'])
+
+    async def test_scrape_status_stream(self):
+        """Test the event stream replays the log and ends once the job is done."""
+        job = await sync_to_async(self._finished_scrape)()
+        response = await self.async_client.get(
+            reverse('core:scrape_status', args=[job.pk]), {'secret': 'scrape2026'},
+            headers={'Accept': 'text/event-stream'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertEqual(body.count('event: log'), 2)
+        self.assertIn('Added beer: Hophead', body)
+        self.assertTrue(body.rstrip().split('\n\n')[-1].startswith('event: done'))
+
+    def test_populate_view_requires_secret(self):
+        """Test the populate endpoint still checks its secret."""
+        response = self.client.get(reverse('core:populate_database'))
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,159 @@
+"""
+Test cases for the broadcaster and the live reviews stream.
+"""
+import asyncio
+import json
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core import broadcast
+from core.broadcast import Broadcaster
+from reviews import live
+from reviews.models import Beer, Brewery, Category, Review, ReviewLike
+from users.models import User
+
+
+class BroadcasterTest(TestCase):
+    """Test cases for the in-memory broadcaster."""
+
+    async def test_publish_from_another_thread(self):
+        """Test events published from a sync thread reach async subscribers."""
+        bus = Broadcaster()
+        async with bus.subscribe() as subscription:
+            thread = threading.Thread(target=bus.publish, args=('ping', {'n': 1}))
+            thread.start()
+            event = await subscription.get(timeout=2)
+            thread.join()
+        self.assertEqual((event.type, event.data), ('ping', {'n': 1}))
+        self.assertEqual(len(bus), 0)
+
+    async def test_slow_subscriber_drops_events(self):
+        """Test a full queue drops events instead of growing."""
+        bus = Broadcaster(max_queued=2)
+        async with bus.subscribe() as subscription:
+            for n in range(5):
+                bus.publish('ping', {'n': n})
+            await asyncio.sleep(0)
+            self.assertEqual(subscription.queue.qsize(), 2)
+            self.assertEqual(subscription.dropped, 3)
+
+    async def test_get_times_out(self):
+        """Test get returns None when nothing is published."""
+        async with Broadcaster().subscribe() as subscription:
+            self.assertIsNone(await subscription.get(timeout=0.01))
+
+
+class LiveEventsTest(TestCase):
+    """Test cases for events published by review and like changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        brewery = Brewery.objects.create(name='Brewery', slug='brewery', location='Kent')
+        category = Category.objects.create(name='Bitter', slug='bitter')
+        cls.beer = Beer.objects.create(
+            name='Live Ale', slug='live-ale', brewery=brewery, category=category,
+            abv=Decimal('4.2'), style='Bitter'
+        )
+        cls.user = User.objects.create_user(
+            username='drinker', email='drinker@example.com', password='secret'
+        )
+
+    def _create_review(self, **kwargs):
+        return Review.objects.create(
+            beer=self.beer, user=self.user, title='Lovely', content='Lovely pint',
+            rating=5, **kwargs
+        )
+
+    @mock.patch('reviews.live.broadcast.publish')
+    def test_approval_publishes_card(self, publish):
+        """Test a review is published once, when it becomes approved."""
+        with self.captureOnCommitCallbacks(execute=True):
+            review = self._create_review()
+        publish.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            review.is_approved = True
+            review.save()
+        publish.assert_called_once()
+        type, data = publish.call_args.args
+        self.assertEqual(type, live.REVIEW_APPROVED)
+        self.assertEqual(data['review_id'], review.pk)
+        self.assertIn('Live Ale', data['html'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            review.save()
+        publish.assert_called_once()
+
+        # Loaded approved; saving it again looks nothing up
+        review = Review.objects.get(pk=review.pk)
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            review.save(update_fields=['title'])
+        publish.assert_called_once()
+
+    @mock.patch('reviews.live.broadcast.publish')
+    def test_like_publishes_count(self, publish):
+        """Test adding and removing a like publishes the new count."""
+        review = self._create_review(is_approved=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            like = ReviewLike.objects.create(review=review, user=self.user)
+        publish.assert_called_with(
+            live.REVIEW_LIKES, {'review_id': review.pk, 'like_count': 1}
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            like.delete()
+        publish.assert_called_with(
+            live.REVIEW_LIKES, {'review_id': review.pk, 'like_count': 0}
+        )
+
+
+    @override_settings(LIVE_STREAM_URL='https://live.example.com/live/stream/')
+    def test_home_listens_to_live_service(self):
+        """Test the home page subscribes to the configured stream URL."""
+        self._create_review(is_approved=True)
+        response = self.client.get(reverse('core:home'))
+        self.assertContains(response, 'data-live-stream="https://live.example.com/live/stream/"')
+
+    @override_settings(LIVE_STREAM_URL='')
+    def test_home_without_live_service(self):
+        """Test the home page opens no stream unless a live service is configured."""
+        self._create_review(is_approved=True)
+        response = self.client.get(reverse('core:home'))
+        self.assertContains(response, 'id="latest-reviews"')
+        self.assertNotContains(response, 'data-live-stream')
+
+
+class LiveStreamViewTest(TestCase):
+    """Test cases for the server-sent events endpoint."""
+
+    async def test_streams_events(self):
+        """Test a published event is written to the stream."""
+        response = await self.async_client.get(reverse('core:live_stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        content = response.streaming_content
+        self.assertTrue((await anext(content)).startswith(b'retry:'))
+        # The subscription is open once the first chunk has been sent
+        event = broadcast.publish('review.likes', {'review_id': 1, 'like_count': 3})
+        chunk = (await anext(content)).decode()
+        await content.aclose()
+
+        self.assertEqual(
+            chunk,
+            f'id: {event.id}\nevent: review.likes\n'
+            f'data: {json.dumps({"review_id": 1, "like_count": 3})}\n\n'
+        )
+
+    @override_settings(LIVE_STREAM_URL='https://live.example.com/live/stream/', SITE_DOMAIN='example.com')
+    async def test_stream_on_another_origin(self):
+        """Test a stream served by a separate live service allows the site's origin."""
+        response = await self.async_client.get(reverse('core:live_stream'))
+        await response.streaming_content.aclose()
+        self.assertEqual(response['Access-Control-Allow-Origin'], 'https://example.com')
+
+    def test_sync_server_declines(self):
+        """Test WSGI requests get 204 so browsers stop reconnecting."""
+        response = self.client.get(reverse('core:live_stream'))
+        self.assertEqual(response.status_code, 204)
@@ -0,0 +1,760 @@
+"""
+Test cases for the concurrent scraping engine, host rate limiter,
+robots.txt cache, HTTP cache, brewery specs and recorded HTTP fixtures.
+"""
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from pathlib import Path
+from types import SimpleNamespace
+
+import requests
+from bs4 import BeautifulSoup
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from requests_cache import BaseCache
+from reviews.scrapers.api_scrapers.openbrewerydb import OpenBreweryDBScraper
+from reviews.scrapers.benchmark import benchmark_scraper, fixture_dir, offline
+from reviews.scrapers.brewery_scrapers.base_brewery import BreweryWebsiteScraper
+from reviews.scrapers.brewery_scrapers.breweries import (
+    BREWERY_SPECS, LISTING_FIELDS, LISTING_ITEMS, get_spec
+)
+from reviews.scrapers.brewery_scrapers.spec import (
+    CSSSELECT_AVAILABLE, BrewerySpec, Field, SpecScraper, compile_spec
+)
+from reviews.scrapers.engine import ScrapeEngine
+from reviews.scrapers.utils.http_fixtures import FixtureMissing, record, replay
+from reviews.scrapers.utils.image_downloader import ImageDownloader
+from reviews.scrapers.utils.fingerprints import content_hash, diff_records, fingerprint_records
+from reviews.scrapers.utils.rate_limiter import HostRateLimiter, TokenBucket, get_host_limiter
+from reviews.scrapers.utils import http_cache
+from reviews.scrapers.utils.robots_checker import RobotsCache, RobotsChecker
+from reviews.scrapers.utils import snapshot
+
+
+# Scrapers in these tests keep their HTTP cache in memory
+_memory_http_cache = override_settings(HTTP_CACHE_PATH=None)
+
+
+def setUpModule():
+    _memory_http_cache.enable()
+    http_cache.reset_backend()
+
+
+def tearDownModule():
+    _memory_http_cache.disable()
+    http_cache.reset_backend()
+
+
+class FakeResponse:
+    def __init__(self, url, status=200):
+        self.url = url
+        self.status_code = status
+        self.content = f'<div class="beer"><h3 class="name">{url}</h3></div>'.encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code} for {self.url}')
+
+
+class FakeSession:
+    """Records request times and keeps each request in flight for ``latency``."""
+
+    def __init__(self, latency=0.0, status=200):
+        self.latency = latency
+        self.status = status
+        self.calls = []
+        self.headers = {}
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(time.monotonic())
+        time.sleep(self.latency)
+        return FakeResponse(url, self.status)
+
+    def close(self):
+        pass
+
+
+class FakeScraper(BreweryWebsiteScraper):
+    def __init__(self, host, rate_limit=0.0, **session_kwargs):
+        super().__init__(brewery_name=host, base_url=f'https://{host}')
+        self.rate_limit = rate_limit
+        self.check_robots_txt = False
+        self.retry_strategy.base_delay = 0.01
+        self.session = FakeSession(**session_kwargs)
+
+    def parse_beers(self, soup, limit=None):
+        return [{'name': h.get_text(strip=True)} for h in soup.find_all('h3')]
+
+
+class ScrapeEngineTest(SimpleTestCase):
+    """Test cases for ScrapeEngine scheduling."""
+
+    def setUp(self):
+        get_host_limiter().reset()
+        self.addCleanup(get_host_limiter().reset)
+
+    def test_hosts_run_concurrently(self):
+        """Test wall time tracks the slowest site rather than the sum."""
+        scrapers = [FakeScraper(f'brewery{i}.test', latency=0.2) for i in range(5)]
+        start = time.monotonic()
+        results = ScrapeEngine(max_concurrency=5).scrape(scrapers)
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertEqual(
+            [result.beers for result in results],
+            [[{'name': f'https://brewery{i}.test/beers'}] for i in range(5)]
+        )
+
+    def test_same_host_is_spaced_by_rate_limit(self):
+        """Test requests to one host are serialised and spaced out."""
+        scrapers = [FakeScraper('same.test', rate_limit=0.2) for _ in range(3)]
+        ScrapeEngine(max_concurrency=3).scrape(scrapers)
+        calls = sorted(t for scraper in scrapers for t in scraper.session.calls)
+        gaps = [b - a for a, b in zip(calls, calls[1:])]
+        self.assertTrue(all(gap >= 0.19 for gap in gaps), gaps)
+
+    def test_global_concurrency_is_bounded(self):
+        """Test no more than max_concurrency requests are in flight."""
+        in_flight = peak = 0
+        lock = threading.Lock()
+
+        class CountingSession(FakeSession):
+            def request(self, method, url, **kwargs):
+                nonlocal in_flight, peak
+                with lock:
+                    in_flight += 1
+                    peak = max(peak, in_flight)
+                try:
+                    return super().request(method, url, **kwargs)
+                finally:
+                    with lock:
+                        in_flight -= 1
+
+        scrapers = [FakeScraper(f'b{i}.test') for i in range(6)]
+        for scraper in scrapers:
+            scraper.session = CountingSession(latency=0.05)
+        ScrapeEngine(max_concurrency=2).scrape(scrapers)
+        self.assertEqual(peak, 2)
+
+    def test_failing_site_does_not_stop_others(self):
+        """Test HTTP errors are retried, then reported per scraper."""
+        broken = FakeScraper('broken.test', status=500)
+        working = FakeScraper('working.test')
+        with self.assertLogs('beer_scraper', level='ERROR'):
+            results = ScrapeEngine().scrape([broken, working])
+
+        self.assertEqual(len(broken.session.calls), broken.retry_strategy.max_attempts)
+        self.assertEqual(broken.stats['http_errors'], 1)
+        self.assertEqual(results[0].beers, [])
+        self.assertEqual(len(results[1].beers), 1)
+        self.assertEqual(working.stats['requests_made'], 1)
+
+
+class IncrementalScrapeTest(SimpleTestCase):
+    """Test cases for page fingerprints and record diffs."""
+
+    def setUp(self):
+        get_host_limiter().reset()
+        self.addCleanup(get_host_limiter().reset)
+
+    def test_unchanged_page_is_not_parsed(self):
+        """Test a page matching its stored fingerprint skips parsing."""
+        stale, fresh = FakeScraper('stale.test'), FakeScraper('fresh.test')
+        body = FakeResponse(stale.beers_url).content
+        engine = ScrapeEngine(fingerprints={stale.beers_url: content_hash(body)})
+        stale.parse_beers = lambda soup, limit=None: self.fail('parsed unchanged page')
+
+        skipped, parsed = engine.scrape([stale, fresh])
+
+        self.assertTrue(skipped.unchanged)
+        self.assertEqual(skipped.beers, [])
+        self.assertEqual(skipped.pages, {stale.beers_url: content_hash(body)})
+        self.assertFalse(parsed.unchanged)
+        self.assertEqual(len(parsed.beers), 1)
+        self.assertIn(fresh.beers_url, parsed.pages)
+
+    def test_failed_fetch_is_not_unchanged(self):
+        """Test errors are never reported as unchanged pages."""
+        broken = FakeScraper('broken.test', status=500)
+        with self.assertLogs('beer_scraper', level='ERROR'):
+            result, = ScrapeEngine().scrape([broken])
+        self.assertFalse(result.unchanged)
+        self.assertEqual(result.pages, {})
+
+    def test_record_diff(self):
+        """Test only new, changed and missing beers are reported."""
+        stored = fingerprint_records([
+            {'name': 'Hophead', 'abv': 3.8, 'description': 'Pale and hoppy'},
+            {'name': 'Espresso', 'abv': 4.2, 'description': 'Coffee stout'},
+            {'name': 'Old Ale', 'abv': 5.0, 'description': 'Winter only'},
+        ])
+        beers = [
+            {'name': 'hophead ', 'abv': 3.8, 'description': 'Pale  and hoppy'},
+            {'name': 'Espresso', 'abv': 4.5, 'description': 'Coffee stout',
+             'image_url': 'https://example.com/espresso.png'},
+            {'name': 'Revelation', 'abv': 5.7},
+        ]
+
+        changes = diff_records(stored, beers)
+
+        self.assertEqual([beer['name'] for beer in changes.added], ['Revelation'])
+        self.assertEqual(
+            [(beer['name'], fields) for beer, fields in changes.changed],
+            [('Espresso', ['abv'])]
+        )
+        self.assertEqual(changes.removed, ['Old Ale'])
+        self.assertFalse(diff_records(fingerprint_records(beers), beers))
+
+
+class FakeRobots:
+    def __init__(self, delay):
+        self.delay = delay
+        self.lookups = 0
+
+    def get_crawl_delay(self, url):
+        self.lookups += 1
+        return self.delay
+
+
+class HostRateLimiterTest(SimpleTestCase):
+    """Test cases for the shared per-host token buckets."""
+
+    def test_bucket_schedules_slots(self):
+        """Test reservations queue up one interval apart instead of colliding."""
+        bucket = TokenBucket(interval=2.0)
+        self.assertEqual([bucket.reserve(now=100.0) for _ in range(3)], [0.0, 2.0, 4.0])
+        self.assertEqual(bucket.time_until_available(now=105.0), 1.0)
+
+    def test_crawl_delay_overrides_shorter_interval(self):
+        """Test robots.txt Crawl-delay sets the pace, looked up once per host."""
+        limiter = HostRateLimiter()
+        robots = FakeRobots(10)
+        limiter.reserve('https://slow.test/a', 1.0, robots)
+        self.assertAlmostEqual(limiter.time_until_next('https://SLOW.test/b'), 10.0, places=1)
+        limiter.reserve('https://slow.test/c', 1.0, robots)
+        self.assertEqual(robots.lookups, 1)
+        self.assertEqual(limiter.time_until_next('https://other.test/'), 0.0)
+
+    def test_hosts_are_shared_across_callers(self):
+        """Test two scrapers on one host draw from the same bucket."""
+        limiter = HostRateLimiter()
+        self.assertEqual(limiter.reserve('https://same.test/beers', 5.0), 0.0)
+        self.assertAlmostEqual(limiter.reserve('https://same.test/about', 1.0), 5.0, places=1)
+
+    def test_threads_get_distinct_slots(self):
+        """Test concurrent reservations from threads never share a slot."""
+        limiter = HostRateLimiter()
+        waits = []
+        lock = threading.Lock()
+
+        def reserve():
+            wait = limiter.reserve('https://busy.test/', 1.0)
+            with lock:
+                waits.append(round(wait))
+
+        threads = [threading.Thread(target=reserve) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(waits), list(range(20)))
+
+
+ROBOTS_TXT = """User-agent: *
+Disallow: /private
+Crawl-delay: 7
+"""
+
+
+class RobotsSession:
+    """Serves one robots.txt response and counts fetches."""
+
+    def __init__(self, status=200, body=ROBOTS_TXT, error=None):
+        self.status = status
+        self.body = body
+        self.error = error
+        self.fetched = []
+
+    def get(self, url, timeout=None):
+        self.fetched.append((url, timeout))
+        if self.error:
+            raise self.error
+        return SimpleNamespace(status_code=self.status, text=self.body)
+
+
+class RobotsCacheTest(SimpleTestCase):
+    """Test cases for the shared, persistent robots.txt cache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def _checker(self, session, cache=None):
+        return RobotsChecker(session=session, cache=cache or RobotsCache(self.directory))
+
+    def test_checkers_share_one_fetch(self):
+        """Test checkers on one cache fetch robots.txt once, with a timeout."""
+        cache = RobotsCache(self.directory)
+        session = RobotsSession()
+        first, second = self._checker(session, cache), self._checker(session, cache)
+
+        with self.assertLogs('beer_scraper.robots', level='WARNING'):
+            self.assertFalse(first.can_fetch('https://brewery.test/private/x'))
+        self.assertTrue(second.can_fetch('https://brewery.test/beers'))
+        self.assertEqual(second.get_crawl_delay('https://brewery.test/'), 7)
+        self.assertEqual(session.fetched, [('https://brewery.test/robots.txt', 10)])
+
+    def test_persisted_until_ttl(self):
+        """Test a new process reuses the file on disk until it expires."""
+        session = RobotsSession()
+        self._checker(session).can_fetch('https://brewery.test/beers')
+        self._checker(session).can_fetch('https://brewery.test/beers')
+        self.assertEqual(len(session.fetched), 1)
+
+        expired = RobotsCache(self.directory, ttl=0)
+        self._checker(session, expired).can_fetch('https://brewery.test/beers')
+        self._checker(session, RobotsCache(self.directory, ttl=0)).can_fetch('https://brewery.test/')
+        self.assertEqual(len(session.fetched), 3)
+
+    def test_failures_are_negatively_cached(self):
+        """Test an unreachable host fails open and isn't refetched for a while."""
+        session = RobotsSession(error=requests.ConnectionError('down'))
+        cache = RobotsCache(self.directory, ttl=3600, negative_ttl=60)
+        with self.assertLogs('beer_scraper.robots', level='WARNING'):
+            self.assertTrue(self._checker(session, cache).can_fetch('https://down.test/beers'))
+            self.assertTrue(self._checker(session, cache).can_fetch('https://down.test/x'))
+        self.assertEqual(len(session.fetched), 1)
+
+        expires, parser = cache._entries['https://down.test']
+        self.assertIsNone(parser)
+        self.assertLess(expires, time.time() + 61)
+
+    def test_status_codes(self):
+        """Test missing robots.txt allows all and server errors disallow all."""
+        with self.assertLogs('beer_scraper.robots', level='WARNING'):
+            self.assertTrue(self._checker(RobotsSession(status=404)).can_fetch('https://a.test/x'))
+            self.assertFalse(self._checker(RobotsSession(status=503)).can_fetch('https://b.test/x'))
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    """Serves a page with an ETag and Last-Modified, answering 304 when they match."""
+
+    etag = '"v1"'
+    last_modified = 'Mon, 05 Oct 2026 10:00:00 GMT'
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(dict(self.headers))
+        if (self.headers.get('If-None-Match') == self.etag
+                or self.headers.get('If-Modified-Since') == self.last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b'<h3>Old Ale</h3>'
+        self.send_response(200)
+        if self.path == '/etag':
+            self.send_header('ETag', self.etag)
+        else:
+            self.send_header('Last-Modified', self.last_modified)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpCacheTest(SimpleTestCase):
+    """Test cases for conditional requests through the scraper HTTP cache."""
+
+    def setUp(self):
+        ConditionalHandler.requests_seen = []
+        server = ThreadingHTTPServer(('127.0.0.1', 0), ConditionalHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f'http://127.0.0.1:{server.server_port}'
+        http_cache.reset_cache_stats()
+
+    def test_etag_revalidation_counts_as_hit(self):
+        """Test a stored ETag is sent back and a 304 is served from the cache."""
+        session = http_cache.cached_session('brewery_test', backend=BaseCache())
+        for _ in range(3):
+            response = session.get(f'{self.base_url}/etag')
+            self.assertEqual(response.content, b'<h3>Old Ale</h3>')
+
+        sent = [headers.get('If-None-Match') for headers in ConditionalHandler.requests_seen]
+        self.assertEqual(sent, [None, '"v1"', '"v1"'])
+        stats = http_cache.cache_stats()['brewery_test']
+        self.assertEqual((stats['misses'], stats['revalidated']), (1, 2))
+        self.assertIn('brewery_test: 3 requests', http_cache.format_cache_stats())
+
+    def test_last_modified_revalidation(self):
+        """Test Last-Modified is sent back as If-Modified-Since."""
+        session = http_cache.cached_session('brewery_test', backend=BaseCache())
+        session.get(f'{self.base_url}/dated')
+        session.get(f'{self.base_url}/dated')
+        self.assertEqual(
+            ConditionalHandler.requests_seen[1].get('If-Modified-Since'),
+            ConditionalHandler.last_modified,
+        )
+
+    def test_fresh_policy_skips_network(self):
+        """Test sources with a freshness window don't revalidate within it."""
+        session = http_cache.cached_session('openbrewerydb', backend=BaseCache())
+        session.get(f'{self.base_url}/etag')
+        response = session.get(f'{self.base_url}/etag')
+        self.assertTrue(response.from_cache)
+        self.assertEqual(len(ConditionalHandler.requests_seen), 1)
+        self.assertEqual(http_cache.cache_stats()['openbrewerydb']['hits'], 1)
+
+    def test_policy_prefixes(self):
+        """Test the longest matching source prefix picks the policy."""
+        self.assertEqual(http_cache.policy_for('brewery_harveys_&_son'), 0)
+        self.assertEqual(http_cache.policy_for('openbrewerydb'), 6 * 60 * 60)
+        self.assertEqual(http_cache.policy_for('unknown'), 0)
+
+
+class ApiResponse:
+    def __init__(self, data):
+        self.data = data
+        self.status_code = 200
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        pass
+
+
+class BreweryApiSession:
+    """Fake Open Brewery DB: ``totals`` breweries per country."""
+
+    def __init__(self, totals):
+        self.totals = totals
+        self.calls = []
+        self.headers = {}
+        self.lock = threading.Lock()
+
+    def request(self, method, url, params=None, **kwargs):
+        with self.lock:
+            self.calls.append((url, dict(params)))
+        country = params['by_country']
+        total = self.totals.get(country, 0)
+        if url.endswith('/meta'):
+            return ApiResponse({'total': str(total), 'page': '1', 'per_page': '50'})
+        start = (params['page'] - 1) * params['per_page']
+        return ApiResponse([
+            {'id': f'{country}-{i}', 'name': f'{country} Brewery {i}', 'city': 'Town',
+             'state_province': country, 'brewery_type': 'micro'}
+            for i in range(start, min(start + params['per_page'], total))
+        ])
+
+    def close(self):
+        pass
+
+
+class OpenBreweryDBTest(SimpleTestCase):
+    """Test cases for paginated fetching and NDJSON snapshots."""
+
+    def setUp(self):
+        get_host_limiter().reset()
+        self.addCleanup(get_host_limiter().reset)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _scraper(self, session):
+        scraper = OpenBreweryDBScraper(snapshot_dir=self.directory)
+        scraper.rate_limit = 0
+        scraper.session = session
+        return scraper
+
+    def test_pages_from_meta_for_all_nations(self):
+        """Test page counts come from /meta and every UK nation is fetched."""
+        session = BreweryApiSession({'England': 450, 'Scotland': 20, 'Wales': 1})
+        breweries = self._scraper(session).fetch_breweries()
+
+        self.assertEqual(len(breweries), 471)
+        pages = sorted(
+            (params['by_country'], params['page']) for url, params in session.calls
+            if not url.endswith('/meta')
+        )
+        self.assertEqual(pages, [('England', 1), ('England', 2), ('England', 3), ('Scotland', 1), ('Wales', 1)])
+        self.assertEqual(len(snapshot.list_snapshots('openbrewerydb', self.directory)), 1)
+
+    def test_offline_replays_snapshot_and_later_runs_diff(self):
+        """Test offline runs need no requests and fresh fetches report changes."""
+        self._scraper(BreweryApiSession({'Wales': 3})).fetch_breweries()
+
+        offline = BreweryApiSession({})
+        scraper = self._scraper(offline)
+        self.assertEqual(len(scraper.fetch_breweries(offline=True)), 3)
+        self.assertEqual(offline.calls, [])
+
+        scraper = self._scraper(BreweryApiSession({'Wales': 2, 'Scotland': 1}))
+        scraper.fetch_breweries()
+        diff = scraper.snapshot_diff
+        self.assertEqual([r['id'] for r in diff.added], ['Scotland-0'])
+        self.assertEqual([r['id'] for r in diff.removed], ['Wales-2'])
+        self.assertEqual(diff.changed, [])
+
+    def test_snapshots_are_pruned(self):
+        """Test only the newest snapshots are kept and read back intact."""
+        for hour in range(4):
+            snapshot.write_snapshot(
+                'src', [{'id': hour}], self.directory,
+                taken_at=datetime(2026, 10, 19, hour, tzinfo=timezone.utc), keep=2,
+            )
+        paths = snapshot.list_snapshots('src', self.directory)
+        self.assertEqual([path.name for path in paths],
+                         ['src-20261019T020000Z.ndjson.gz', 'src-20261019T030000Z.ndjson.gz'])
+        latest = snapshot.latest_snapshot('src', self.directory)
+        self.assertEqual(latest.records, [{'id': 3}])
+        self.assertEqual(latest.taken_at.hour, 3)
+
+
+LISTING_PAGE = b"""<html><body>
+<nav><a href="/beer/nav-link">Our beers</a></nav>
+<main>
+  <div class="Product-Card">
+    <div class="product-image"><img data-src="/img/hophead.png"></div>
+    <h3 class="product-title"> Hop<span>head</span></h3>
+    <p class="excerpt">Pale and <b>hoppy</b></p>
+  </div>
+  <article class="beer">
+    <a href="/beer/espresso">Espresso</a><img src="//cdn.example.com/espresso.png">
+  </article>
+  <div class="beer"><h3 class="name"></h3></div>
+</main>
+</body></html>"""
+
+
+class BrewerySpecTest(SimpleTestCase):
+    """Test cases for declarative brewery scrapers."""
+
+    def setUp(self):
+        self.scraper = SpecScraper(get_spec('Dark Star Brewing Co'))
+
+    def test_listing_fields(self):
+        """Test names, images and descriptions are read from beer cards."""
+        beers = self.scraper.parse_html(LISTING_PAGE)
+
+        self.assertEqual(beers, [
+            {'name': 'Hophead', 'image_url': 'https://www.darkstarbrewing.co.uk/img/hophead.png',
+             'description': 'Pale andhoppy', 'brewery': 'Dark Star Brewing Co'},
+            {'name': 'Espresso', 'image_url': 'https://cdn.example.com/espresso.png',
+             'description': '', 'brewery': 'Dark Star Brewing Co'},
+        ])
+        self.assertEqual(self.scraper.parse_beers(BeautifulSoup(LISTING_PAGE, 'lxml')), beers)
+        self.assertEqual(len(self.scraper.parse_html(LISTING_PAGE, limit=1)), 1)
+        self.assertEqual(self.scraper.parse_html(b''), [])
+
+    def test_fallback_items_and_root(self):
+        """Test later item selectors are tried in turn, only inside the root."""
+        page = b'<nav><a href="/beer/a">A</a></nav><main><a href="/product/b">B</a></main>'
+        beers = self.scraper.parse_html(page)
+        self.assertEqual([beer['name'] for beer in beers], ['A', 'B'])
+
+        spec = get_spec('Dark Star Brewing Co')._replace(root='//main')
+        beers = SpecScraper(spec).parse_html(page)
+        self.assertEqual([beer['name'] for beer in beers], ['B'])
+
+    def test_specs_compile_once(self):
+        """Test scrapers for the same spec share compiled selectors."""
+        spec = BrewerySpec(
+            name='Test Brewery', base_url='https://brewery.test',
+            items=('//li',), fields=(Field('name', ('.',), required=True),),
+        )
+        self.assertIs(SpecScraper(spec).compiled, compile_spec(spec))
+        self.assertEqual(
+            SpecScraper(spec).parse_html(b'<ul><li>Mild</li></ul>'),
+            [{'name': 'Mild', 'brewery': 'Test Brewery'}]
+        )
+
+    def test_css_selectors(self):
+        """Test css: selectors compile to XPath, or fail clearly without cssselect."""
+        spec = BrewerySpec(
+            name='CSS Brewery', base_url='https://brewery.test',
+            items=('css:li.beer',), fields=(Field('name', ('.',), required=True),),
+        )
+        if not CSSSELECT_AVAILABLE:
+            with self.assertRaisesRegex(ValueError, 'cssselect'):
+                SpecScraper(spec)
+            return
+        beers = SpecScraper(spec).parse_html(b'<ul><li class="beer">Mild</li><li>Other</li></ul>')
+        self.assertEqual([beer['name'] for beer in beers], ['Mild'])
+
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Serves a small PNG at /beer.png."""
+
+    def do_GET(self):
+        if self.path != '/beer.png':
+            self.send_error(404)
+            return
+        body = BytesIO()
+        Image.new('RGB', (4, 4), 'gold').save(body, 'PNG')
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body.getvalue())))
+        self.end_headers()
+        self.wfile.write(body.getvalue())
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpFixtureTest(SimpleTestCase):
+    """Test cases for recorded fixtures, replay and offline benchmarks."""
+
+    def setUp(self):
+        get_host_limiter().reset()
+        self.addCleanup(get_host_limiter().reset)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        spec = BrewerySpec(
+            name='Sample Brewery', base_url='https://brewery.test',
+            items=LISTING_ITEMS, fields=LISTING_FIELDS,
+        )
+        self.scraper = SpecScraper(spec)
+        self.addCleanup(self.scraper.close)
+
+    def test_recorded_listing_page(self):
+        """Test the shared listing selectors against a recorded page, offline."""
+        offline(self.scraper, FIXTURES / 'listing')
+        beers = self.scraper.fetch_beers()
+
+        self.assertEqual([beer['name'] for beer in beers], ['Hophead', 'Espresso', 'Revelation', 'Old Ale'])
+        self.assertEqual(
+            [beer['image_url'] for beer in beers],
+            ['https://brewery.test/img/hophead.png', 'https://cdn.brewery.test/espresso.jpg',
+             'https://cdn.brewery.test/revelation.png', None]
+        )
+        self.assertEqual(beers[0]['description'], '3.8% golden ale, floral and hoppy')
+        self.assertEqual(beers[2]['description'], '')
+
+    def test_benchmark(self):
+        """Test benchmark counts pages and beers across repeats."""
+        offline(self.scraper, FIXTURES / 'listing')
+        result = benchmark_scraper(self.scraper, repeat=3)
+
+        self.assertEqual((result.name, result.scraper), ('Sample Brewery', 'SpecScraper'))
+        self.assertEqual((result.pages, result.beers), (3, 12))
+        self.assertGreater(result.pages_per_second, 0)
+        self.assertAlmostEqual(result.beers_per_second, 4 * result.pages_per_second)
+        self.assertGreater(result.peak_memory, 0)
+
+    def test_unrecorded_request_fails(self):
+        """Test replay never falls through to the network."""
+        session = requests.Session()
+        replay(session, FIXTURES / 'listing')
+        with self.assertRaises(FixtureMissing):
+            session.get('https://brewery.test/other')
+        offline(self.scraper, self.directory)
+        with self.assertLogs('beer_scraper', level='ERROR'):
+            self.assertEqual(self.scraper.fetch_beers(), [])
+
+    def test_record_then_replay_image_downloads(self):
+        """Test ImageDownloader sessions record live responses and replay them."""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}/beer.png'
+
+        with ImageDownloader(max_retries=1) as downloader:
+            record(downloader.session, self.directory)
+            self.assertTrue(downloader.download_image(url, f'{self.directory}/live.jpg'))
+        server.shutdown()
+        server.server_close()
+
+        with ImageDownloader(max_retries=1) as downloader:
+            replay(downloader.session, self.directory)
+            self.assertTrue(downloader.download_image(url, f'{self.directory}/replayed.jpg'))
+            with self.assertLogs('beer_scraper.images', level='WARNING'):
+                self.assertFalse(downloader.download_image(url + '?v=2', f'{self.directory}/missing.jpg'))
+        self.assertEqual(Image.open(f'{self.directory}/replayed.jpg').size, (4, 4))
+
+
+class BreweryFixtureTest(SimpleTestCase):
+    """
+    Test cases for each brewery spec against its page in tests/fixtures/scrapers.
+
+    The pages reproduce each site's listing markup offline; refresh them
+    with ``benchmark_scrapers --record`` and update the expected beers.
+    """
+
+    def setUp(self):
+        get_host_limiter().reset()
+        self.addCleanup(get_host_limiter().reset)
+
+    def _fetch(self, name):
+        scraper = SpecScraper(get_spec(name))
+        self.addCleanup(scraper.close)
+        offline(scraper, fixture_dir(FIXTURES / 'scrapers', scraper))
+        return scraper.fetch_beers()
+
+    def test_dark_star(self):
+        """Test beer cards with relative and CDN images."""
+        beers = self._fetch('Dark Star Brewing Co')
+        self.assertEqual(
+            [beer['name'] for beer in beers],
+            ['Hophead', 'Partridge', 'American Pale Ale', 'Revelation', 'Espresso']
+        )
+        self.assertEqual(
+            beers[0]['image_url'],
+            'https://www.darkstarbrewing.co.uk/wp-content/uploads/2023/03/hophead-pumpclip.png'
+        )
+        self.assertEqual(beers[4]['image_url'], 'https://cdn.darkstarbrewing.co.uk/seasonal/espresso.png')
+        self.assertEqual(beers[4]['description'], '4.2% Dark Beer brewed with freshly roasted coffee.')
+
+    def test_harveys(self):
+        """Test link tiles, lazy images and a tile without a description."""
+        beers = self._fetch('Harveys & Son')
+        self.assertEqual(
+            [beer['name'] for beer in beers],
+            ['Sussex Best Bitter', 'Old Ale', 'Armada Ale', 'Dark Mild', 'Imperial Extra Double Stout']
+        )
+        self.assertEqual(beers[1]['image_url'], 'https://www.harveys.org.uk/media/beers/old-ale.jpg')
+        self.assertEqual(beers[0]['description'], '4.0% The beer that made our name. Hoppy and bitter sweet.')
+        self.assertEqual(beers[3]['description'], '')
+
+    def test_brighton_bier(self):
+        """Test shop product cards with protocol-relative images."""
+        beers = self._fetch('Brighton Bier')
+        self.assertEqual(
+            [beer['name'] for beer in beers],
+            ['Brighton Bier', 'West Pier', 'Kemptown Stout', 'Mixed Case']
+        )
+        self.assertEqual(
+            beers[1]['image_url'],
+            'https://www.brightonbier.com/cdn/shop/files/west-pier-can_600x.png?v=1690000000'
+        )
+        self.assertEqual(beers[0]['description'], '4.0% Pale Ale. Our flagship, brewed with Sussex malt.')
+        self.assertEqual(beers[3]['description'], '')
+
+    def test_burning_sky(self):
+        """Test shop product links, skipping category and basket links."""
+        beers = self._fetch('Burning Sky Brewery')
+        self.assertEqual(
+            [beer['name'] for beer in beers],
+            ['Plateau', 'Arise', 'Aurora', 'Saison \u00e0 la Provision']
+        )
+        self.assertEqual(
+            beers[0]['image_url'],
+            'https://www.burningskybeer.com/wp-content/uploads/2022/05/plateau-440x440.jpg'
+        )
+
+    def test_benchmark_command_covers_every_spec(self):
+        """Test benchmark_scrapers finds recorded pages for every brewery by default."""
+        out = StringIO()
+        call_command('benchmark_scrapers', '--repeat', '1', stdout=out)
+        for spec in BREWERY_SPECS:
+            self.assertIn(spec.name, out.getvalue())
+        self.assertNotIn('no recorded pages', out.getvalue())
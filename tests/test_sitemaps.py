@@ -0,0 +1,131 @@
+"""
+Test cases for the sharded, pre-rendered sitemaps.
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core import cache
+from reviews import sitemaps
+from reviews.models import Beer, Brewery, Category
+from reviews.sitemaps import BeerSitemap, build_sitemaps
+
+
+class SitemapTest(TestCase):
+    """Test cases for sitemap index, shards and invalidation."""
+
+    def setUp(self):
+        """Set up an empty cache and some beers."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        settings_override = override_settings(SITE_DOMAIN='testserver')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.brewery = Brewery.objects.create(
+            name='Test Brewery', slug='test-brewery', location='Sussex'
+        )
+        self.category = Category.objects.create(name='Bitter', slug='bitter')
+        self.beers = [
+            Beer.objects.create(
+                name=f'Beer {i}', slug=f'beer-{i}', brewery=self.brewery,
+                category=self.category, abv=Decimal('4.0'), style='Bitter'
+            )
+            for i in range(3)
+        ]
+
+    def test_index_lists_all_sections(self):
+        """Test the index links to beer, brewery and category shards."""
+        response = self.client.get(reverse('sitemap_index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        self.assertContains(response, 'sitemap-beers-1.xml')
+        self.assertContains(response, 'sitemap-breweries-1.xml')
+        self.assertContains(response, 'sitemap-categories-1.xml')
+        # No approved reviews yet, so no review shard
+        self.assertNotContains(response, 'sitemap-reviews-')
+
+    def test_shard_contains_locations(self):
+        """Test a shard lists absolute beer URLs."""
+        response = self.client.get(
+            reverse('sitemap_section', kwargs={'section': 'beers', 'page': 1})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'https://testserver/reviews/beer/beer-0/')
+
+    def test_shard_is_rendered_once(self):
+        """Test later requests are served from the cache."""
+        url = reverse('sitemap_section', kwargs={'section': 'beers', 'page': 1})
+        self.client.get(url)
+        with mock.patch('reviews.sitemaps.render_shard') as render:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        render.assert_not_called()
+
+    def test_unknown_section_and_page(self):
+        """Test unknown sections and out-of-range pages return 404."""
+        response = self.client.get('/sitemap-wines-1.xml')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/sitemap-beers-9.xml')
+        self.assertEqual(response.status_code, 404)
+
+    def test_sharding_by_primary_key(self):
+        """Test rows are split into shards of ``limit`` primary keys."""
+        with mock.patch.object(BeerSitemap, 'limit', 2):
+            sitemap = BeerSitemap()
+            first_pk = self.beers[0].pk
+            shard = sitemap.shard_for_pk(first_pk)
+            items = list(sitemap.items(shard))
+            self.assertLessEqual(len(items), 2)
+            self.assertIn(first_pk, [item[0] for item in items])
+            self.assertEqual(sitemap.shard_count(), sitemap.shard_for_pk(self.beers[-1].pk))
+
+    def test_save_invalidates_shard_everywhere(self):
+        """Test a save re-renders its shard, even in other processes."""
+        build_sitemaps()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.beers[0].slug = 'renamed'
+            self.beers[0].save()
+        # Another process only shares L2
+        cache.l1.clear()
+
+        self.assertIn('/reviews/beer/renamed/', sitemaps.get_shard('beers', 1))
+        with mock.patch('reviews.sitemaps.render_shard') as render:
+            sitemaps.get_shard('breweries', 1)
+        render.assert_not_called()
+
+    def test_save_leaves_other_shards_cached(self):
+        """Test a write only re-renders the shard holding the written row."""
+        with mock.patch.object(BeerSitemap, 'limit', 2):
+            sitemap = BeerSitemap()
+            shards = {sitemap.shard_for_pk(beer.pk) for beer in self.beers}
+            self.assertGreater(len(shards), 1)
+            build_sitemaps(['beers'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.beers[0].slug = 'renamed'
+                self.beers[0].save()
+            cache.l1.clear()
+
+            with mock.patch(
+                'reviews.sitemaps.render_shard', wraps=sitemaps.render_shard
+            ) as render:
+                for shard in shards:
+                    self.assertIsNotNone(sitemaps.get_shard('beers', shard))
+            render.assert_called_once_with('beers', sitemap.shard_for_pk(self.beers[0].pk))
+
+    def test_render_racing_a_write_is_not_kept(self):
+        """Test a shard rendered before a write is cached under the old version."""
+        render_shard = sitemaps.render_shard
+
+        def render_then_write(section, shard):
+            content = render_shard(section, shard)
+            with self.captureOnCommitCallbacks(execute=True):
+                Beer.objects.filter(pk=self.beers[0].pk).update(slug='renamed')
+                sitemaps.invalidate(Beer, [self.beers[0].pk])
+            return content
+
+        with mock.patch('reviews.sitemaps.render_shard', side_effect=render_then_write):
+            self.assertNotIn('renamed', sitemaps.get_shard('beers', 1))
+        self.assertIn('/reviews/beer/renamed/', sitemaps.get_shard('beers', 1))
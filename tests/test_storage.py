@@ -0,0 +1,87 @@
+"""
+Test cases for content-addressed media storage.
+"""
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management import call_command
+from core.models import StoredFile
+from reviews.models import Beer
+from tests.test_images import MediaTestCase, make_jpeg
+
+
+class ContentAddressedStorageTest(MediaTestCase):
+    """Test cases for hashing, deduplication and reference counting."""
+
+    def test_identical_uploads_share_one_file(self):
+        """Test saving the same bytes twice stores a single addressed file."""
+        first = self._beer('first', make_jpeg())
+        second = self._beer('second', make_jpeg())
+        self.assertEqual(first.image.name, second.image.name)
+        digest = StoredFile.objects.get().sha256
+        self.assertEqual(first.image.name, f'beers/{digest[:2]}/{digest}.jpg')
+        self.assertEqual(StoredFile.objects.get().refcount, 2)
+
+    def test_file_deleted_with_last_reference(self):
+        """Test a shared file survives until its last row lets go."""
+        first = self._beer('first', make_jpeg())
+        second = self._beer('second', make_jpeg())
+        name = first.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.image = None
+            second.save()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_legacy_file_adopted_with_existing_references(self):
+        """Test a file saved before refcounting starts with all its references."""
+        name = FileSystemStorage().save('beers/legacy.jpg', make_jpeg())
+        self._beer('first')
+        self._beer('second')
+        Beer.objects.filter(slug='first').update(image=name)
+
+        second = Beer.objects.get(slug='second')
+        second.image = name
+        second.save()
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 2)
+
+    def test_other_paths_stored_as_named(self):
+        """Test files outside addressed directories keep their names."""
+        name = default_storage.save('derivatives/aa/x/160.webp', ContentFile(b'data'))
+        self.assertEqual(name, 'derivatives/aa/x/160.webp')
+
+
+class DedupeMediaCommandTest(MediaTestCase):
+    """Test cases for collapsing pre-existing duplicates."""
+
+    def test_collapses_duplicates_and_rewrites_paths(self):
+        """Test duplicates become one addressed file and rows follow it."""
+        plain = FileSystemStorage()
+        original = plain.save('beers/abbot-ale.jpg', make_jpeg())
+        duplicate = plain.save('beers/abbot-ale.jpg', make_jpeg())
+        self.assertNotEqual(original, duplicate)
+
+        first = self._beer('abbot')
+        second = self._beer('abbot-2')
+        Beer.objects.filter(pk=first.pk).update(image=original)
+        Beer.objects.filter(pk=second.pk).update(
+            image=duplicate, image_variants={'source': duplicate, 'formats': {}}
+        )
+
+        out = StringIO()
+        call_command('dedupe_media', stdout=out)
+        self.assertIn('Moved 2 files', out.getvalue())
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(second.image_variants['source'], second.image.name)
+        self.assertEqual(StoredFile.objects.get(name=first.image.name).refcount, 2)
+        self.assertFalse(default_storage.exists(original))
+        self.assertFalse(default_storage.exists(duplicate))
@@ -0,0 +1,77 @@
+"""
+Test cases for the hot-path views: home, beer list, beer detail and likes.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from core import cache
+from reviews.models import Beer, Brewery, Category, Review, ReviewLike
+from users.models import User
+
+
+class HotViewsTest(TestCase):
+    """Test cases for home, beer_list, beer_detail and toggle_like."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a beer with one approved review."""
+        brewery = Brewery.objects.create(name='Brewery', slug='brewery', location='Kent')
+        category = Category.objects.create(name='Bitter', slug='bitter')
+        cls.beer = Beer.objects.create(
+            name='Async Ale', slug='async-ale', brewery=brewery, category=category,
+            abv=Decimal('4.2'), style='Bitter', is_featured=True
+        )
+        cls.user = User.objects.create_user(
+            username='drinker', email='drinker@example.com', password='secret'
+        )
+        cls.review = Review.objects.create(
+            beer=cls.beer, user=cls.user, title='Lovely', content='Lovely',
+            rating=5, is_approved=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_home(self):
+        """Test the home page renders its blocks."""
+        response = self.client.get(reverse('core:home'))
+        self.assertContains(response, 'Async Ale')
+
+    def test_beer_list(self):
+        """Test the beer list renders and counts results."""
+        response = self.client.get(reverse('reviews:beer_list'), {'query': 'async'})
+        self.assertContains(response, 'Async Ale')
+        self.assertEqual(response.context['total_beers'], 1)
+
+    def test_beer_detail(self):
+        """Test beer detail includes stats and the user's own review."""
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse('reviews:beer_detail', kwargs={'slug': 'async-ale'})
+        )
+        self.assertEqual(response.context['stats']['total_reviews'], 1)
+        self.assertEqual(response.context['user_review'], self.review)
+
+    def test_beer_detail_404(self):
+        """Test an unknown slug returns 404."""
+        response = self.client.get(
+            reverse('reviews:beer_detail', kwargs={'slug': 'missing'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_toggle_like(self):
+        """Test liking then unliking a review."""
+        self.client.force_login(self.user)
+        url = reverse('reviews:toggle_like', kwargs={'review_id': self.review.pk})
+        self.assertEqual(self.client.post(url).json(), {'liked': True, 'like_count': 1})
+        self.assertEqual(self.client.post(url).json(), {'liked': False, 'like_count': 0})
+        self.assertFalse(ReviewLike.objects.exists())
+
+    def test_toggle_like_requires_post_and_login(self):
+        """Test GET is rejected and anonymous users are sent to login."""
+        url = reverse('reviews:toggle_like', kwargs={'review_id': self.review.pk})
+        self.assertEqual(self.client.post(url).status_code, 302)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
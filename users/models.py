@@ -1,9 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from PIL import Image
 
+from core.models import StoredFileTrackingMixin
 
-class User(AbstractUser):
+
+class User(StoredFileTrackingMixin, AbstractUser):
     """Extended User model with additional fields"""
     email = models.EmailField(unique=True)
     bio = models.TextField(max_length=500, blank=True, help_text="Tell us about yourself")
@@ -26,6 +27,8 @@ class User(AbstractUser):
     show_email = models.BooleanField(default=False, help_text="Show email on profile")
     show_location = models.BooleanField(default=True, help_text="Show location on profile")
     
+    tracked_file_fields = ('avatar',)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
     
@@ -37,16 +40,6 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
     
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        
-        if self.avatar:
-            img = Image.open(self.avatar.path)
-            if img.height > 300 or img.width > 300:
-                output_size = (300, 300)
-                img.thumbnail(output_size)
-                img.save(self.avatar.path)
-    
     @property
     def full_name(self):
         """Return full name or username if names not provided"""
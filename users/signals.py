@@ -0,0 +1,26 @@
+"""
+Signal handlers for the users app.
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_save
+
+from core import images, jobs
+
+from .models import User
+
+
+def process_changed_avatar(sender, instance, raw=False, **kwargs):
+    """Shrink a newly uploaded avatar in the background."""
+    if raw or not images.image_changed(instance, 'avatar'):
+        return
+    avatar_name = instance.avatar.name or ''
+    images.remember_stored_image(instance, 'avatar')
+    if avatar_name:
+        jobs.enqueue(
+            images.process_instance_image, sender._meta.label_lower, instance.pk,
+            avatar_name, field='avatar', max_size=settings.AVATAR_MAX_DIMENSION
+        )
+
+
+post_save.connect(process_changed_avatar, sender=User, dispatch_uid='avatar_save')
@@ -4,11 +4,37 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Avg
+from django.db.models import Avg, Count
 from django.http import HttpRequest, HttpResponse
 from .forms import CustomUserCreationForm, UserUpdateForm
 from .models import User
 from reviews.models import Review
+from core.cache import cached_call
+from core.db_routers import replica_reads
+
+
+def get_profile_stats(user_id: int, force: bool = False) -> dict:
+    """Cached review statistics for a user's profile.
+
+    Args:
+        user_id: Primary key of the profile user
+        force: Recompute even if the statistics are cached
+
+    Returns:
+        dict: Total reviews, average rating and distinct beer count
+    """
+    def compute() -> dict:
+        return Review.objects.filter(
+            user_id=user_id, is_approved=True
+        ).aggregate(
+            total_reviews=Count('id'),
+            avg_rating=Avg('rating'),
+            beer_count=Count('beer', distinct=True),
+        )
+
+    return cached_call(
+        'profile_stats', compute, user_id, models=(Review,), force=force
+    )
 
 
 def register(request: HttpRequest) -> HttpResponse:
@@ -98,11 +124,7 @@ def profile(request):
     page_obj = paginator.get_page(page_number)
     
     # Statistics
-    stats = {
-        'total_reviews': reviews.count(),
-        'avg_rating': reviews.aggregate(Avg('rating'))['rating__avg'],
-        'beer_count': reviews.values('beer').distinct().count(),
-    }
+    stats = get_profile_stats(user.pk)
     
     context = {
         'profile_user': user,
@@ -130,6 +152,7 @@ def edit_profile(request):
     return render(request, 'users/edit_profile.html', {'form': form})
 
 
+@replica_reads
 def public_profile(request, username):
     """Public profile view for other users"""
     user = get_object_or_404(User, username=username)
@@ -143,11 +166,7 @@ def public_profile(request, username):
     page_obj = paginator.get_page(page_number)
     
     # Statistics
-    stats = {
-        'total_reviews': reviews.count(),
-        'avg_rating': reviews.aggregate(Avg('rating'))['rating__avg'],
-        'beer_count': reviews.values('beer').distinct().count(),
-    }
+    stats = get_profile_stats(user.pk)
     
     context = {
         'profile_user': user,